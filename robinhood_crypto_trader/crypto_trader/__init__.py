@@ -2,4 +2,4 @@ from .order import (cancel_all_orders, get_all_orders, get_all_open_orders, Orde
 
 from .trader import Trader
 
-from .strategy import Strategy
+from .strategy import Strategy, register
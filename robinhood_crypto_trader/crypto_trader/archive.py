@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import numpy as np
+import pandas as pd
+
+from robinhood_crypto_trader.crypto_trader.candles import FIELDS, INTERVALS, parse_historicals, download_historicals
+
+# One day of 15 second candles
+CHUNK_SIZE = 5760
+
+def parse_time(value):
+    """
+    Returns value as int seconds since the epoch, value is seconds since the epoch, a date such as '2023-01-20' (UTC) or None
+
+    None is returned as None.
+    """
+    if value is None:
+        return None
+
+    if type(value) in [int, float]:
+        return int(value)
+
+    timestamp = pd.Timestamp(value)
+
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.tz_localize('UTC')
+
+    return int(timestamp.timestamp())
+
+class CandleArchive():
+    def __init__(self, directory='./candle_archive', interval='15second', bounds='24_7', chunk_size=CHUNK_SIZE, fetch=download_historicals):
+        """
+        On-disk archive of the candles of every crypto over any length of time, in files of chunk_size candles
+
+        Robinhood only returns one span of candles per request, so update() adds the latest span to the archive and
+        repeated updates build up months or years of history. Candles are stored by time: the file of a crypto that
+        starts at time s holds the candles from s up to s + chunk_size * interval seconds, so the files of different cryptos
+        cover the same times. iterate() reads one file at a time.
+
+        fetch(crypto_symbol, interval, span, bounds) returns data points in the format of rh.crypto.get_crypto_historicals()
+        """
+        assert interval in INTERVALS and chunk_size >= 1
+
+        self.directory = directory
+        self.interval = interval
+        self.bounds = bounds
+        self.chunk_size = chunk_size
+        self.fetch = fetch
+
+        self.chunk_seconds = chunk_size * INTERVALS[interval]
+
+    def __repr__(self):
+        return 'CandleArchive(directory:' + self.directory + ', interval:' + self.interval + ', bounds:' + self.bounds + ', chunk_size:' + str(self.chunk_size) + ')'
+
+    def get_path(self, crypto_symbol):
+        """
+        Returns the directory of the files of crypto_symbol
+        """
+        return os.path.join(self.directory, '_'.join([crypto_symbol, self.interval, self.bounds]))
+
+    def get_chunk_start(self, time):
+        """
+        Returns the start of the file that holds the candle that begins at time (seconds since the epoch)
+        """
+        return (time // self.chunk_seconds) * self.chunk_seconds
+
+    def get_chunk_starts(self, crypto_symbol):
+        """
+        Returns the starts of every file of crypto_symbol from the oldest to the newest
+        """
+        try:
+            names = os.listdir(self.get_path(crypto_symbol))
+        except FileNotFoundError:
+            return []
+
+        return sorted(int(name[:-len('.npz')]) for name in names if name.endswith('.npz'))
+
+    def read_chunk(self, crypto_symbol, chunk_start):
+        """
+        Returns times, columns (see candles.parse_historicals()) of the file of crypto_symbol that starts at chunk_start
+
+        Both are empty if there is no such file.
+        """
+        try:
+            with np.load(os.path.join(self.get_path(crypto_symbol), str(chunk_start) + '.npz')) as data:
+                return data['begins_at'], {field: data[field] for field in FIELDS}
+        except FileNotFoundError:
+            return np.zeros(0, dtype=np.int64), {field: np.zeros(0, dtype=np.float64) for field in FIELDS}
+
+    def write_chunk(self, crypto_symbol, chunk_start, times, columns):
+        """
+        Writes the file of crypto_symbol that starts at chunk_start, replacing it at once so that it is never partially written
+        """
+        path = self.get_path(crypto_symbol)
+
+        os.makedirs(path, exist_ok=True)
+
+        temporary_path = os.path.join(path, str(chunk_start) + '.tmp' + str(os.getpid()))
+
+        with open(temporary_path, 'wb') as file:
+            np.savez(file, begins_at=times, **columns)
+
+        os.replace(temporary_path, os.path.join(path, str(chunk_start) + '.npz'))
+
+    def write(self, crypto_symbol, times, columns):
+        """
+        Adds candles (see candles.parse_historicals()) of crypto_symbol to the archive
+
+        Candles that are already in the archive are replaced, since the stored candle may not have been complete.
+        Returns the number of candles that were new.
+        """
+        times = np.asarray(times, dtype=np.int64)
+
+        new = 0
+
+        for chunk_start in np.unique(self.get_chunk_start(times)).tolist():
+            in_chunk = self.get_chunk_start(times) == chunk_start
+
+            stored_times, stored_columns = self.read_chunk(crypto_symbol, chunk_start)
+
+            all_times = np.concatenate([times[in_chunk], stored_times])
+
+            # np.unique keeps the first of equal times, which is the newly written candle
+            merged_times, index = np.unique(all_times, return_index=True)
+
+            merged_columns = {field: np.concatenate([np.asarray(columns[field], dtype=np.float64)[in_chunk], stored_columns[field]])[index] for field in FIELDS}
+
+            new += len(merged_times) - len(stored_times)
+
+            self.write_chunk(crypto_symbol, chunk_start, merged_times, merged_columns)
+
+        return new
+
+    def update(self, crypto_symbol, span):
+        """
+        Downloads the latest span of candles of crypto_symbol and adds them to the archive, returns the number of new candles
+        """
+        return self.write(crypto_symbol, *parse_historicals(self.fetch(crypto_symbol, self.interval, span, self.bounds)))
+
+    def iterate(self, crypto_symbol, start=None, end=None):
+        """
+        Yields (chunk_start, times, columns) for every file of crypto_symbol from the oldest to the newest
+
+        Only the candles that begin at or after start and before end (seconds since the epoch, None for no limit) are yielded.
+        """
+        for chunk_start in self.get_chunk_starts(crypto_symbol):
+            if end is not None and chunk_start >= end:
+                return
+
+            if start is not None and chunk_start + self.chunk_seconds <= start:
+                continue
+
+            times, columns = self.read_chunk(crypto_symbol, chunk_start)
+
+            selected = np.ones(len(times), dtype=bool)
+
+            if start is not None:
+                selected &= times >= start
+
+            if end is not None:
+                selected &= times < end
+
+            if selected.any():
+                yield chunk_start, times[selected], {field: values[selected] for field, values in columns.items()}
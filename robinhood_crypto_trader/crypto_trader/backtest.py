@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import math
+import numpy as np
+import pandas as pd
+
+from robinhood_crypto_trader.crypto_trader import indicators
+from robinhood_crypto_trader.crypto_trader.candles import FIELDS
+from robinhood_crypto_trader.crypto_trader.strategy import HOLD, BUY, SELL, get_strategy
+from robinhood_crypto_trader.crypto_trader.ticks import CASH_PRECISION, TickTable, to_ticks, from_ticks, divide
+
+# Default arguments of the builtin trade functions
+BOLL_ARGUMENTS = [20, 2]
+MACD_RSI_ARGUMENTS = [14, -16, 70, 30, 12, 26, 9, -34]
+
+# Outcomes of a simulated trade, the index of an outcome is the code stored by Backtester
+OUTCOMES = ['HOLD', 'SIMULATION BUY', 'UNABLE TO BUY (BOUGHT PRICE)', 'UNABLE TO BUY (NOT ENOUGH CASH)', 'SIMULATION SELL', 'UNABLE TO SELL (BOUGHT PRICE)', 'UNABLE TO SELL (NOT ENOUGH HOLDINGS)']
+
+# The number of windows that are evaluated at once by macd_rsi_signals()
+WINDOW_CHUNK = 8192
+
+# The number of bars that are valued at once by Backtester.simulate()
+BAR_CHUNK = 4096
+
+def round_down_to_2(value):
+    """
+    Converts a float to two decimal places and rounds down
+
+    E.g.
+    26.537 -> 26.53
+    26.531 -> 26.53
+    -26.539 -> -26.53
+    """
+    if value < 0:
+        return math.ceil(value * 100)/100.0
+    else:
+        return math.floor(value * 100)/100.0
+
+def boll_signals(prices, period=20, std_width=2):
+    """
+    Returns the signal of Trader.boll at every bar of prices using only the prices up to and including that bar
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+
+    signals = np.zeros(prices.shape, dtype=np.int8)
+
+    if prices.shape[-1] < period:
+        return signals
+
+    moving_average, upper_band, lower_band = indicators.bollinger(prices, period, std_width)
+
+    # Comparisons with NaN are False so bars without a full window are left as HOLD
+    signals[upper_band < prices] = SELL
+    signals[lower_band > prices] = BUY
+
+    return signals
+
+def macd_rsi_signals(prices, rsi_period=14, rsi_index=-16, rsi_sell_level=70, rsi_buy_level=30, macd_fast_period=12, macd_slow_period=26, macd_signal_period=9, macd_index=-34):
+    """
+    Returns the signal of Trader.macd_rsi at every bar of prices using only the prices up to and including that bar
+
+    The MACD of Trader.macd_rsi is seeded at the start of its window, so it is computed for every window of -macd_index prices at once.
+    """
+    assert rsi_index < 0 and macd_index < 0
+
+    assert -rsi_index == rsi_period + 2
+    assert -macd_index == max(macd_fast_period, macd_slow_period) + macd_signal_period - 1
+
+    prices = np.asarray(prices, dtype=np.float64)
+
+    signals = np.zeros(len(prices), dtype=np.int8)
+
+    window = -macd_index
+
+    if len(prices) < max(window, -rsi_index):
+        return signals
+
+    # The RSI of Trader.macd_rsi ends one price before the latest price
+    rsi = np.full(len(prices), np.nan)
+    rsi[1:] = indicators.rsi(prices, rsi_period)[:-1]
+
+    rsi_signals = np.zeros(len(prices), dtype=np.int8)
+    rsi_signals[rsi > rsi_sell_level] = SELL
+    rsi_signals[rsi < rsi_buy_level] = BUY
+
+    macd_signals = np.zeros(len(prices), dtype=np.int8)
+
+    windows = np.lib.stride_tricks.sliding_window_view(prices, window)
+
+    for start in range(0, len(windows), WINDOW_CHUNK):
+        macd, signal = indicators.macd(windows[start:start+WINDOW_CHUNK], macd_fast_period, macd_slow_period, macd_signal_period)
+
+        difference = macd[:, -1] - signal[:, -1]
+
+        bars = slice(window - 1 + start, window - 1 + start + len(difference))
+
+        macd_signals[bars] = np.where(difference > 0, SELL, np.where(difference < 0, BUY, HOLD))
+
+    signals[(rsi_signals == BUY) & (macd_signals == BUY)] = BUY
+    signals[(rsi_signals == SELL) & (macd_signals == SELL)] = SELL
+
+    return signals
+
+def compute_signals(determine_trade_function, arguments, prices):
+    """
+    Returns the signals of the trade function named determine_trade_function at every bar of prices
+
+    Trade functions other than 'boll' and 'macd_rsi' always HOLD, strategies (see strategy.py) are computed by Backtester.
+    """
+    if determine_trade_function == 'boll':
+        return boll_signals(prices, *(arguments if arguments != [] else BOLL_ARGUMENTS))
+    elif determine_trade_function == 'macd_rsi':
+        return macd_rsi_signals(prices, *(arguments if arguments != [] else MACD_RSI_ARGUMENTS))
+    else:
+        return np.zeros(len(prices), dtype=np.int8)
+
+class Backtester():
+    def __init__(self, config, candles, crypto_meta_data, start_index=None):
+        """
+        Backtests a trader configuration over candles that are already downloaded
+
+        The signals of every bar are computed once up front and then the cash and holdings of every crypto are
+        simulated together with the same rules as Trader.run in 'backtest' mode, see simulate().
+
+        config is a Trader configuration
+        candles = {'crypto1': (times, columns), 'crypto2': (times, columns)} as returned by candles.parse_historicals()
+        crypto_meta_data = {'crypto1': rh.crypto.get_crypto_info('crypto1'), 'crypto2': rh.crypto.get_crypto_info('crypto2')}
+        start_index is the first bar that is traded, by default the first bar with enough data for the trade function
+        """
+        self.configure(config, crypto_meta_data, start_index)
+
+        self.load(candles)
+
+        self.reset()
+
+    def __repr__(self):
+        return 'Backtester(crypto:' + str(self.crypto) + ', determine_trade_function:' + str(self.determine_trade_func) + ', bars:' + str(self.number_of_bars) + ')'
+
+    def configure(self, config, crypto_meta_data, start_index=None):
+        """
+        Takes the trade function, trading rules and increments of the cryptos from config and crypto_meta_data, see __init__()
+        """
+        self.crypto = config['crypto']
+        self.strategy = get_strategy(config['determine_trade_function'])
+
+        if self.strategy is not None:
+            self.determine_trade_func = self.strategy.name
+        else:
+            self.determine_trade_func = config['determine_trade_function']
+
+        self.builtin_trade_function_arguments = config.get('builtin_trade_function_arguments', [])
+
+        self.initial_capital = round(config['cash'], 2)
+        self.cash_factor = config['cash_factor']
+        self.holdings_factor = config['holdings_factor']
+        self.loss_threshold = config['loss_threshold']
+        self.loss_percentage = config['loss_percentage']
+        self.only_sell_above_bought = config['only_sell_above_average_bought_price']
+        self.only_buy_below_bought = config['only_buy_below_average_bought_price']
+
+        if start_index is None:
+            if self.determine_trade_func == 'boll':
+                start_index = 19
+            elif self.determine_trade_func == 'macd_rsi':
+                start_index = 33
+            elif self.strategy is not None:
+                start_index = config['backtest'].get('index', self.strategy.lookback - 1)
+            else:
+                start_index = config['backtest']['index']
+
+        self.start_index = start_index
+
+        self.ticks = TickTable({crypto_name: crypto_meta_data[crypto_name] for crypto_name in self.crypto})
+
+        self.price_precision = self.ticks.price_precision
+        self.quantity_precision = self.ticks.quantity_precision
+
+        # Quantity increments per unit of every crypto and the factors that turn quantity ticks times price ticks into cents,
+        # like rescale(), see make_trades()
+        self.quantity_scale = [10.0 ** self.quantity_precision[crypto_name] for crypto_name in self.crypto]
+        self.notional_multiplier = [10 ** max(CASH_PRECISION - self.price_precision[crypto_name] - self.quantity_precision[crypto_name], 0) for crypto_name in self.crypto]
+        self.notional_divisor = [10 ** max(self.price_precision[crypto_name] + self.quantity_precision[crypto_name] - CASH_PRECISION, 0) for crypto_name in self.crypto]
+
+    def load(self, candles):
+        """
+        Takes the bars of candles (see __init__()) and computes the signal of every crypto at every bar
+        """
+        # Every crypto is traded on the bars of the first crypto
+        self.times = candles[self.crypto[0]][0]
+
+        self.number_of_bars = min(len(candles[crypto_name][0]) for crypto_name in self.crypto)
+
+        self.closes = np.array([candles[crypto_name][1]['close_price'][:self.number_of_bars] for crypto_name in self.crypto])
+
+        if self.strategy is not None:
+            ohlcv = {'crypto': list(self.crypto), 'begins_at': np.array([candles[crypto_name][0][:self.number_of_bars] for crypto_name in self.crypto], dtype=np.int64)}
+
+            for field in [field for field in FIELDS if field in candles[self.crypto[0]][1]]:
+                ohlcv[field] = np.array([candles[crypto_name][1][field][:self.number_of_bars] for crypto_name in self.crypto], dtype=np.float64)
+        else:
+            ohlcv = {'close_price': self.closes}
+
+        self.signals = self.get_signals(ohlcv)
+
+    def get_signals(self, ohlcv):
+        """
+        Returns the signal of every crypto at every bar of ohlcv as an array of shape (cryptos, bars)
+
+        ohlcv has arrays of shape (cryptos, bars) like the argument of Strategy.signals(), the builtin trade functions only use 'close_price'.
+        """
+        if self.strategy is not None:
+            # Every crypto is passed to the strategy at once, like Trader does every iteration
+            signals = np.asarray(self.strategy.signals(ohlcv), dtype=np.int8)
+
+            assert signals.shape == ohlcv['close_price'].shape
+
+            return signals
+
+        return np.array([compute_signals(self.determine_trade_func, self.builtin_trade_function_arguments, closes) for closes in ohlcv['close_price']], dtype=np.int8).reshape(ohlcv['close_price'].shape)
+
+    def reset(self):
+        """
+        Sets the cash and holdings back to the start of the backtest
+        """
+        self.cash = self.initial_capital
+        self.holdings = {crypto_name: 0 for crypto_name in self.crypto}
+        self.bought_price = {crypto_name: 0 for crypto_name in self.crypto}
+
+        self.profit = 0.00
+        self.percent_change = 0.00
+
+        self.iterations = 0
+        self.buys = {crypto_name: 0 for crypto_name in self.crypto}
+        self.sells = {crypto_name: 0 for crypto_name in self.crypto}
+
+        # Codes of OUTCOMES and the portfolio value at the start of every bar
+        self.outcomes = np.zeros((len(self.crypto), self.number_of_bars), dtype=np.int8)
+        self.portfolio = np.full(self.number_of_bars, np.nan)
+
+        self.stopped_by_loss = False
+
+    def continue_trading(self):
+        """
+        Returns False once the loss threshold or the loss percentage has been exceeded (see Trader.continue_trading)
+        """
+        return self.profit >= -1 * self.loss_threshold and self.percent_change >= -1 * self.loss_percentage
+
+    def run(self):
+        """
+        Simulates trading every bar from self.start_index onwards and returns a summary of the result
+        """
+        self.reset()
+
+        self.simulate(self.start_index, self.number_of_bars)
+
+        return self.summary()
+
+    def make_trades(self, events, state):
+        """
+        Makes the trades of events, lists of the crypto index, signal, price and price in ticks of every event, in order
+
+        state = [cash, holdings, bought_price, buys, sells] with cash in cents and lists over the cryptos of holdings and
+        bought prices in ticks and of the numbers of buys and sells, it is updated in place. Returns the outcome of every
+        event, the change in holdings of every event and the cash after every event.
+        """
+        cash, holdings, bought_price, buys, sells = state
+
+        cash_factor, holdings_factor = self.cash_factor, self.holdings_factor
+        only_buy_below_bought, only_sell_above_bought = self.only_buy_below_bought, self.only_sell_above_bought
+        quantity_scale, notional_multiplier, notional_divisor = self.quantity_scale, self.notional_multiplier, self.notional_divisor
+
+        outcomes = []
+        changes = []
+        cash_after = []
+
+        add_outcome, add_change, add_cash = outcomes.append, changes.append, cash_after.append
+
+        for j, signal, price, price_ticks in zip(*events):
+            change = 0
+
+            if signal == BUY:
+                if cash <= 0:
+                    outcome = 3
+                elif only_buy_below_bought and bought_price[j] <= price_ticks:
+                    outcome = 2
+                else:
+                    # Rounds down to the cent like round_down_to_2()
+                    cents_to_spend = math.floor(cash * cash_factor)
+
+                    cash -= cents_to_spend
+
+                    change = round(cents_to_spend / 100 / price * quantity_scale[j])
+
+                    if holdings[j] + change != 0:
+                        bought_price[j] = divide(bought_price[j] * holdings[j] + change * price_ticks, holdings[j] + change)
+
+                    holdings[j] += change
+
+                    buys[j] += 1
+                    outcome = 1
+            else:
+                if holdings[j] <= 0:
+                    outcome = 6
+                elif only_sell_above_bought and bought_price[j] >= price_ticks:
+                    outcome = 5
+                else:
+                    change = -round(holdings[j] * holdings_factor)
+
+                    cash += divide(-change * price_ticks * notional_multiplier[j], notional_divisor[j])
+
+                    holdings[j] += change
+
+                    # Average bought price is unaffected when selling
+                    if holdings[j] == 0:
+                        bought_price[j] = 0
+
+                    sells[j] += 1
+                    outcome = 4
+
+            add_outcome(outcome)
+            add_change(change)
+            add_cash(cash)
+
+        state[0] = cash
+
+        return outcomes, changes, cash_after
+
+    def simulate(self, start, end):
+        """
+        Simulates trading the bars from start up to end of the loaded bars, continuing from the current cash and holdings
+
+        The whole portfolio is simulated at once. The trades are made for the (bar, crypto) events with a buy or sell signal
+        only, in the order of the bars and then of self.crypto like Trader.run, since each buy spends cash_factor of the cash
+        left after the trades before it. The holdings of every crypto at every bar then follow as an array of shape
+        (cryptos, bars) and the portfolio is valued at every bar at once, BAR_CHUNK bars at a time. Like Ledger, cash,
+        holdings and bought prices are kept in whole ticks (see ticks.py) so that they do not drift.
+
+        Stops early and sets self.stopped_by_loss once a loss limit is exceeded.
+        """
+        crypto = self.crypto
+
+        price_precision = np.array([self.price_precision[crypto_name] for crypto_name in crypto])
+        quantity_precision = np.array([self.quantity_precision[crypto_name] for crypto_name in crypto])
+
+        price_scale = 10.0 ** price_precision
+        quantity_scale = 10.0 ** quantity_precision
+
+        # Prices are rounded like Trader.run
+        prices = np.array([np.round(closes[start:end], precision) for precision, closes in zip(price_precision.tolist(), self.closes)]).reshape(len(crypto), max(end - start, 0))
+
+        # Every (bar, crypto) with a signal, ordered by bar and then by crypto
+        event_bars, event_cryptos = np.nonzero(self.signals[:, start:end].T)
+
+        event_signals = self.signals[event_cryptos, event_bars + start]
+        event_prices = prices[event_cryptos, event_bars]
+        event_price_ticks = np.rint(event_prices * price_scale[event_cryptos]).astype(np.int64)
+
+        # Nothing is held before the first candle of a crypto (see StreamingBacktester), where its price is NaN
+        prices[np.isnan(prices)] = 0
+
+        state = [
+            to_ticks(self.cash, CASH_PRECISION),
+            [to_ticks(self.holdings[crypto_name], self.quantity_precision[crypto_name]) for crypto_name in crypto],
+            [to_ticks(self.bought_price[crypto_name], self.price_precision[crypto_name]) for crypto_name in crypto],
+            [self.buys[crypto_name] for crypto_name in crypto],
+            [self.sells[crypto_name] for crypto_name in crypto]
+        ]
+
+        chunk_start = start
+
+        while chunk_start < end:
+            if not self.continue_trading():
+                self.stopped_by_loss = True
+
+                break
+
+            chunk_end = min(chunk_start + BAR_CHUNK, end)
+
+            first, last = np.searchsorted(event_bars, [chunk_start - start, chunk_end - start])
+
+            events = [event_cryptos[first:last].tolist(), event_signals[first:last].tolist(), event_prices[first:last].tolist(), event_price_ticks[first:last].tolist()]
+
+            saved_state = [state[0], list(state[1]), list(state[2]), list(state[3]), list(state[4])]
+
+            outcomes, changes, cash_after = self.make_trades(events, state)
+
+            bars = event_bars[first:last] - (chunk_start - start)
+
+            # Holdings before the trades of every bar of the chunk
+            holdings_changes = np.zeros((len(crypto), chunk_end - chunk_start + 1), dtype=np.int64)
+            holdings_changes[event_cryptos[first:last], bars + 1] = changes
+
+            holdings = np.array(saved_state[1], dtype=np.int64)[:, np.newaxis] + np.cumsum(holdings_changes, axis=1)[:, :-1]
+
+            chunk_prices = prices[:, chunk_start - start:chunk_end - start]
+
+            capital = np.round(np.einsum('ij,ij->j', holdings / quantity_scale[:, np.newaxis], chunk_prices), 2)
+
+            # Cash before the trades of every bar of the chunk
+            cash = np.array([saved_state[0]] + cash_after, dtype=np.int64)[np.searchsorted(bars, np.arange(chunk_end - chunk_start))]
+
+            values = cash / 100 + capital
+
+            profit = values - self.initial_capital
+            percent_change = (profit * 100) / self.initial_capital
+
+            exceeded = np.flatnonzero(~((profit >= -1 * self.loss_threshold) & (percent_change >= -1 * self.loss_percentage)))
+
+            # Trading stops after the first bar that exceeds a loss limit, the trades after it are made again without those of later bars
+            if len(exceeded) > 0 and exceeded[0] < chunk_end - chunk_start - 1:
+                chunk_end = chunk_start + int(exceeded[0]) + 1
+
+                last = first + int(np.searchsorted(bars, chunk_end - chunk_start))
+
+                state = saved_state
+
+                outcomes = self.make_trades([column[:last - first] for column in events], state)[0]
+
+            self.outcomes[event_cryptos[first:last], event_bars[first:last] + start] = outcomes
+
+            self.portfolio[chunk_start:chunk_end] = values[:chunk_end - chunk_start]
+
+            self.profit = float(profit[chunk_end - chunk_start - 1])
+            self.percent_change = float(percent_change[chunk_end - chunk_start - 1])
+
+            self.iterations += chunk_end - chunk_start
+
+            chunk_start = chunk_end
+
+        cash, holdings, bought_price, buys, sells = state
+
+        self.cash = from_ticks(cash, CASH_PRECISION)
+        self.holdings = {crypto_name: self.ticks.ticks_to_quantity(crypto_name, holdings[j]) for j, crypto_name in enumerate(crypto)}
+        self.bought_price = {crypto_name: self.ticks.ticks_to_price(crypto_name, bought_price[j]) for j, crypto_name in enumerate(crypto)}
+        self.buys = dict(zip(crypto, buys))
+        self.sells = dict(zip(crypto, sells))
+
+    def summary(self):
+        """
+        Returns a dictionary describing the result of the latest run
+        """
+        return {
+            'profit': self.profit,
+            'percent_change': self.percent_change,
+            'cash': self.cash,
+            'holdings': self.holdings,
+            'bought_price': self.bought_price,
+            'buys': sum(self.buys.values()),
+            'sells': sum(self.sells.values()),
+            'iterations': self.iterations,
+            'stopped_by_loss': self.stopped_by_loss
+        }
+
+    def to_dataframes(self):
+        """
+        Returns df_trades, df_prices for the bars that were simulated, indexed by the time of the bar
+        """
+        bars = np.flatnonzero(~np.isnan(self.portfolio))
+
+        index = pd.to_datetime(self.times[bars], unit='s', utc=True)
+
+        outcome_names = np.array(OUTCOMES)
+
+        df_trades = pd.DataFrame({crypto_name: outcome_names[self.outcomes[j, bars]] for j, crypto_name in enumerate(self.crypto)}, index=index)
+        df_prices = pd.DataFrame({crypto_name: np.round(self.closes[j, bars], self.price_precision[crypto_name]) for j, crypto_name in enumerate(self.crypto)}, index=index)
+
+        return df_trades, df_prices
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import io
+import sys
+import json
+import argparse
+import platform
+import contextlib
+import numpy as np
+import pandas as pd
+import datetime as dt
+import time as t
+
+from robinhood_crypto_trader.crypto_trader import backtest
+from robinhood_crypto_trader.crypto_trader.backtest import Backtester
+from robinhood_crypto_trader.crypto_trader.candles import CandleStore
+
+# Benchmarks that can be selected with --benchmarks, see run_benchmarks()
+BENCHMARKS = ['boll', 'macd_rsi', 'boll_signals', 'macd_rsi_signals', 'determine_trade', 'backtest', 'live_iteration']
+
+# Spans of the live benchmarks and their number of 15 second candles
+LIVE_SPANS = {'hour': 240, 'day': 5760, 'week': 40320}
+
+META_DATA = {'min_order_price_increment': '0.010000000000000000', 'min_order_quantity_increment': '0.000001000000000000'}
+
+def make_symbols(number_of_symbols):
+    """
+    Returns number_of_symbols made up crypto symbols, e.g. ['S000', 'S001']
+    """
+    return ['S' + str(i).zfill(3) for i in range(number_of_symbols)]
+
+def make_candles(symbols, number_of_bars, seed=0):
+    """
+    Returns synthetic 15 second candles of every symbol in the format of Backtester, {'S000': (times, columns)}
+    """
+    rng = np.random.default_rng(seed)
+
+    times = 1674251040 + 15 * np.arange(number_of_bars, dtype=np.int64)
+
+    candles = {}
+
+    for symbol in symbols:
+        closes = rng.uniform(1, 30000) * np.exp(np.cumsum(rng.normal(0, 0.002, number_of_bars)))
+
+        opens = np.concatenate([[closes[0]], closes[:-1]])
+
+        candles[symbol] = (times, {
+            'open_price': opens,
+            'close_price': closes,
+            'high_price': np.maximum(opens, closes),
+            'low_price': np.minimum(opens, closes),
+            'volume': np.zeros(number_of_bars)
+        })
+
+    return candles
+
+def make_config(symbols, determine_trade_function='boll', mode='backtest', span='hour', shards=1):
+    """
+    Returns a Trader configuration that trades symbols against the simulated broker without latency or errors
+    """
+    return {
+        'crypto': symbols,
+        'username': 'benchmark',
+        'password': 'benchmark',
+        'days_to_run': 1,
+        'export_csv': False,
+        'plot_crypto': False,
+        'plot_portfolio': False,
+        'mode': mode,
+        'backtest': {'interval': '15second', 'span': span, 'bounds': '24_7', 'index': 33},
+        'trader': {'interval': '15second', 'span': span, 'bounds': '24_7'},
+        'determine_trade_function': determine_trade_function,
+        'builtin_trade_function_arguments': [],
+        'cash': 2000,
+        'use_cash': True,
+        'loss_threshold': 1000000.00,
+        'loss_percentage': 100,
+        'holdings_factor': 0.20,
+        'cash_factor': 0.20,
+        'buy_order_type': 'market',
+        'sell_order_type': 'market',
+        'only_sell_above_average_bought_price': False,
+        'only_buy_below_average_bought_price': False,
+        'broker': 'simulated',
+        'simulation': {'latency': 0.0, 'error_rate': 0.0, 'seed': 0},
+        'shards': shards
+    }
+
+def measure(function, repeat):
+    """
+    Calls function() repeat times with its output hidden and returns the runtime of every call in seconds
+    """
+    runtimes = []
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            start = t.perf_counter()
+
+            function()
+
+            runtimes.append(t.perf_counter() - start)
+
+    return runtimes
+
+def summarize(benchmark, symbols, bars, runtimes, calls=1):
+    """
+    Returns the result of one benchmark, every runtime is in seconds and per_call divides the median by calls
+    """
+    runtimes = np.array(runtimes)
+
+    return {
+        'benchmark': benchmark,
+        'symbols': symbols,
+        'bars': bars,
+        'repeat': len(runtimes),
+        'min': float(runtimes.min()),
+        'median': float(np.median(runtimes)),
+        'mean': float(runtimes.mean()),
+        'p95': float(np.percentile(runtimes, 95)),
+        'per_call': float(np.median(runtimes)) / calls
+    }
+
+def benchmark_trade_function(name, symbols, bars, repeat):
+    """
+    Times Trader.boll or Trader.macd_rsi deciding the latest candle of every symbol, as the live loop does
+    """
+    from robinhood_crypto_trader.crypto_trader.trader import Trader
+
+    candles = make_candles(make_symbols(symbols), bars)
+
+    # The trade functions only use the arguments of the trader and, for boll, the bands kept by its candle stores
+    trader = Trader.__new__(Trader)
+    trader.builtin_trade_function_arguments = []
+    trader.candles = {}
+
+    for symbol, (times, columns) in candles.items():
+        trader.candles[symbol] = CandleStore(symbol, '15second', 'hour', '24_7')
+        trader.candles[symbol].add_bands(*backtest.BOLL_ARGUMENTS)
+        trader.candles[symbol].append_arrays(times, columns)
+
+    function = getattr(trader, name)
+
+    runtimes = measure(lambda: [function(symbol, times, columns['close_price']) for symbol, (times, columns) in candles.items()], repeat)
+
+    return summarize(name, symbols, bars, runtimes, symbols)
+
+def benchmark_signals(name, symbols, bars, repeat):
+    """
+    Times backtest.boll_signals or backtest.macd_rsi_signals over the whole history of every symbol
+    """
+    function = getattr(backtest, name)
+
+    candles = make_candles(make_symbols(symbols), bars)
+
+    runtimes = measure(lambda: [function(columns['close_price']) for times, columns in candles.values()], repeat)
+
+    return summarize(name, symbols, bars, runtimes, symbols)
+
+def benchmark_backtest(symbols, bars, repeat, determine_trade_function='boll'):
+    """
+    Times a full backtest, signals and simulation, over synthetic candles
+    """
+    crypto = make_symbols(symbols)
+
+    config = make_config(crypto, determine_trade_function)
+    candles = make_candles(crypto, bars)
+    crypto_meta_data = {symbol: META_DATA for symbol in crypto}
+
+    runtimes = measure(lambda: Backtester(config, candles, crypto_meta_data).run(), repeat)
+
+    return summarize('backtest', symbols, bars, runtimes)
+
+def make_trader(symbols, span, determine_trade_function='boll', shards=1):
+    """
+    Returns a safelive Trader of symbols against the simulated broker with its candles loaded
+    """
+    from robinhood_crypto_trader.crypto_trader.trader import Trader
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        return Trader(make_config(make_symbols(symbols), determine_trade_function, 'safelive', span, shards))
+
+def benchmark_determine_trade(symbols, span, repeat, trader=None):
+    """
+    Times Trader.determine_trade for every symbol on the candles of span
+    """
+    if trader is None:
+        trader = make_trader(symbols, span)
+
+    runtimes = measure(lambda: [trader.determine_trade(symbol) for symbol in trader.crypto], repeat)
+
+    return summarize('determine_trade', symbols, LIVE_SPANS[span], runtimes, symbols)
+
+def benchmark_live_iteration(symbols, span, repeat, trader=None):
+    """
+    Times whole iterations of the live loop (quotes, candles, account, trades, journal and output) without waiting
+    """
+    if trader is None:
+        trader = make_trader(symbols, span)
+
+    def iteration():
+        trader.iteration_runtime_start = t.time()
+
+        trader.quotes.new_iteration()
+        trader.download_iteration()
+        trader.run_iteration()
+
+        trader.iteration_runtime_end = t.time()
+
+        trader.update_average_iteration_runtime()
+
+        trader.iteration_number += 1
+
+    return summarize('live_iteration', symbols, LIVE_SPANS[span], measure(iteration, repeat))
+
+def run_benchmarks(symbol_counts, bar_counts, spans, benchmarks=BENCHMARKS, repeat=5, shards=1):
+    """
+    Runs every benchmark of benchmarks for every number of symbols and history length and returns their results
+
+    bar_counts are the history lengths of the benchmarks on synthetic candles, spans are the spans (LIVE_SPANS)
+    of the benchmarks on a Trader against the simulated broker, which runs shards worker processes.
+    """
+    results = []
+
+    for symbols in symbol_counts:
+        for bars in bar_counts:
+            for name in ['boll', 'macd_rsi']:
+                if name in benchmarks:
+                    results.append(benchmark_trade_function(name, symbols, bars, repeat))
+
+            for name in ['boll_signals', 'macd_rsi_signals']:
+                if name in benchmarks:
+                    results.append(benchmark_signals(name, symbols, bars, repeat))
+
+            if 'backtest' in benchmarks:
+                results.append(benchmark_backtest(symbols, bars, repeat))
+
+        for span in spans:
+            if 'determine_trade' not in benchmarks and 'live_iteration' not in benchmarks:
+                break
+
+            trader = make_trader(symbols, span, shards=shards)
+
+            # Sharded traders decide the trades in their workers, which is part of live_iteration
+            if 'determine_trade' in benchmarks and shards == 1:
+                results.append(benchmark_determine_trade(symbols, span, repeat, trader))
+
+            if 'live_iteration' in benchmarks:
+                results.append(benchmark_live_iteration(symbols, span, repeat, trader))
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                trader.logout()
+
+        for result in results:
+            if result['symbols'] == symbols:
+                print('{:<18}{:>8} symbols{:>8} bars{:>12.6f} s median{:>12.6f} s per call'.format(result['benchmark'], result['symbols'], result['bars'], result['median'], result['per_call']))
+
+    return results
+
+def get_environment():
+    """
+    Returns the versions and machine that the benchmarks ran on
+    """
+    try:
+        from importlib.metadata import version
+
+        package_version = version('robinhood_crypto_trader')
+    except Exception:
+        package_version = None
+
+    return {
+        'package': package_version,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'system': platform.system(),
+        'time': dt.datetime.now(dt.timezone.utc).isoformat(timespec='seconds')
+    }
+
+def compare(old_results, new_results):
+    """
+    Returns a DataFrame of the median runtimes of the benchmarks in both results and the speedup of new over old
+    """
+    key = ['benchmark', 'symbols', 'bars']
+
+    old = pd.DataFrame(old_results['results'])[key + ['median']]
+    new = pd.DataFrame(new_results['results'])[key + ['median']]
+
+    table = old.merge(new, on=key, suffixes=('_old', '_new'))
+    table['speedup'] = table['median_old'] / table['median_new']
+
+    return table
+
+def main(argv=None):
+    """
+    Runs the benchmarks from the command line and writes their results as JSON
+
+    E.g. python -m robinhood_crypto_trader.crypto_trader.benchmark --symbols 1 10 100 500 --output benchmark.json
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the indicators, backtests and live loop on synthetic data')
+    parser.add_argument('--symbols', type=int, nargs='+', default=[1, 10, 100, 500], help='numbers of symbols')
+    parser.add_argument('--bars', type=int, nargs='+', default=[1000, 10000], help='history lengths of the synthetic candles')
+    parser.add_argument('--spans', nargs='+', default=['hour', 'day'], choices=list(LIVE_SPANS), help='spans of the live benchmarks')
+    parser.add_argument('--benchmarks', nargs='+', default=BENCHMARKS, choices=BENCHMARKS, help='benchmarks to run')
+    parser.add_argument('--repeat', type=int, default=5, help='number of times every benchmark is run')
+    parser.add_argument('--shards', type=int, default=1, help='number of worker processes of the live benchmarks')
+    parser.add_argument('--output', default=None, help='JSON file to write the results to')
+    parser.add_argument('--compare', default=None, help='JSON file of earlier results to compare with')
+
+    args = parser.parse_args(argv)
+
+    results = {'environment': get_environment(), 'results': run_benchmarks(args.symbols, args.bars, args.spans, args.benchmarks, args.repeat, args.shards)}
+
+    if args.output is not None:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+    if args.compare is not None:
+        with open(args.compare) as file:
+            print(compare(json.load(file), results).to_string(index=False))
+
+    return results
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,633 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import copy
+import zlib
+import threading
+import numpy as np
+import datetime as dt
+import time as t
+import robin_stocks.robinhood as rh
+
+from robinhood_crypto_trader.crypto_trader.candles import SPANS, INTERVALS
+from robinhood_crypto_trader.crypto_trader.order import iterate_order_info_pages
+from robinhood_crypto_trader.crypto_trader.scheduler import WEEK_OFFSET
+
+# Simulated prices move once every STEP seconds, the shortest interval of the historicals
+STEP = 15
+
+# The number of steps of a simulated price that are generated at once
+BLOCK = 4096
+
+def get_broker(config):
+    """
+    Returns the broker of config['broker'], which is 'robinhood' (default), 'simulated' or a broker object
+
+    A 'simulated' broker is created with config['simulation'] as keyword arguments, see SimulatedBroker.
+    """
+    broker = config.get('broker', 'robinhood')
+
+    if broker == 'robinhood':
+        return RobinhoodBroker()
+    elif broker == 'simulated':
+        return SimulatedBroker(config['crypto'], **config.get('simulation', {}))
+
+    assert not isinstance(broker, str), 'unknown broker ' + broker
+
+    return broker
+
+def format_time(seconds, timespec='seconds'):
+    """
+    Returns seconds since the epoch as a UTC time in the format of Robinhood, e.g. '2023-01-20T21:44:00Z'
+    """
+    text = dt.datetime.fromtimestamp(seconds, dt.timezone.utc).isoformat(timespec=timespec)
+
+    if timespec == 'seconds':
+        return text.replace('+00:00', 'Z')
+
+    return text
+
+class RobinhoodBroker():
+    def __init__(self):
+        """
+        Every request that the trader makes to Robinhood, made with robin_stocks
+
+        The methods return the same data as the robin_stocks functions of the same name.
+        """
+        pass
+
+    def __repr__(self):
+        return 'RobinhoodBroker()'
+
+    def login(self, username, password, expires_in):
+        rh.authentication.login(username=username, password=password, expiresIn=expires_in, scope='internal', by_sms=True, store_session=False)
+
+    def logout(self):
+        rh.authentication.logout()
+
+    def get_session(self):
+        """
+        Returns the login session, which resume_session() uses to make requests in another process without logging in again
+        """
+        return {'Authorization': rh.helper.SESSION.headers.get('Authorization')}
+
+    def resume_session(self, session):
+        """
+        Makes requests with a session returned by get_session()
+        """
+        if session is not None and session.get('Authorization') is not None:
+            rh.helper.update_session('Authorization', session['Authorization'])
+            rh.helper.set_login_state(True)
+
+    def get_crypto_currency_pairs(self):
+        return rh.crypto.get_crypto_currency_pairs()
+
+    def get_crypto_info(self, crypto_symbol):
+        return rh.crypto.get_crypto_info(crypto_symbol)
+
+    def get_crypto_id(self, crypto_symbol):
+        return rh.crypto.get_crypto_id(crypto_symbol)
+
+    def get_crypto_quote(self, crypto_symbol):
+        return rh.crypto.get_crypto_quote(crypto_symbol)
+
+    def get_crypto_quote_from_id(self, crypto_id):
+        return rh.crypto.get_crypto_quote_from_id(crypto_id)
+
+    def get_crypto_historicals(self, crypto_symbol, interval, span, bounds):
+        return rh.crypto.get_crypto_historicals(crypto_symbol, interval=interval, span=span, bounds=bounds)
+
+    def get_crypto_positions(self):
+        return rh.crypto.get_crypto_positions()
+
+    def build_user_profile(self):
+        return rh.account.build_user_profile()
+
+    def order_buy_crypto_by_price(self, crypto_symbol, amount_in_dollars):
+        return rh.orders.order_buy_crypto_by_price(symbol=crypto_symbol, amountInDollars=amount_in_dollars, timeInForce='gtc', jsonify=True)
+
+    def order_buy_crypto_limit_by_price(self, crypto_symbol, amount_in_dollars, limit_price):
+        return rh.orders.order_buy_crypto_limit_by_price(symbol=crypto_symbol, amountInDollars=amount_in_dollars, limitPrice=limit_price, timeInForce='gtc', jsonify=True)
+
+    def order_sell_crypto_by_quantity(self, crypto_symbol, quantity):
+        return rh.orders.order_sell_crypto_by_quantity(symbol=crypto_symbol, quantity=quantity, timeInForce='gtc', jsonify=True)
+
+    def order_sell_crypto_limit(self, crypto_symbol, quantity, limit_price):
+        return rh.orders.order_sell_crypto_limit(symbol=crypto_symbol, quantity=quantity, limitPrice=limit_price, timeInForce='gtc', jsonify=True)
+
+    def get_crypto_order_info(self, order_id):
+        return rh.orders.get_crypto_order_info(order_id)
+
+    def iterate_order_info_pages(self, since=None):
+        return iterate_order_info_pages(since)
+
+class SimulatedBroker():
+    def __init__(self, crypto=None, cash=10000.00, latency=0.0, error_rate=0.0, seed=0, volatility=0.002, spread=0.001, fill_delay=0.0, page_size=100, clock=t.time, sleep=t.sleep):
+        """
+        A local stand-in for Robinhood with simulated prices, account and orders, so the trader can run without an account
+
+        Every method returns data in the format of the robin_stocks function of the same name (see RobinhoodBroker).
+        Any crypto symbol can be traded. Its price is a random walk that moves every STEP seconds of clock() and is
+        the same for the same seed, so historicals and quotes agree with each other. bounds are ignored (always '24_7').
+
+        latency is the number of seconds every request takes, or (shortest, longest) for a random latency.
+        error_rate is the probability that a request fails like a 5xx response does in robin_stocks: it returns None
+        (or [None] for lists) after printing the error.
+
+        Market orders are filled fill_delay seconds after they are placed at the ask (buy) or bid (sell) price, limit
+        orders once the price reaches the limit. Orders that need more cash or holdings than are available are rejected
+        with an error response without an id, like Robinhood does.
+        """
+        assert cash >= 0 and 0 <= error_rate <= 1 and volatility >= 0 and spread >= 0 and fill_delay >= 0 and page_size >= 1
+
+        if isinstance(latency, (int, float)):
+            latency = (latency, latency)
+
+        assert 0 <= latency[0] <= latency[1]
+
+        self.crypto = list(crypto) if crypto is not None else []
+        self.latency = tuple(latency)
+        self.error_rate = error_rate
+        self.seed = seed
+        self.volatility = volatility
+        self.spread = spread
+        self.fill_delay = fill_delay
+        self.page_size = page_size
+        self.clock = clock
+        self.sleep = sleep
+
+        # Requests can be made by many threads at once
+        self.lock = threading.Lock()
+        self.rng = np.random.default_rng(seed)
+
+        # Prices are generated in blocks of BLOCK steps counted from the block of self.origin
+        self.origin = int(clock() // STEP) // BLOCK
+
+        # self.blocks looks like {'BTC': {block: (offset, log_prices)}} where log_prices are relative to the first price
+        self.blocks = {}
+        self.start_prices = {}
+
+        self.cash = float(cash)
+        self.holdings = {}
+        self.cost_basis = {}
+
+        # Orders newest last, self.open_orders are the ids of the orders that are not final
+        self.orders = []
+        self.order_index = {}
+        self.open_orders = []
+
+        # The number of requests and failed requests by method name
+        self.requests = {}
+        self.errors = {}
+
+    def __repr__(self):
+        return 'SimulatedBroker(crypto:' + str(len(self.crypto)) + ', cash:' + str(round(self.cash, 2)) + ', orders:' + str(len(self.orders)) + ', requests:' + str(sum(self.requests.values())) + ')'
+
+    def request(self, name):
+        """
+        Waits for the latency of one request called name and returns True if it fails
+        """
+        with self.lock:
+            latency = self.rng.uniform(*self.latency) if self.latency[1] > self.latency[0] else self.latency[0]
+            failed = self.error_rate > 0 and self.rng.random() < self.error_rate
+
+            self.requests[name] = self.requests.get(name, 0) + 1
+
+            if failed:
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+        if latency > 0:
+            self.sleep(latency)
+
+        if failed:
+            print('Error in request_get: 503 Server Error: Service Unavailable for url: simulated/' + name)
+
+        return failed
+
+    def login(self, username, password, expires_in):
+        self.request('login')
+
+    def logout(self):
+        self.request('logout')
+
+    def get_session(self):
+        """
+        Returns what another simulated broker with the same seed needs to have the same prices, see RobinhoodBroker.get_session()
+        """
+        return {'origin': self.origin}
+
+    def resume_session(self, session):
+        """
+        Makes the prices the same as those of the simulated broker that returned session from get_session()
+        """
+        if session is not None and session.get('origin', self.origin) != self.origin:
+            with self.lock:
+                self.origin = session['origin']
+                self.blocks = {}
+
+    def get_start_price(self, crypto_symbol):
+        """
+        Returns the price of crypto_symbol at the start of block self.origin, between $0.10 and $30,000
+        """
+        if crypto_symbol not in self.start_prices:
+            rng = np.random.default_rng([self.seed, zlib.crc32(crypto_symbol.encode())])
+
+            self.start_prices[crypto_symbol] = float(10 ** rng.uniform(-1, 4.5))
+
+        return self.start_prices[crypto_symbol]
+
+    def get_block(self, crypto_symbol, block):
+        """
+        Returns offset, log_prices of a block of steps of crypto_symbol, where offset is the log price of the block's first step
+        """
+        blocks = self.blocks.setdefault(crypto_symbol, {})
+
+        if block in blocks:
+            return blocks[block]
+
+        # Blocks are chained outwards from the block of self.origin, so every block between them is generated first
+        direction = 1 if block >= self.origin else -1
+
+        for next_block in range(self.origin, block + direction, direction):
+            if next_block in blocks:
+                continue
+
+            rng = np.random.default_rng([self.seed, zlib.crc32(crypto_symbol.encode()), next_block - self.origin + 2 ** 31])
+
+            log_prices = np.concatenate([[0.0], np.cumsum(rng.normal(0, self.volatility, BLOCK - 1))])
+
+            if next_block == self.origin:
+                offset = 0.0
+            elif direction == 1:
+                previous_offset, previous_log_prices = blocks[next_block - 1]
+
+                offset = previous_offset + previous_log_prices[-1] + rng.normal(0, self.volatility)
+            else:
+                following_offset, following_log_prices = blocks[next_block + 1]
+
+                offset = following_offset - log_prices[-1] - rng.normal(0, self.volatility)
+
+            blocks[next_block] = (offset, log_prices)
+
+        return blocks[block]
+
+    def get_prices(self, crypto_symbol, times):
+        """
+        Returns the simulated prices of crypto_symbol at times (seconds since the epoch)
+        """
+        steps = np.asarray(times, dtype=np.float64) // STEP
+
+        blocks, indices = np.divmod(steps.astype(np.int64), BLOCK)
+
+        log_prices = np.empty(len(steps), dtype=np.float64)
+
+        for block in np.unique(blocks):
+            offset, block_log_prices = self.get_block(crypto_symbol, int(block))
+
+            mask = blocks == block
+
+            log_prices[mask] = offset + block_log_prices[indices[mask]]
+
+        return self.get_start_price(crypto_symbol) * np.exp(log_prices)
+
+    def get_price(self, crypto_symbol):
+        """
+        Returns the simulated price of crypto_symbol now
+        """
+        with self.lock:
+            return float(self.get_prices(crypto_symbol, [self.clock()])[0])
+
+    def get_price_increment(self, crypto_symbol):
+        """
+        Returns the min_order_price_increment of crypto_symbol
+        """
+        if self.get_start_price(crypto_symbol) >= 1:
+            return '0.010000000000000000'
+
+        return '0.000001000000000000'
+
+    def get_crypto_currency_pairs(self):
+        if self.request('get_crypto_currency_pairs'):
+            return [None]
+
+        return [self.build_pair(crypto_symbol) for crypto_symbol in self.crypto]
+
+    def build_pair(self, crypto_symbol):
+        """
+        Returns the currency pair of crypto_symbol in the format of rh.crypto.get_crypto_info()
+        """
+        return {
+            'id': 'simulated-' + crypto_symbol,
+            'symbol': crypto_symbol + '-USD',
+            'name': crypto_symbol,
+            'asset_currency': {'code': crypto_symbol, 'id': 'simulated-asset-' + crypto_symbol, 'increment': '0.000001000000000000', 'name': crypto_symbol, 'type': 'cryptocurrency'},
+            'quote_currency': {'code': 'USD', 'id': 'simulated-asset-USD', 'increment': '0.010000000000000000', 'name': 'US Dollar', 'type': 'fiat'},
+            'display_only': False,
+            'max_order_size': '1000000.0000000000000000',
+            'min_order_size': '0.000001000000000000',
+            'min_order_price_increment': self.get_price_increment(crypto_symbol),
+            'min_order_quantity_increment': '0.000001000000000000',
+            'tradability': 'tradable'
+        }
+
+    def get_crypto_info(self, crypto_symbol):
+        if self.request('get_crypto_info'):
+            return None
+
+        return self.build_pair(crypto_symbol)
+
+    def get_crypto_id(self, crypto_symbol):
+        if self.request('get_crypto_id'):
+            return None
+
+        return 'simulated-' + crypto_symbol
+
+    def get_crypto_quote(self, crypto_symbol):
+        if self.request('get_crypto_quote'):
+            return None
+
+        return self.build_quote(crypto_symbol)
+
+    def get_crypto_quote_from_id(self, crypto_id):
+        if self.request('get_crypto_quote_from_id'):
+            return None
+
+        return self.build_quote(crypto_id[len('simulated-'):])
+
+    def build_quote(self, crypto_symbol):
+        """
+        Returns the quote of crypto_symbol now in the format of rh.crypto.get_crypto_quote()
+        """
+        self.update_orders()
+
+        mark_price = self.get_price(crypto_symbol)
+
+        return {
+            'ask_price': str(mark_price * (1 + self.spread / 2)),
+            'bid_price': str(mark_price * (1 - self.spread / 2)),
+            'mark_price': str(mark_price),
+            'high_price': str(mark_price),
+            'low_price': str(mark_price),
+            'open_price': str(mark_price),
+            'symbol': crypto_symbol + 'USD',
+            'id': 'simulated-' + crypto_symbol,
+            'volume': '0.000000'
+        }
+
+    def get_crypto_historicals(self, crypto_symbol, interval, span, bounds):
+        if self.request('get_crypto_historicals'):
+            return [None]
+
+        interval_seconds = INTERVALS[interval]
+
+        # Weekly candles begin on Monday
+        offset = WEEK_OFFSET if interval == 'week' else 0
+
+        now = self.clock()
+
+        number_of_candles = max(SPANS[span] // interval_seconds, 1)
+
+        # The latest candle is the one that is still open
+        last_begin = ((now - offset) // interval_seconds) * interval_seconds + offset
+
+        begins = last_begin - interval_seconds * np.arange(number_of_candles - 1, -1, -1)
+
+        # Every candle is sampled at up to 16 steps, the close of the open candle is the price now
+        samples = min(16, max(interval_seconds // STEP, 1))
+
+        sample_times = begins[:, None] + np.linspace(0, interval_seconds - STEP, samples)[None, :]
+        sample_times[-1] = np.minimum(sample_times[-1], now)
+
+        with self.lock:
+            prices = self.get_prices(crypto_symbol, sample_times.reshape(-1)).reshape(sample_times.shape)
+
+        return [{
+            'begins_at': format_time(begin),
+            'open_price': str(candle_prices[0]),
+            'close_price': str(candle_prices[-1]),
+            'high_price': str(candle_prices.max()),
+            'low_price': str(candle_prices.min()),
+            'volume': '0.000000',
+            'session': 'reg',
+            'interpolated': False,
+            'symbol': crypto_symbol + 'USD'
+        } for begin, candle_prices in zip(begins, prices)]
+
+    def get_crypto_positions(self):
+        if self.request('get_crypto_positions'):
+            return [None]
+
+        self.update_orders()
+
+        with self.lock:
+            return [{
+                'currency': {'code': crypto_symbol, 'name': crypto_symbol},
+                'quantity': str(quantity),
+                'quantity_available': str(quantity - self.get_reserved_holdings(crypto_symbol)),
+                'cost_bases': [{'direct_cost_basis': str(self.cost_basis[crypto_symbol]), 'direct_quantity': str(quantity)}]
+            } for crypto_symbol, quantity in self.holdings.items()]
+
+    def build_user_profile(self):
+        if self.request('build_user_profile'):
+            return None
+
+        self.update_orders()
+
+        with self.lock:
+            equity = self.cash + sum(quantity * float(self.get_prices(crypto_symbol, [self.clock()])[0]) for crypto_symbol, quantity in self.holdings.items())
+
+            return {'cash': str(round(self.cash - self.get_reserved_cash(), 2)), 'equity': str(round(equity, 2))}
+
+    def get_reserved_cash(self):
+        """
+        Returns the cash held by open buy orders
+        """
+        return sum(self.order_index[order_id]['_reserved'] for order_id in self.open_orders if self.order_index[order_id]['side'] == 'buy')
+
+    def get_reserved_holdings(self, crypto_symbol):
+        """
+        Returns the holdings of crypto_symbol held by open sell orders
+        """
+        return sum(self.order_index[order_id]['_reserved'] for order_id in self.open_orders if self.order_index[order_id]['side'] == 'sell' and self.order_index[order_id]['_crypto'] == crypto_symbol)
+
+    def place_order(self, name, crypto_symbol, side, order_type, amount_in_dollars=None, quantity=None, limit_price=None):
+        """
+        Places a simulated order and returns its order information, or an error response without an id
+        """
+        if self.request(name):
+            return None
+
+        self.update_orders()
+
+        with self.lock:
+            now = self.clock()
+
+            mark_price = float(self.get_prices(crypto_symbol, [now])[0])
+
+            if order_type == 'limit':
+                price = float(limit_price)
+            elif side == 'buy':
+                price = mark_price * (1 + self.spread / 2)
+            else:
+                price = mark_price * (1 - self.spread / 2)
+
+            if quantity is None:
+                quantity = round(float(amount_in_dollars) / price, 6)
+
+            if side == 'buy':
+                reserved = float(amount_in_dollars) if amount_in_dollars is not None else quantity * price
+
+                if reserved > self.cash - self.get_reserved_cash() + 0.005:
+                    return {'non_field_errors': ['Insufficient buying power.']}
+            else:
+                reserved = float(quantity)
+
+                if reserved > self.holdings.get(crypto_symbol, 0.0) - self.get_reserved_holdings(crypto_symbol) + 1e-9:
+                    return {'non_field_errors': ['Insufficient holdings.']}
+
+            order_id = 'simulated-order-' + str(len(self.orders) + 1).zfill(8)
+
+            order_info = {
+                'account_id': 'simulated-account',
+                'average_price': None,
+                'cancel_url': 'simulated/orders/' + order_id + '/cancel/',
+                'created_at': format_time(now, 'microseconds'),
+                'cumulative_quantity': '0.000000000000000000',
+                'currency_pair_id': 'simulated-' + crypto_symbol,
+                'entered_price': str(amount_in_dollars) if amount_in_dollars is not None else str(round(quantity * price, 2)),
+                'executions': [],
+                'funding_source_id': None,
+                'id': order_id,
+                'initiator_id': None,
+                'initiator_type': None,
+                'is_visible_to_user': True,
+                'last_transaction_at': None,
+                'price': str(price),
+                'quantity': str(quantity),
+                'ref_id': order_id,
+                'rounded_executed_notional': '0.00',
+                'side': side,
+                'state': 'confirmed',
+                'time_in_force': 'gtc',
+                'type': order_type,
+                'updated_at': format_time(now, 'microseconds'),
+                '_crypto': crypto_symbol,
+                '_reserved': reserved,
+                '_placed': now
+            }
+
+            self.orders.append(order_info)
+            self.order_index[order_id] = order_info
+            self.open_orders.append(order_id)
+
+        self.update_orders()
+
+        return self.get_order_copy(order_id)
+
+    def update_orders(self):
+        """
+        Fills the open orders that can be filled now
+        """
+        with self.lock:
+            if len(self.open_orders) == 0:
+                return
+
+            now = self.clock()
+
+            for order_id in list(self.open_orders):
+                order_info = self.order_index[order_id]
+
+                if now - order_info['_placed'] < self.fill_delay:
+                    continue
+
+                crypto_symbol = order_info['_crypto']
+
+                mark_price = float(self.get_prices(crypto_symbol, [now])[0])
+
+                if order_info['side'] == 'buy':
+                    price = mark_price * (1 + self.spread / 2)
+
+                    if order_info['type'] == 'limit' and price > float(order_info['price']):
+                        continue
+                else:
+                    price = mark_price * (1 - self.spread / 2)
+
+                    if order_info['type'] == 'limit' and price < float(order_info['price']):
+                        continue
+
+                quantity = float(order_info['quantity'])
+                notional = round(quantity * price, 2)
+
+                if order_info['side'] == 'buy':
+                    self.cash -= notional
+                    self.holdings[crypto_symbol] = self.holdings.get(crypto_symbol, 0.0) + quantity
+                    self.cost_basis[crypto_symbol] = self.cost_basis.get(crypto_symbol, 0.0) + notional
+                else:
+                    held = self.holdings[crypto_symbol]
+
+                    self.cash += notional
+                    self.cost_basis[crypto_symbol] *= (held - quantity) / held if held > 0 else 0.0
+                    self.holdings[crypto_symbol] = held - quantity
+
+                order_info.update({
+                    'average_price': str(price),
+                    'cancel_url': None,
+                    'cumulative_quantity': str(quantity),
+                    'executions': [{'effective_price': str(price), 'id': order_id + '-1', 'quantity': str(quantity), 'settlement_date': format_time(now)[:10], 'timestamp': format_time(now, 'microseconds')}],
+                    'last_transaction_at': format_time(now, 'microseconds'),
+                    'rounded_executed_notional': str(notional),
+                    'state': 'filled',
+                    'updated_at': format_time(now, 'microseconds'),
+                    '_reserved': 0.0
+                })
+
+                self.open_orders.remove(order_id)
+
+    def get_order_copy(self, order_id):
+        """
+        Returns the order information of order_id without the fields that only the simulation uses
+        """
+        with self.lock:
+            return {key: copy.deepcopy(value) for key, value in self.order_index[order_id].items() if not key.startswith('_')}
+
+    def order_buy_crypto_by_price(self, crypto_symbol, amount_in_dollars):
+        return self.place_order('order_buy_crypto_by_price', crypto_symbol, 'buy', 'market', amount_in_dollars=amount_in_dollars)
+
+    def order_buy_crypto_limit_by_price(self, crypto_symbol, amount_in_dollars, limit_price):
+        return self.place_order('order_buy_crypto_limit_by_price', crypto_symbol, 'buy', 'limit', amount_in_dollars=amount_in_dollars, limit_price=limit_price)
+
+    def order_sell_crypto_by_quantity(self, crypto_symbol, quantity):
+        return self.place_order('order_sell_crypto_by_quantity', crypto_symbol, 'sell', 'market', quantity=quantity)
+
+    def order_sell_crypto_limit(self, crypto_symbol, quantity, limit_price):
+        return self.place_order('order_sell_crypto_limit', crypto_symbol, 'sell', 'limit', quantity=quantity, limit_price=limit_price)
+
+    def get_crypto_order_info(self, order_id):
+        if self.request('get_crypto_order_info'):
+            return None
+
+        self.update_orders()
+
+        if order_id not in self.order_index:
+            return {'detail': 'Not found.'}
+
+        return self.get_order_copy(order_id)
+
+    def iterate_order_info_pages(self, since=None):
+        """
+        Yields the order information of the orders one page of self.page_size orders at a time, newest orders first
+
+        See order.iterate_order_info_pages() for since, the last page is [None] if a request fails.
+        """
+        self.update_orders()
+
+        with self.lock:
+            order_ids = [order_info['id'] for order_info in reversed(self.orders) if since is None or order_info['created_at'] >= since]
+
+        for start in range(0, len(order_ids), self.page_size):
+            if self.request('iterate_order_info_pages'):
+                yield [None]
+
+                return
+
+            yield [self.get_order_copy(order_id) for order_id in order_ids[start:start+self.page_size]]
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+import time as t
+import robin_stocks.robinhood as rh
+
+from robinhood_crypto_trader.crypto_trader import indicators
+
+# Columns of the historical data points from rh.crypto.get_crypto_historicals() that are stored as floats
+FIELDS = ['open_price', 'close_price', 'high_price', 'low_price', 'volume']
+
+# Spans accepted by rh.crypto.get_crypto_historicals() from shortest to longest and their length in seconds
+SPANS = {'hour': 3600, 'day': 86400, 'week': 604800, 'month': 2678400, '3month': 7948800, 'year': 31622400, '5year': 158112000}
+
+INTERVALS = {'15second': 15, '5minute': 300, '10minute': 600, 'hour': 3600, 'day': 86400, 'week': 604800}
+
+def convert_timestamps_to_epoch(timestamps):
+    """
+    Converts a list of timestamps such as '2023-01-20T21:44:00Z' to an int64 array of seconds since the epoch (UTC)
+    """
+    return np.array([str(timestamp)[:19] for timestamp in timestamps], dtype='datetime64[s]').astype(np.int64)
+
+def parse_historicals(historicals):
+    """
+    Converts the list of data points from rh.crypto.get_crypto_historicals() into arrays
+
+    Returns times, columns where times is an int64 array of the 'begins_at' epoch seconds and columns is a dictionary
+    of float64 arrays keyed by the names in FIELDS
+    """
+    historicals = [data_point for data_point in historicals if data_point is not None]
+
+    times = convert_timestamps_to_epoch([data_point['begins_at'] for data_point in historicals])
+
+    columns = {field: np.array([data_point[field] for data_point in historicals], dtype=np.float64) for field in FIELDS}
+
+    return times, columns
+
+def download_historicals(crypto_symbol, interval, span, bounds):
+    """
+    Returns the historical data points of crypto_symbol from Robinhood
+    """
+    return rh.crypto.get_crypto_historicals(crypto_symbol, interval=interval, span=span, bounds=bounds)
+
+class CandleStore():
+    def __init__(self, crypto_symbol, interval, span, bounds, fetch=download_historicals):
+        """
+        In-memory store of the candles of one cryptocurrency
+
+        The full span is downloaded once by load(). Afterwards update() only downloads the shortest span that covers
+        the time since the latest candle and appends the candles that are not stored yet. At most one span worth of
+        candles is kept.
+
+        fetch(crypto_symbol, interval, span, bounds) returns data points in the format of rh.crypto.get_crypto_historicals()
+        """
+        self.crypto_symbol = crypto_symbol
+        self.interval = interval
+        self.span = span
+        self.bounds = bounds
+        self.fetch = fetch
+
+        self.capacity = max(SPANS[span] // INTERVALS[interval], 1)
+
+        # Buffers are twice the capacity so that appending only copies the data once every capacity candles
+        self.buffer_times = np.zeros(2 * self.capacity, dtype=np.int64)
+        self.buffer_columns = {field: np.zeros(2 * self.capacity, dtype=np.float64) for field in FIELDS}
+
+        self.start = 0
+        self.end = 0
+
+        self.last_update = None
+
+        # Bollinger bands of the latest close prices that are updated as candles are appended, see add_bands()
+        self.bands = None
+
+    def __repr__(self):
+        return 'CandleStore(crypto:' + self.crypto_symbol + ', interval:' + self.interval + ', span:' + self.span + ', candles:' + str(len(self)) + ')'
+
+    def __len__(self):
+        return self.end - self.start
+
+    @property
+    def times(self):
+        """
+        Returns the 'begins_at' times of the stored candles as epoch seconds
+        """
+        return self.buffer_times[self.start:self.end]
+
+    @property
+    def close(self):
+        return self.buffer_columns['close_price'][self.start:self.end]
+
+    def column(self, field):
+        """
+        Returns the stored values of field, one of FIELDS
+        """
+        return self.buffer_columns[field][self.start:self.end]
+
+    def add_bands(self, period, std_width):
+        """
+        Keeps the Bollinger bands of the latest period close prices in self.bands (an indicators.RollingBollinger)
+
+        Every appended candle updates the bands in O(1) time, so they are not computed from the close prices again.
+        """
+        self.bands = indicators.RollingBollinger(period, std_width, self.close[-period:])
+
+    def load(self):
+        """
+        Downloads the full span and replaces the stored candles
+        """
+        self.append(self.fetch(self.crypto_symbol, self.interval, self.span, self.bounds), replace=True)
+
+        self.last_update = t.time()
+
+    def update(self):
+        """
+        Downloads the candles since the latest stored candle and appends them
+
+        Falls back to load() when the store is empty or the time since the latest candle is longer than the span.
+        """
+        if len(self) == 0:
+            self.load()
+
+            return
+
+        span = self.get_update_span(t.time() - self.times[-1])
+
+        if span == self.span:
+            self.load()
+        else:
+            self.append(self.fetch(self.crypto_symbol, self.interval, span, self.bounds))
+
+            self.last_update = t.time()
+
+    def get_update_span(self, seconds):
+        """
+        Returns the shortest span that covers seconds and is no longer than self.span
+        """
+        # Robinhood only accepts the 'extended' and 'trading' bounds with a span of 'day'
+        if self.bounds in ['extended', 'trading']:
+            return self.span
+
+        for span, span_seconds in SPANS.items():
+            if span == self.span:
+                return span
+
+            if span_seconds > INTERVALS[self.interval] and span_seconds >= seconds + INTERVALS[self.interval]:
+                return span
+
+        return self.span
+
+    def append(self, historicals, replace=False):
+        """
+        Appends the data points that begin at or after the latest stored candle
+
+        A data point with the same 'begins_at' as the latest stored candle replaces it since that candle may not have been complete.
+        If replace is True, the stored candles are replaced instead. They are kept if historicals has no data points,
+        which is what a failed request returns ([None]).
+        """
+        self.append_arrays(*parse_historicals(historicals), replace)
+
+    def append_arrays(self, times, columns, replace=False):
+        """
+        Appends candles given as arrays, times and {field: values} like parse_historicals() returns, see append()
+        """
+        if replace and len(times) > 0:
+            self.start = 0
+            self.end = 0
+
+        empty = len(self) == 0
+        replaced = False
+
+        if not empty:
+            new = times >= self.times[-1]
+
+            times = times[new]
+            columns = {field: values[new] for field, values in columns.items()}
+
+            if len(times) > 0 and times[0] == self.times[-1]:
+                self.end -= 1
+
+                replaced = True
+
+        # Only the latest self.capacity candles are kept
+        times = times[-self.capacity:]
+        columns = {field: values[-self.capacity:] for field, values in columns.items()}
+
+        count = len(times)
+
+        if self.end + count > len(self.buffer_times):
+            # Move the candles that are kept to the front of the buffers
+            keep = min(len(self), self.capacity - count)
+
+            self.buffer_times[:keep] = self.buffer_times[self.end-keep:self.end]
+
+            for field in FIELDS:
+                self.buffer_columns[field][:keep] = self.buffer_columns[field][self.end-keep:self.end]
+
+            self.start = 0
+            self.end = keep
+
+        self.buffer_times[self.end:self.end+count] = times
+
+        for field in FIELDS:
+            self.buffer_columns[field][self.end:self.end+count] = columns[field]
+
+        self.end += count
+        self.start = max(self.start, self.end - self.capacity)
+
+        if self.bands is not None and count > 0:
+            self.update_bands(columns['close_price'], empty, replaced)
+
+    def update_bands(self, closes, empty, replaced):
+        """
+        Brings self.bands up to date with the appended closes
+
+        empty is True if the store had no candles before, replaced is True if closes[0] replaced the latest stored candle.
+        """
+        if empty or len(closes) >= self.bands.period:
+            self.add_bands(self.bands.period, self.bands.std_width)
+
+            return
+
+        if replaced:
+            self.bands.replace(closes[0])
+
+            closes = closes[1:]
+
+        for close in closes:
+            self.bands.update(close)
+
+    def get_state(self):
+        """
+        Returns the stored candles and the time of the latest download, e.g. to be written to a checkpoint
+        """
+        return {'times': self.times.copy(), 'columns': {field: self.column(field).copy() for field in FIELDS}, 'last_update': self.last_update}
+
+    def set_state(self, state):
+        """
+        Replaces the stored candles with the candles of state (see get_state()) without downloading anything
+
+        The next update() only downloads the candles since the latest candle of state.
+        """
+        self.start = 0
+        self.end = 0
+
+        self.append_arrays(state['times'], state['columns'])
+
+        self.last_update = state['last_update']
+
+    def to_dataframe(self):
+        """
+        Returns the stored candles as a DataFrame with a 'begins_at' column of UTC datetimes
+        """
+        df = pd.DataFrame({field: self.column(field) for field in FIELDS})
+
+        df.insert(0, 'begins_at', pd.to_datetime(self.times, unit='s', utc=True))
+
+        return df
+
+def align(times, other_times, other_values, previous):
+    """
+    Returns the latest value of other_values at or before every time of times, like the price a trader sees at that time
+
+    other_times are the sorted times of other_values, previous is the value before other_times[0] (NaN if there is none).
+    """
+    index = np.searchsorted(other_times, times, side='right') - 1
+
+    return np.where(index >= 0, other_values[np.maximum(index, 0)] if len(other_values) > 0 else previous, previous)
+
+def stack_candles(candles, crypto_symbols, bars=None):
+    """
+    Returns the latest candles of every crypto in crypto_symbols as 2-D arrays with one row per crypto
+
+    candles = {'crypto1': CandleStore or (times, columns), 'crypto2': ...} where (times, columns) is returned by parse_historicals()
+    The candles are matched by time. The columns are the times of the first crypto at which every crypto has started,
+    up to the latest candle of the crypto that is furthest behind. Where a crypto misses the candle of one of these times
+    its latest earlier candle is used. Only the latest bars columns are returned, by default all of them.
+
+    Returns {'crypto': crypto_symbols, 'begins_at': int64 array, 'open_price': float64 array, ...} with the names of FIELDS
+    """
+    arrays = []
+
+    for crypto_symbol in crypto_symbols:
+        if isinstance(candles[crypto_symbol], CandleStore):
+            arrays.append((candles[crypto_symbol].times, {field: candles[crypto_symbol].column(field) for field in FIELDS}))
+        else:
+            arrays.append(candles[crypto_symbol])
+
+    times = np.asarray(arrays[0][0], dtype=np.int64)
+
+    if min(len(other_times) for other_times, columns in arrays) > 0:
+        earliest = max(other_times[0] for other_times, columns in arrays)
+        latest = min(other_times[-1] for other_times, columns in arrays)
+
+        times = times[(times >= earliest) & (times <= latest)]
+    else:
+        times = times[:0]
+
+    if bars is not None and bars < len(times):
+        times = times[len(times)-bars:]
+
+    ohlcv = {'crypto': list(crypto_symbols)}
+
+    ohlcv['begins_at'] = np.repeat(times[np.newaxis, :], len(arrays), axis=0)
+
+    for field in [field for field in FIELDS if field in arrays[0][1]]:
+        ohlcv[field] = np.array([align(times, other_times, np.asarray(columns[field], dtype=np.float64), np.nan) for other_times, columns in arrays], dtype=np.float64).reshape(len(arrays), len(times))
+
+    return ohlcv
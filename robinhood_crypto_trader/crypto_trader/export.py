@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import csv
+import json
+import pandas as pd
+import robin_stocks.robinhood as rh
+
+from robinhood_crypto_trader.crypto_trader.order import iterate_order_info_pages
+from robinhood_crypto_trader.crypto_trader.ledger import FINAL_STATES
+
+# Columns of the completed orders file, the same as rh.export.export_completed_crypto_orders()
+ORDER_COLUMNS = ['symbol', 'date', 'order_type', 'side', 'fees', 'quantity', 'average_price']
+
+# Columns of the journal files, one row per crypto per iteration
+JOURNAL_COLUMNS = ['time', 'crypto', 'price', 'trade']
+
+def download_pair_symbols(fetch_pairs=rh.crypto.get_crypto_currency_pairs):
+    """
+    Returns {currency_pair_id: symbol} of every crypto currency pair, e.g. {'3d961844-d360-45fc-989b-f6fca761d511': 'BTCUSD'}
+
+    fetch_pairs() returns the currency pairs in the format of rh.crypto.get_crypto_currency_pairs()
+    """
+    return {pair['id']: pair['asset_currency']['code'] + pair['quote_currency']['code'] for pair in fetch_pairs()}
+
+def write_json(path, data):
+    """
+    Writes data to path as JSON, replacing the file at once so that it is never partially written
+    """
+    temporary_path = path + '.tmp'
+
+    with open(temporary_path, 'w') as file:
+        json.dump(data, file)
+
+    os.replace(temporary_path, path)
+
+class Exporter():
+    def __init__(self, directory='./', file_name='completed_crypto_orders', fetch_pages=iterate_order_info_pages, fetch_symbols=download_pair_symbols):
+        """
+        Appends completed crypto orders and the trader's journal to files, only writing what is new since the previous export
+
+        Completed orders are appended to directory/file_name.csv. A watermark is kept in directory/file_name.watermark.json
+        so that only the pages of orders back to the previous export are downloaded. It holds the 'created_at' to resume from
+        (the oldest order that was still open or the newest order) and the ids of the orders exported since then.
+
+        Journals are appended in the same way: directory/name.watermark.json holds the time of the latest exported row of
+        the journal called name, so a restarted or resumed trader only appends the rows after it.
+
+        fetch_pages(since) yields pages of order information newest first (see order.iterate_order_info_pages)
+        fetch_symbols() returns {currency_pair_id: symbol}
+        """
+        self.directory = directory
+        self.file_name = file_name
+        self.fetch_pages = fetch_pages
+        self.fetch_symbols = fetch_symbols
+
+        self.symbols = None
+
+    def __repr__(self):
+        return 'Exporter(directory:' + self.directory + ', file_name:' + self.file_name + ')'
+
+    def get_orders_path(self):
+        """
+        Returns the path of the completed orders file
+        """
+        return os.path.join(self.directory, self.file_name + '.csv')
+
+    def get_watermark_path(self):
+        """
+        Returns the path of the watermark of the completed orders file
+        """
+        return os.path.join(self.directory, self.file_name + '.watermark.json')
+
+    def load_watermark(self):
+        """
+        Returns the watermark of the previous export, {'since': created_at or None, 'ids': {order_id: created_at}}
+        """
+        try:
+            with open(self.get_watermark_path()) as file:
+                return json.load(file)
+        except (FileNotFoundError, ValueError):
+            return {'since': None, 'ids': {}}
+
+    def export_orders(self):
+        """
+        Appends the completed orders that are not exported yet and returns the number of orders that were appended
+        """
+        os.makedirs(self.directory, exist_ok=True)
+
+        watermark = self.load_watermark()
+
+        # A file without a watermark was written by a full export and is written again from the start
+        if watermark['since'] is None and len(watermark['ids']) == 0:
+            mode = 'w'
+        else:
+            mode = 'a'
+
+        exported = watermark['ids']
+
+        new_orders = []
+        open_created_at = []
+        newest_created_at = watermark['since']
+
+        for page in self.fetch_pages(watermark['since']):
+            # A failed request ends the pages with [None], nothing is written so that the next export downloads them again
+            if None in page:
+                print('Could not download the orders: skipping the export')
+
+                return 0
+
+            for order_info in page:
+                if newest_created_at is None or order_info['created_at'] > newest_created_at:
+                    newest_created_at = order_info['created_at']
+
+                if order_info['state'] == 'filled' and order_info['cancel_url'] is None:
+                    if order_info['id'] not in exported:
+                        new_orders.append(order_info)
+                elif order_info['state'] not in FINAL_STATES:
+                    open_created_at.append(order_info['created_at'])
+
+        if len(new_orders) > 0:
+            if self.symbols is None:
+                self.symbols = self.fetch_symbols()
+
+            with open(self.get_orders_path(), mode, newline='') as file:
+                writer = csv.writer(file)
+
+                if mode == 'w' or file.tell() == 0:
+                    writer.writerow(ORDER_COLUMNS)
+
+                # Pages are newest first, the file is oldest first
+                for order_info in reversed(new_orders):
+                    writer.writerow([
+                        self.symbols.get(order_info['currency_pair_id'], order_info['currency_pair_id']),
+                        order_info['last_transaction_at'],
+                        order_info['type'],
+                        order_info['side'],
+                        order_info.get('fees', 0.0),
+                        order_info['quantity'],
+                        order_info['average_price']
+                    ])
+
+        for order_info in new_orders:
+            exported[order_info['id']] = order_info['created_at']
+
+        # The next export starts at the oldest order that can still be filled, or else at the newest order
+        if len(open_created_at) > 0:
+            since = min(open_created_at)
+        else:
+            since = newest_created_at
+
+        if since is not None:
+            exported = {order_id: created_at for order_id, created_at in exported.items() if created_at >= since}
+
+        write_json(self.get_watermark_path(), {'since': since, 'ids': exported})
+
+        return len(new_orders)
+
+    def get_journal_watermark_path(self, name):
+        """
+        Returns the path of the watermark of the journal called name
+        """
+        return os.path.join(self.directory, name + '.watermark.json')
+
+    def load_journal_watermark(self, name, path):
+        """
+        Returns the time of the latest exported row of the journal called name, or None if none was exported to path
+        """
+        # The rows are written again when their file was removed
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(self.get_journal_watermark_path(name)) as file:
+                return json.load(file)['time']
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+
+    def export_journal(self, journal, name='journal', file_format='csv'):
+        """
+        Appends the rows of journal (Journal class) that are not exported yet and returns the number of rows that were appended
+
+        With file_format 'csv' the rows are appended to directory/name.csv. With 'parquet' every export writes a new
+        file directory/name/part-<first time>.parquet, which needs pyarrow or fastparquet. Rows at or before the time of
+        the watermark are not exported again.
+        """
+        assert file_format in ['csv', 'parquet']
+
+        if file_format == 'csv':
+            path = os.path.join(self.directory, name + '.csv')
+        else:
+            path = os.path.join(self.directory, name)
+
+        watermark = self.load_journal_watermark(name, path)
+
+        times, prices, trades = journal.get_columns(journal.get_first_row_after(watermark) if watermark is not None else 0)
+
+        if len(times) == 0:
+            return 0
+
+        trade_names = pd.Series(journal.trade_names)
+
+        rows = pd.DataFrame({
+            'time': pd.to_datetime(times.repeat(len(journal.crypto)), unit='s', utc=True),
+            'crypto': journal.crypto * len(times),
+            'price': prices.reshape(-1),
+            'trade': trade_names.values[trades.reshape(-1)]
+        }, columns=JOURNAL_COLUMNS)
+
+        os.makedirs(self.directory, exist_ok=True)
+
+        if file_format == 'csv':
+            rows.to_csv(path, mode='a', header=not os.path.exists(path) or os.path.getsize(path) == 0, index=False)
+        else:
+            os.makedirs(path, exist_ok=True)
+
+            rows.to_parquet(os.path.join(path, 'part-' + str(int(times[0] * 1000)) + '.parquet'), index=False)
+
+        write_json(self.get_journal_watermark_path(name), {'time': float(times[-1])})
+
+        return len(times)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from concurrent.futures import ThreadPoolExecutor
+
+class Fetcher():
+    def __init__(self, max_workers=8):
+        """
+        Issues per-cryptocurrency network requests concurrently through a bounded thread pool
+
+        At most max_workers requests are in flight at the same time.
+        """
+        assert type(max_workers) == int and max_workers >= 1
+
+        self.max_workers = max_workers
+
+        self.executor = None
+
+    def __repr__(self):
+        return 'Fetcher(max_workers:' + str(self.max_workers) + ')'
+
+    def map(self, function, crypto_symbols):
+        """
+        Calls function(crypto_symbol) for every crypto_symbol concurrently and returns the results keyed by crypto_symbol
+
+        An exception raised by any call is raised again here once every call has finished.
+        """
+        crypto_symbols = list(crypto_symbols)
+
+        if len(crypto_symbols) <= 1 or self.max_workers == 1:
+            return {crypto_symbol: function(crypto_symbol) for crypto_symbol in crypto_symbols}
+
+        executor = self.get_executor()
+
+        futures = {crypto_symbol: executor.submit(function, crypto_symbol) for crypto_symbol in crypto_symbols}
+
+        results = {}
+        error = None
+
+        for crypto_symbol, future in futures.items():
+            try:
+                results[crypto_symbol] = future.result()
+            except Exception as exception:
+                if error is None:
+                    error = exception
+
+        if error is not None:
+            raise error
+
+        return results
+
+    def get_executor(self):
+        """
+        Returns the thread pool, starting it if it is not running
+        """
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='fetcher')
+
+        return self.executor
+
+    def close(self):
+        """
+        Shuts down the thread pool, it is started again by the next call to map()
+        """
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+
+            self.executor = None
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import shutil
+import numpy as np
+import time as t
+
+from robinhood_crypto_trader.crypto_trader.candles import FIELDS, parse_historicals, download_historicals
+
+class HistoricalsCache():
+    def __init__(self, directory='./historicals_cache', max_age=None, fetch=download_historicals):
+        """
+        On-disk cache of historical crypto data keyed by (crypto_symbol, interval, span, bounds)
+
+        Every entry is a directory of .npy files: 'begins_at' as int64 seconds since the epoch and every column of
+        candles.FIELDS as float64. Entries are loaded memory-mapped so they are not read into memory until used.
+
+        max_age is the number of seconds after which an entry is downloaded again, None keeps entries forever.
+
+        fetch(crypto_symbol, interval, span, bounds) returns data points in the format of rh.crypto.get_crypto_historicals()
+        """
+        assert max_age is None or max_age >= 0
+
+        self.directory = directory
+        self.max_age = max_age
+        self.fetch = fetch
+
+    def __repr__(self):
+        return 'HistoricalsCache(directory:' + self.directory + ', max_age:' + str(self.max_age) + ')'
+
+    def get_path(self, crypto_symbol, interval, span, bounds):
+        """
+        Returns the directory of the entry for (crypto_symbol, interval, span, bounds)
+        """
+        return os.path.join(self.directory, '_'.join([crypto_symbol, interval, span, bounds]))
+
+    def get_info(self, crypto_symbol, interval, span, bounds):
+        """
+        Returns the information stored with an entry or None if there is no entry
+
+        E.g. {'crypto': 'BTC', 'interval': '15second', 'span': 'day', 'bounds': '24_7', 'downloaded_at': 1674251040.0, 'candles': 5760}
+        """
+        try:
+            with open(os.path.join(self.get_path(crypto_symbol, interval, span, bounds), 'info.json')) as file:
+                return json.load(file)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def is_expired(self, crypto_symbol, interval, span, bounds):
+        """
+        Returns True if there is no entry or the entry is older than self.max_age
+        """
+        info = self.get_info(crypto_symbol, interval, span, bounds)
+
+        if info is None:
+            return True
+
+        return self.max_age is not None and t.time() - info['downloaded_at'] > self.max_age
+
+    def load(self, crypto_symbol, interval, span, bounds, refresh=False, offline=False):
+        """
+        Returns times, columns in the format of candles.parse_historicals()
+
+        The entry is downloaded when refresh is True, or when it is missing or expired. If offline is True nothing
+        is downloaded and an existing entry is used even if it has expired.
+        """
+        if offline:
+            if self.get_info(crypto_symbol, interval, span, bounds) is None:
+                raise FileNotFoundError('no cached historicals for ' + crypto_symbol + ' (' + interval + ', ' + span + ', ' + bounds + ') in ' + self.directory)
+        elif refresh or self.is_expired(crypto_symbol, interval, span, bounds):
+            self.store(crypto_symbol, interval, span, bounds, self.fetch(crypto_symbol, interval, span, bounds))
+
+        path = self.get_path(crypto_symbol, interval, span, bounds)
+
+        times = np.load(os.path.join(path, 'begins_at.npy'), mmap_mode='r')
+        columns = {field: np.load(os.path.join(path, field + '.npy'), mmap_mode='r') for field in FIELDS}
+
+        return times, columns
+
+    def store(self, crypto_symbol, interval, span, bounds, historicals):
+        """
+        Writes historicals (in the format of rh.crypto.get_crypto_historicals()) as the entry for (crypto_symbol, interval, span, bounds)
+        """
+        times, columns = parse_historicals(historicals)
+
+        path = self.get_path(crypto_symbol, interval, span, bounds)
+
+        # Write to a temporary directory first so that a reader never sees a partially written entry
+        temporary_path = path + '.tmp' + str(os.getpid())
+
+        os.makedirs(temporary_path, exist_ok=True)
+
+        np.save(os.path.join(temporary_path, 'begins_at.npy'), times)
+
+        for field in FIELDS:
+            np.save(os.path.join(temporary_path, field + '.npy'), columns[field])
+
+        with open(os.path.join(temporary_path, 'info.json'), 'w') as file:
+            json.dump({'crypto': crypto_symbol, 'interval': interval, 'span': span, 'bounds': bounds, 'downloaded_at': t.time(), 'candles': len(times)}, file)
+
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+
+        os.replace(temporary_path, path)
+
+    def remove(self, crypto_symbol, interval, span, bounds):
+        """
+        Deletes the entry for (crypto_symbol, interval, span, bounds) if it exists
+        """
+        path = self.get_path(crypto_symbol, interval, span, bounds)
+
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+
+    def clear(self):
+        """
+        Deletes every entry
+        """
+        if os.path.isdir(self.directory):
+            shutil.rmtree(self.directory)
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+def ema(values, period):
+    """
+    Exponential Moving Average (EMA)
+
+    Returns an array the same shape as values where the EMA is computed along the last axis.
+    The first period - 1 entries are NaN and the EMA is seeded with the moving average of the first period values.
+    """
+    values = np.asarray(values, dtype=np.float64)
+
+    assert values.shape[-1] >= period
+
+    ema = np.full(values.shape, np.nan)
+
+    # Cumulative sum keeps the same summation order as adding the prices one at a time
+    ema[..., period-1] = np.cumsum(values[..., :period], axis=-1)[..., -1] / period
+
+    multiplier = 2 / (period + 1)
+
+    for i in range(period, values.shape[-1]):
+        ema[..., i] = values[..., i] * multiplier + (ema[..., i-1] * (1 - multiplier))
+
+    return ema
+
+def rsi(values, period):
+    """
+    Relative Strength Index (RSI)
+
+    Returns an array the same shape as values where entry k is the RSI of the period price changes ending at entry k, computed along the last axis.
+    The RSI counts the number of gains and losses in the window. The first period entries are NaN.
+    """
+    values = np.asarray(values, dtype=np.float64)
+
+    assert values.shape[-1] >= period + 1
+
+    changes = np.diff(values, axis=-1)
+
+    zeros = np.zeros(changes.shape[:-1] + (1,))
+
+    gains = np.concatenate([zeros, np.cumsum(changes > 0, axis=-1)], axis=-1)
+    losses = np.concatenate([zeros, np.cumsum(changes < 0, axis=-1)], axis=-1)
+
+    avgU = (gains[..., period:] - gains[..., :-period]) / period
+    avgD = (losses[..., period:] - losses[..., :-period]) / period
+
+    rsi = np.full(values.shape, np.nan)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi[..., period:] = np.where(avgD == 0, 100.0, 100 - 100 / (1 + (avgU / avgD)))
+
+    return rsi
+
+def macd(values, fast_period, slow_period, signal_period):
+    """
+    Moving Average Convergence Divergence (MACD)
+
+    Returns macd, signal as arrays the same shape as values, aligned by index along the last axis.
+    Entries where the indicator is not yet defined are NaN.
+    """
+    values = np.asarray(values, dtype=np.float64)
+
+    start = max(fast_period, slow_period) - 1
+
+    assert values.shape[-1] >= start + signal_period
+
+    macd = ema(values, fast_period) - ema(values, slow_period)
+
+    signal = np.full(values.shape, np.nan)
+    signal[..., start:] = ema(macd[..., start:], signal_period)
+
+    return macd, signal
+
+def rolling_mean_std(values, period):
+    """
+    Rolling mean and (population) standard deviation over windows of period values along the last axis
+
+    Returns mean, std as arrays the same shape as values where entry k covers the window ending at entry k.
+    The first period - 1 entries are NaN. Every window is computed in one pass from running sums.
+    """
+    values = np.asarray(values, dtype=np.float64)
+
+    assert values.shape[-1] >= period
+
+    # Shift by the first value so that the running sums of squares do not lose precision for large prices
+    reference = values[..., :1]
+    shifted = values - reference
+
+    zeros = np.zeros(values.shape[:-1] + (1,))
+
+    sums = np.concatenate([zeros, np.cumsum(shifted, axis=-1)], axis=-1)
+    squares = np.concatenate([zeros, np.cumsum(shifted * shifted, axis=-1)], axis=-1)
+
+    window_mean = (sums[..., period:] - sums[..., :-period]) / period
+    window_square = (squares[..., period:] - squares[..., :-period]) / period
+
+    mean = np.full(values.shape, np.nan)
+    std = np.full(values.shape, np.nan)
+
+    mean[..., period-1:] = window_mean + reference
+    std[..., period-1:] = np.sqrt(np.maximum(window_square - window_mean * window_mean, 0))
+
+    return mean, std
+
+def bollinger(values, period, std_width):
+    """
+    Bollinger bands (BOLL)
+
+    Returns moving_average, upper_band, lower_band as arrays the same shape as values, aligned by index along the last axis.
+    """
+    moving_average, std = rolling_mean_std(values, period)
+
+    return moving_average, moving_average + (std * std_width), moving_average - (std * std_width)
+
+class RollingBollinger():
+    def __init__(self, period, std_width, values=None):
+        """
+        Bollinger bands for the latest window that are updated in O(1) time when a new value arrives
+
+        Uses Welford's method with a sliding window to keep the mean and variance numerically stable.
+        """
+        assert period >= 1
+
+        self.period = period
+        self.std_width = std_width
+
+        self.window = np.zeros(period)
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+        for value in values if values is not None else []:
+            self.update(value)
+
+    def __repr__(self):
+        return 'RollingBollinger(period:' + str(self.period) + ', std_width:' + str(self.std_width) + ', count:' + str(self.count) + ')'
+
+    def is_ready(self):
+        """
+        Returns True once period values have been seen
+        """
+        return self.count >= self.period
+
+    def update(self, value):
+        """
+        Adds value to the window (removing the oldest value once the window is full) and returns the latest bands
+        """
+        value = float(value)
+
+        position = self.count % self.period
+
+        if self.count < self.period:
+            self.count += 1
+
+            delta = value - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (value - self.mean)
+        else:
+            self.count += 1
+
+            old_value = self.window[position]
+            old_mean = self.mean
+
+            self.mean += (value - old_value) / self.period
+            self.m2 += (value - old_value) * (value - self.mean + old_value - old_mean)
+
+        self.window[position] = value
+
+        return self.bands()
+
+    def replace(self, value):
+        """
+        Replaces the latest value with value (e.g. the close of a candle that was not complete yet) and returns the latest bands
+        """
+        assert self.count >= 1
+
+        value = float(value)
+
+        position = (self.count - 1) % self.period
+        count = min(self.count, self.period)
+
+        old_value = self.window[position]
+        old_mean = self.mean
+
+        self.mean += (value - old_value) / count
+        self.m2 += (value - old_value) * (value - self.mean + old_value - old_mean)
+
+        self.window[position] = value
+
+        return self.bands()
+
+    def bands(self):
+        """
+        Returns moving_average, upper_band, lower_band for the latest window (NaN until the window is full)
+        """
+        if not self.is_ready():
+            return np.nan, np.nan, np.nan
+
+        std = np.sqrt(max(self.m2 / self.period, 0))
+
+        return self.mean, self.mean + (std * self.std_width), self.mean - (std * self.std_width)
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+
+from robinhood_crypto_trader.crypto_trader.backtest import OUTCOMES
+
+class Journal():
+    def __init__(self, crypto, chunk_size=1024):
+        """
+        Columnar record of the price and trade of every crypto at every iteration
+
+        Rows are written into preallocated chunks of chunk_size rows, so appending a row never copies earlier rows.
+        Times are seconds since the epoch and trades are stored as codes into self.trade_names. DataFrames are
+        only built when they are requested.
+        """
+        assert type(chunk_size) == int and chunk_size >= 1
+
+        self.crypto = list(crypto)
+        self.chunk_size = chunk_size
+
+        # Codes 0 to 6 are the outcomes of the backtest engine, other trades are added as they are recorded
+        self.trade_names = list(OUTCOMES)
+        self.trade_codes = {trade_name: code for code, trade_name in enumerate(self.trade_names)}
+
+        self.time_chunks = []
+        self.price_chunks = []
+        self.trade_chunks = []
+
+        # The number of rows and the number of rows used in the last chunk
+        self.length = 0
+        self.used = chunk_size
+
+        # (length, df_trades, df_prices) of the latest call to to_dataframes()
+        self.dataframes = None
+
+    def __repr__(self):
+        return 'Journal(crypto:' + str(self.crypto) + ', rows:' + str(self.length) + ')'
+
+    def __len__(self):
+        return self.length
+
+    def get_trade_code(self, trade_name):
+        """
+        Returns the code of trade_name, giving it a new code if it has not been recorded before
+        """
+        code = self.trade_codes.get(trade_name)
+
+        if code is None:
+            code = len(self.trade_names)
+
+            assert code < 128, 'too many different trades'
+
+            self.trade_names.append(trade_name)
+            self.trade_codes[trade_name] = code
+
+        return code
+
+    def add_chunk(self):
+        """
+        Allocates the next chunk of rows
+        """
+        self.time_chunks.append(np.empty(self.chunk_size, dtype=np.float64))
+        self.price_chunks.append(np.empty((self.chunk_size, len(self.crypto)), dtype=np.float64))
+        self.trade_chunks.append(np.empty((self.chunk_size, len(self.crypto)), dtype=np.int8))
+
+        self.used = 0
+
+    def append(self, time, price_dict, trade_dict):
+        """
+        Records the prices and trades of one iteration
+
+        time is in seconds since the epoch, price_dict and trade_dict look like {'crypto1': value, 'crypto2': value}
+        """
+        if self.used == self.chunk_size:
+            self.add_chunk()
+
+        row = self.used
+
+        self.time_chunks[-1][row] = time
+
+        for j, crypto_name in enumerate(self.crypto):
+            self.price_chunks[-1][row, j] = price_dict[crypto_name]
+            self.trade_chunks[-1][row, j] = self.get_trade_code(trade_dict[crypto_name])
+
+        self.used += 1
+        self.length += 1
+
+    def extend(self, times, prices, trades):
+        """
+        Records many iterations at once
+
+        times has one entry per iteration, prices and trades have one row per iteration and one column per crypto.
+        trades are codes into self.trade_names.
+        """
+        times = np.asarray(times, dtype=np.float64)
+        prices = np.asarray(prices, dtype=np.float64)
+        trades = np.asarray(trades, dtype=np.int8)
+
+        assert prices.shape == trades.shape == (len(times), len(self.crypto))
+
+        start = 0
+
+        while start < len(times):
+            if self.used == self.chunk_size:
+                self.add_chunk()
+
+            rows = min(self.chunk_size - self.used, len(times) - start)
+
+            self.time_chunks[-1][self.used:self.used+rows] = times[start:start+rows]
+            self.price_chunks[-1][self.used:self.used+rows] = prices[start:start+rows]
+            self.trade_chunks[-1][self.used:self.used+rows] = trades[start:start+rows]
+
+            self.used += rows
+            self.length += rows
+
+            start += rows
+
+    def get_columns(self, start=0):
+        """
+        Returns times, prices, trades of the rows from start onwards as arrays
+        """
+        if self.length == 0 or start >= self.length:
+            return np.empty(0, dtype=np.float64), np.empty((0, len(self.crypto)), dtype=np.float64), np.empty((0, len(self.crypto)), dtype=np.int8)
+
+        first_chunk, offset = divmod(start, self.chunk_size)
+
+        columns = []
+
+        for chunks in [self.time_chunks, self.price_chunks, self.trade_chunks]:
+            parts = [chunks[first_chunk][offset:]] + chunks[first_chunk+1:]
+
+            # The last chunk is only used up to self.used
+            if len(parts) == 1:
+                parts[-1] = parts[-1][:self.used - offset]
+            else:
+                parts[-1] = parts[-1][:self.used]
+
+            columns.append(np.concatenate(parts))
+
+        return tuple(columns)
+
+    def get_first_row_after(self, time):
+        """
+        Returns the index of the first row with a time later than time, or len(self) if there is none
+
+        Rows are expected to be recorded in the order of their times.
+        """
+        for k, chunk in enumerate(self.time_chunks):
+            used = self.used if k == len(self.time_chunks) - 1 else self.chunk_size
+
+            if used > 0 and chunk[used-1] > time:
+                return k * self.chunk_size + int(np.searchsorted(chunk[:used], time, side='right'))
+
+        return self.length
+
+    def build_dataframes(self, times, prices, trades):
+        """
+        Returns df_trades, df_prices of the given columns
+        """
+        index = pd.to_datetime(times, unit='s', utc=True)
+
+        trade_names = np.array(self.trade_names, dtype=object)
+
+        df_trades = pd.DataFrame({crypto_name: trade_names[trades[:, j]] for j, crypto_name in enumerate(self.crypto)}, index=index)
+        df_prices = pd.DataFrame({crypto_name: prices[:, j] for j, crypto_name in enumerate(self.crypto)}, index=index)
+
+        return df_trades, df_prices
+
+    def to_dataframes(self):
+        """
+        Returns df_trades, df_prices with every row, indexed by the time of the row
+
+        The DataFrames are built again only if rows were recorded since the previous call.
+        """
+        if self.dataframes is None or self.dataframes[0] != self.length:
+            self.dataframes = (self.length,) + self.build_dataframes(*self.get_columns())
+
+        return self.dataframes[1], self.dataframes[2]
+
+    def tail(self, rows=10):
+        """
+        Returns df_trades, df_prices with only the last rows rows
+        """
+        return self.build_dataframes(*self.get_columns(max(0, self.length - rows)))
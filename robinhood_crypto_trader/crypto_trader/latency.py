@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import math
+import threading
+import contextlib
+import pandas as pd
+import time as t
+
+# The phases of an iteration of the trader, 'iteration' is the whole iteration
+PHASES = ['quote_fetch', 'account_refresh', 'historicals_fetch', 'indicator_compute', 'order_placement', 'dataframe_build', 'console_output', 'iteration']
+
+QUANTILES = [0.5, 0.95, 0.99]
+
+# Columns of LatencyRecorder.summary()
+COLUMNS = ['phase', 'crypto', 'count', 'mean', 'p50', 'p95', 'p99', 'max']
+
+METRIC_NAME = 'crypto_trader_phase_latency_seconds'
+
+class LatencyHistogram():
+    def __init__(self, smallest=0.00001, factor=2 ** 0.25, number_of_buckets=96):
+        """
+        Histogram of latencies (in seconds) in buckets that grow by factor, so it takes the same memory however many latencies it holds
+
+        Bucket i holds the latencies up to smallest * factor ** i, the last bucket holds everything larger. With the defaults
+        the buckets go from 10 microseconds to about 2.8 minutes and quantiles are estimated to within 19%.
+        """
+        self.smallest = smallest
+        self.factor = factor
+        self.log_factor = math.log(factor)
+
+        self.counts = [0] * number_of_buckets
+
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def __repr__(self):
+        return 'LatencyHistogram(count:' + str(self.count) + ', p50:' + str(self.quantile(0.5)) + ', p99:' + str(self.quantile(0.99)) + ')'
+
+    def get_upper_bound(self, index):
+        """
+        Returns the largest latency of bucket index
+        """
+        return self.smallest * self.factor ** index
+
+    def record(self, seconds):
+        """
+        Adds one latency
+        """
+        if seconds <= self.smallest:
+            index = 0
+        else:
+            index = min(math.ceil(math.log(seconds / self.smallest) / self.log_factor), len(self.counts) - 1)
+
+        self.counts[index] += 1
+
+        self.count += 1
+        self.sum += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q):
+        """
+        Returns the estimated latency below which a fraction q of the latencies fall, or None without latencies
+
+        The latency is interpolated inside the bucket that holds the quantile and kept between the smallest and largest latency.
+        """
+        if self.count == 0:
+            return None
+
+        rank = q * self.count
+        cumulative = 0
+
+        for index, count in enumerate(self.counts):
+            if count > 0 and cumulative + count >= rank:
+                lower = self.get_upper_bound(index - 1) if index > 0 else 0.0
+                upper = self.get_upper_bound(index)
+
+                estimate = lower + (upper - lower) * (rank - cumulative) / count
+
+                return min(max(estimate, self.min), self.max)
+
+            cumulative += count
+
+        return self.max
+
+    def merge(self, other):
+        """
+        Adds the latencies of other, a LatencyHistogram with the same buckets
+        """
+        assert len(self.counts) == len(other.counts) and self.smallest == other.smallest and self.factor == other.factor
+
+        self.counts = [count + other_count for count, other_count in zip(self.counts, other.counts)]
+
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def mean(self):
+        """
+        Returns the mean latency, or None without latencies
+        """
+        return self.sum / self.count if self.count > 0 else None
+
+class LatencyRecorder():
+    def __init__(self, path=None, write_interval=60, clock=t.time):
+        """
+        Latency histograms of every phase of the trader's iterations, per crypto where a phase is done per crypto
+
+        Phases are timed with time(phase, crypto) and can be recorded from several threads. summary() returns the p50, p95
+        and p99 of every histogram. When path is set, write_if_due() rewrites path every write_interval seconds with the
+        histograms in the Prometheus text format, e.g. for the textfile collector of the node exporter.
+        """
+        assert write_interval >= 0
+
+        self.path = path
+        self.write_interval = write_interval
+        self.clock = clock
+
+        # self.histograms looks like {('quote_fetch', 'BTC'): LatencyHistogram, ('console_output', None): LatencyHistogram}
+        self.histograms = {}
+
+        self.lock = threading.Lock()
+
+        self.last_write = None
+
+    def __repr__(self):
+        return 'LatencyRecorder(histograms:' + str(len(self.histograms)) + ', path:' + str(self.path) + ')'
+
+    def record(self, phase, seconds, crypto=None):
+        """
+        Adds a latency of phase for crypto, crypto is None for phases that are done once for every crypto at once
+        """
+        assert phase in PHASES
+
+        with self.lock:
+            histogram = self.histograms.get((phase, crypto))
+
+            if histogram is None:
+                histogram = self.histograms[(phase, crypto)] = LatencyHistogram()
+
+            histogram.record(seconds)
+
+    def merge(self, histograms):
+        """
+        Adds histograms ({(phase, crypto): LatencyHistogram}), e.g. the histograms of another process
+        """
+        with self.lock:
+            for key, histogram in histograms.items():
+                if key not in self.histograms:
+                    self.histograms[key] = LatencyHistogram(histogram.smallest, histogram.factor, len(histogram.counts))
+
+                self.histograms[key].merge(histogram)
+
+    @contextlib.contextmanager
+    def time(self, phase, crypto=None):
+        """
+        Records how long the body of the with statement takes as a latency of phase for crypto, also when it raises
+        """
+        start = t.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.record(phase, t.perf_counter() - start, crypto)
+
+    def get_histogram(self, phase, crypto=None):
+        """
+        Returns the histogram of phase for crypto, or None if nothing was recorded for it
+        """
+        return self.histograms.get((phase, crypto))
+
+    def get_items(self):
+        """
+        Returns [((phase, crypto), LatencyHistogram), ...] ordered by phase as in PHASES and then by crypto
+        """
+        with self.lock:
+            return sorted(self.histograms.items(), key=lambda item: (PHASES.index(item[0][0]), item[0][1] or ''))
+
+    def summary(self):
+        """
+        Returns a DataFrame with the count, mean, p50, p95, p99 and max latency (in seconds) of every phase and crypto
+
+        The crypto of phases that are done once for every crypto at once is missing (see DataFrame.isna()).
+        """
+        rows = [[phase, crypto, histogram.count, histogram.mean()] + [histogram.quantile(q) for q in QUANTILES] + [histogram.max] for (phase, crypto), histogram in self.get_items()]
+
+        return pd.DataFrame(rows, columns=COLUMNS)
+
+    def to_prometheus(self):
+        """
+        Returns the histograms in the Prometheus text format, as a summary with the 0.5, 0.95 and 0.99 quantiles
+        """
+        lines = [
+            '# HELP ' + METRIC_NAME + ' Latency of the phases of the iterations of the trader.',
+            '# TYPE ' + METRIC_NAME + ' summary'
+        ]
+
+        for (phase, crypto), histogram in self.get_items():
+            labels = 'phase="' + phase + '"'
+
+            if crypto is not None:
+                labels += ',crypto="' + crypto + '"'
+
+            for q in QUANTILES:
+                lines.append(METRIC_NAME + '{' + labels + ',quantile="' + str(q) + '"} ' + repr(float(histogram.quantile(q))))
+
+            lines.append(METRIC_NAME + '_sum{' + labels + '} ' + repr(float(histogram.sum)))
+            lines.append(METRIC_NAME + '_count{' + labels + '} ' + str(histogram.count))
+
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path=None):
+        """
+        Writes the histograms to path (or self.path) in the Prometheus text format, replacing the file at once
+        """
+        if path is None:
+            path = self.path
+
+        directory = os.path.dirname(path)
+
+        if directory != '':
+            os.makedirs(directory, exist_ok=True)
+
+        # The textfile collector may read the file at any time so it is never partially written
+        temporary_path = path + '.tmp'
+
+        with open(temporary_path, 'w') as file:
+            file.write(self.to_prometheus())
+
+        os.replace(temporary_path, path)
+
+        self.last_write = self.clock()
+
+    def write_if_due(self):
+        """
+        Writes the histograms to self.path if it is set and write_interval seconds passed since the previous write
+
+        Returns whether the file was written.
+        """
+        if self.path is None:
+            return False
+
+        if self.last_write is not None and self.clock() - self.last_write < self.write_interval:
+            return False
+
+        self.write()
+
+        return True
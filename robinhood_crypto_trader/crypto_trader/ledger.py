@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import time as t
+
+from robinhood_crypto_trader.crypto_trader.ticks import TickTable, CASH_PRECISION, to_ticks, from_ticks, divide
+
+# States of an order after which it does not change anymore
+FINAL_STATES = ['filled', 'canceled', 'rejected', 'failed']
+
+def to_float(value):
+    """
+    Returns value as a float where None and '' are 0.0
+    """
+    if value is None or value == '':
+        return 0.0
+
+    return float(value)
+
+class Ledger():
+    def __init__(self, crypto, reconcile_interval=300, ticks=None):
+        """
+        Local record of cash, holdings and average bought price that is kept up to date from order fills
+
+        The account is only downloaded again by the owner when needs_reconcile() is True, which is every
+        reconcile_interval seconds or as soon as the ledger no longer trusts its own numbers (see mark_drift()).
+        reconcile_interval of None never reconciles after the first time.
+
+        Cash, holdings and average bought prices are kept as whole numbers of cents and of the price and quantity increments
+        of every crypto (ticks, a TickTable), so that they do not drift however many fills are applied. self.cash,
+        self.holdings and self.bought_price are their values as floats.
+        """
+        assert reconcile_interval is None or reconcile_interval >= 0
+
+        self.crypto = list(crypto)
+        self.reconcile_interval = reconcile_interval
+        self.ticks = ticks if ticks is not None else TickTable()
+
+        self.cash_ticks = 0
+        self.equity = 0.00
+
+        self.holding_ticks = {crypto_name: 0 for crypto_name in self.crypto}
+        self.bought_price_ticks = {crypto_name: 0 for crypto_name in self.crypto}
+
+        # holdings and bought_price are updated in place so that references to them stay current
+        self.holdings = {crypto_name: 0 for crypto_name in self.crypto}
+        self.bought_price = {crypto_name: 0 for crypto_name in self.crypto}
+
+        # Cash held by open buy orders and holdings held by open sell orders, like Robinhood does
+        self.reserved_cash = 0.00
+        self.reserved_holdings = {crypto_name: 0 for crypto_name in self.crypto}
+
+        # self.open_orders looks like {order_id: {'crypto': 'BTC', 'side': 'buy', 'reserved': 10.00, 'quantity': 0.0, 'notional': 0.0}}
+        # where quantity and notional are the part of the order that has already been applied
+        self.open_orders = {}
+
+        self.last_reconciled = None
+        self.drift = None
+        self.reconciliations = 0
+
+    def __repr__(self):
+        return 'Ledger(cash:' + str(round(self.cash, 2)) + ', holdings:' + str(self.holdings) + ', open orders:' + str(len(self.open_orders)) + ')'
+
+    @property
+    def cash(self):
+        """
+        The cash including the cash held by open buy orders
+        """
+        return from_ticks(self.cash_ticks, CASH_PRECISION)
+
+    @cash.setter
+    def cash(self, value):
+        self.cash_ticks = to_ticks(value, CASH_PRECISION)
+
+    def set_position(self, crypto_name, holding_ticks, bought_price_ticks):
+        """
+        Sets the holdings and average bought price of crypto_name in ticks and updates self.holdings and self.bought_price
+        """
+        self.holding_ticks[crypto_name] = holding_ticks
+        self.bought_price_ticks[crypto_name] = bought_price_ticks
+
+        self.holdings[crypto_name] = self.ticks.ticks_to_quantity(crypto_name, holding_ticks) if holding_ticks != 0 else 0
+        self.bought_price[crypto_name] = self.ticks.ticks_to_price(crypto_name, bought_price_ticks) if bought_price_ticks != 0 else 0
+
+    def get_available_cash(self):
+        """
+        Returns the cash that is not held by open buy orders
+        """
+        return round(self.cash - self.reserved_cash, 2)
+
+    def get_available_holdings(self, crypto_name):
+        """
+        Returns the holdings of crypto_name that are not held by open sell orders
+        """
+        return self.holdings[crypto_name] - self.reserved_holdings[crypto_name]
+
+    def needs_reconcile(self):
+        """
+        Returns True if the ledger should be replaced with the account from the broker
+        """
+        if self.last_reconciled is None or self.drift is not None:
+            return True
+
+        return self.reconcile_interval is not None and t.time() - self.last_reconciled >= self.reconcile_interval
+
+    def mark_drift(self, reason):
+        """
+        Records that the ledger may no longer match the account so that the next needs_reconcile() is True
+        """
+        if self.drift is None:
+            print('ledger drift:', reason)
+
+        self.drift = reason
+
+    def reconcile(self, cash, equity, holdings, bought_price, open_orders=None):
+        """
+        Replaces the ledger with the account downloaded from the broker
+
+        cash is the cash that can still be spent, holdings include the holdings held by open sell orders.
+        open_orders are the orders (Order class) that are still open, their fills so far are already part of the account.
+        """
+        tracked = self.open_orders
+
+        self.open_orders = {}
+        self.reserved_cash = 0.00
+        self.reserved_holdings = {crypto_name: 0 for crypto_name in self.crypto}
+
+        for order in open_orders if open_orders is not None else []:
+            entry = tracked.get(order.id)
+
+            if entry is None or order.state in FINAL_STATES:
+                continue
+
+            quantity = to_float(order.cumulative_quantity)
+            notional = to_float(order.rounded_executed_notional) or quantity * to_float(order.average_price)
+
+            # What is still held for the part of the order that is not filled yet
+            if entry['side'] == 'buy':
+                reserved = max(0.0, entry['reserved'] - (notional - entry['notional']))
+                self.reserved_cash += reserved
+            else:
+                reserved = max(0.0, entry['reserved'] - (quantity - entry['quantity']))
+                self.reserved_holdings[entry['crypto']] += reserved
+
+            self.open_orders[order.id] = {'crypto': entry['crypto'], 'side': entry['side'], 'reserved': reserved, 'quantity': quantity, 'notional': notional}
+
+        # The cash held by open buy orders is not part of the cash from the broker
+        self.cash = cash + self.reserved_cash
+        self.equity = equity
+
+        for crypto_name in self.crypto:
+            self.set_position(crypto_name, self.ticks.quantity_to_ticks(crypto_name, holdings.get(crypto_name, 0)), self.ticks.price_to_ticks(crypto_name, bought_price.get(crypto_name, 0)))
+
+        self.last_reconciled = t.time()
+        self.drift = None
+        self.reconciliations += 1
+
+    def reconcile_equity(self, equity):
+        """
+        Replaces only the equity with the equity downloaded from the broker
+
+        Used when the cash and holdings of the ledger are simulated and must not be replaced.
+        """
+        self.equity = equity
+
+        self.last_reconciled = t.time()
+        self.drift = None
+        self.reconciliations += 1
+
+    def apply_fill(self, crypto_name, side, quantity, price, notional=None):
+        """
+        Applies quantity of crypto_name bought or sold at price to cash, holdings and average bought price
+
+        notional is the amount of cash paid or received, by default quantity * price rounded to two decimal places.
+        quantity and price are rounded to the increments of crypto_name, the average bought price is rounded to the
+        price increment.
+        """
+        quantity_ticks = self.ticks.quantity_to_ticks(crypto_name, quantity)
+        price_ticks = self.ticks.price_to_ticks(crypto_name, price)
+
+        if notional is None:
+            notional_ticks = self.ticks.get_notional_ticks(crypto_name, quantity_ticks, price_ticks)
+        else:
+            notional_ticks = to_ticks(notional, CASH_PRECISION)
+
+        holding_ticks = self.holding_ticks[crypto_name]
+        bought_price_ticks = self.bought_price_ticks[crypto_name]
+
+        if side == 'buy':
+            self.cash_ticks -= notional_ticks
+
+            if holding_ticks + quantity_ticks != 0:
+                bought_price_ticks = divide((bought_price_ticks * holding_ticks) + (quantity_ticks * price_ticks), holding_ticks + quantity_ticks)
+
+            holding_ticks += quantity_ticks
+        else:
+            self.cash_ticks += notional_ticks
+
+            holding_ticks -= quantity_ticks
+
+            # Average bought price is unaffected when selling
+            if holding_ticks == 0:
+                bought_price_ticks = 0
+
+        self.set_position(crypto_name, holding_ticks, bought_price_ticks)
+
+        if self.cash_ticks < -1:
+            self.mark_drift('negative cash')
+
+        if holding_ticks < 0:
+            self.mark_drift('negative holdings of ' + crypto_name)
+
+    def track(self, order, crypto_name):
+        """
+        Starts tracking an order (Order class) placed for crypto_name so that its fills are applied by apply_order()
+
+        The cash of a buy order (or the quantity of a sell order) is held until the order is final.
+        """
+        if order.id is None:
+            self.mark_drift('order without an id')
+
+            return
+
+        if order.side == 'buy':
+            reserved = to_float(order.entered_price) or to_float(order.quantity) * to_float(order.price)
+
+            self.reserved_cash += reserved
+        else:
+            reserved = to_float(order.quantity)
+
+            self.reserved_holdings[crypto_name] += reserved
+
+        self.open_orders[order.id] = {'crypto': crypto_name, 'side': order.side, 'reserved': reserved, 'quantity': 0.0, 'notional': 0.0}
+
+    def apply_order(self, order):
+        """
+        Applies the part of a tracked order (Order class) that was filled since it was last applied
+
+        Returns True if something new was filled.
+        """
+        entry = self.open_orders.get(order.id)
+
+        if entry is None:
+            return False
+
+        quantity = to_float(order.cumulative_quantity)
+        notional = to_float(order.rounded_executed_notional) or quantity * to_float(order.average_price)
+
+        new_quantity = quantity - entry['quantity']
+        new_notional = notional - entry['notional']
+
+        filled = new_quantity > 0
+
+        if filled:
+            self.apply_fill(entry['crypto'], entry['side'], new_quantity, new_notional / new_quantity, new_notional)
+
+            entry['quantity'] = quantity
+            entry['notional'] = notional
+
+            # Release what was held for the part that is filled
+            if entry['side'] == 'buy':
+                released = min(new_notional, entry['reserved'])
+                self.reserved_cash -= released
+            else:
+                released = min(new_quantity, entry['reserved'])
+                self.reserved_holdings[entry['crypto']] -= released
+
+            entry['reserved'] -= released
+        elif new_quantity < 0:
+            self.mark_drift('order ' + str(order.id) + ' has less filled than before')
+
+        if order.state in FINAL_STATES:
+            if entry['side'] == 'buy':
+                self.reserved_cash -= entry['reserved']
+            else:
+                self.reserved_holdings[entry['crypto']] -= entry['reserved']
+
+            del self.open_orders[order.id]
+
+        return filled
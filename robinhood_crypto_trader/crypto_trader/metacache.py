@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import time as t
+import robin_stocks.robinhood as rh
+
+def download_pairs():
+    """
+    Returns every crypto currency pair of Robinhood
+    """
+    return rh.crypto.get_crypto_currency_pairs()
+
+class MetadataCache():
+    def __init__(self, path=None, max_age=86400, fetch_pairs=download_pairs, warm_start=False):
+        """
+        Cache of the crypto currency pairs, which hold the id, tradability and order increments of every crypto
+
+        rh.crypto.get_crypto_info() downloads every currency pair to return one, so the pairs are downloaded once here
+        and the information of every crypto is taken from them.
+
+        When path is set the pairs are also kept in a JSON file at path and only downloaded again when they are older
+        than max_age seconds (None keeps them forever), so restarts do not download them. With warm_start the file is
+        used however old it is, the pairs are only downloaded when there is no file.
+
+        fetch_pairs() returns the currency pairs in the format of rh.crypto.get_crypto_currency_pairs()
+        """
+        assert max_age is None or max_age >= 0
+
+        self.path = path
+        self.max_age = max_age
+        self.fetch_pairs = fetch_pairs
+        self.warm_start = warm_start
+
+        self.pairs = None
+        self.downloaded_at = None
+
+        self.downloads = 0
+
+    def __repr__(self):
+        return 'MetadataCache(path:' + str(self.path) + ', max_age:' + str(self.max_age) + ', pairs:' + str(len(self.pairs) if self.pairs is not None else None) + ')'
+
+    def read(self):
+        """
+        Returns the pairs and download time stored at self.path, or None, None if there is no file
+        """
+        if self.path is None:
+            return None, None
+
+        try:
+            with open(self.path) as file:
+                data = json.load(file)
+
+            return data['pairs'], data['downloaded_at']
+        except (FileNotFoundError, ValueError, KeyError):
+            return None, None
+
+    def write(self):
+        """
+        Writes the pairs to self.path, replacing the file at once so that it is never partially written
+        """
+        directory = os.path.dirname(self.path)
+
+        if directory != '':
+            os.makedirs(directory, exist_ok=True)
+
+        temporary_path = self.path + '.tmp' + str(os.getpid())
+
+        with open(temporary_path, 'w') as file:
+            json.dump({'downloaded_at': self.downloaded_at, 'pairs': self.pairs}, file)
+
+        os.replace(temporary_path, self.path)
+
+    def is_expired(self, downloaded_at):
+        """
+        Returns True if pairs downloaded at downloaded_at (seconds since the epoch) have to be downloaded again
+        """
+        if downloaded_at is None:
+            return True
+
+        if self.warm_start:
+            return False
+
+        return self.max_age is not None and t.time() - downloaded_at > self.max_age
+
+    def get_pairs(self, refresh=False):
+        """
+        Returns the currency pairs, downloading them if refresh is True or if there are none that can still be used
+
+        If the download fails (robin_stocks returns [None]), expired pairs are used when there are any.
+        """
+        if self.pairs is None and not refresh:
+            self.pairs, self.downloaded_at = self.read()
+
+        if refresh or self.is_expired(self.downloaded_at):
+            pairs = [pair for pair in self.fetch_pairs() or [] if pair is not None]
+
+            self.downloads += 1
+
+            if len(pairs) > 0:
+                self.pairs = pairs
+                self.downloaded_at = t.time()
+
+                if self.path is not None:
+                    self.write()
+            elif self.pairs is not None:
+                print('Could not download the crypto currency pairs: using the pairs downloaded at ' + str(self.downloaded_at))
+            else:
+                return []
+
+        return self.pairs
+
+    def get_info(self, crypto_symbol):
+        """
+        Returns the currency pair of crypto_symbol in the format of rh.crypto.get_crypto_info(), or None if there is none
+        """
+        return self.get_meta_data([crypto_symbol])[crypto_symbol]
+
+    def get_meta_data(self, crypto_symbols):
+        """
+        Returns {crypto_symbol: currency pair} of every crypto in crypto_symbols, see get_info()
+        """
+        pairs = {}
+
+        for pair in self.get_pairs():
+            pairs.setdefault(pair['asset_currency']['code'], pair)
+            pairs.setdefault(pair['symbol'], pair)
+
+        return {crypto_symbol: pairs.get(crypto_symbol) for crypto_symbol in crypto_symbols}
+
+    def get_tradable_symbols(self):
+        """
+        Returns the asset codes and pair symbols of every tradable pair, e.g. ['BTC', 'BTC-USD', 'ETH', 'ETH-USD']
+        """
+        symbols = []
+
+        for pair in self.get_pairs():
+            if pair['tradability'] == 'tradable':
+                symbols += [pair['asset_currency']['code'], pair['symbol']]
+
+        return symbols
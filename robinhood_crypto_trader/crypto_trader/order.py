@@ -10,12 +10,73 @@ def get_all_orders():
     """
     Returns a list of orders (Order class) of all orders that have been processed for the account
     """
-    completed_orders = rh.orders.get_all_crypto_orders()
+    return list(iterate_orders())
 
-    for i in range(len(completed_orders)):
-        completed_orders[i] = Order(completed_orders[i])
+def iterate_order_info_pages(since=None):
+    """
+    Yields the order information of the orders of the account one page at a time, newest orders first
+
+    Only one page is downloaded at a time. If since is given (a 'created_at' time such as '2023-01-20T21:44:00.000000-05:00'),
+    orders created before since are left out and no more pages are downloaded once they are reached. The bound is
+    inclusive: orders created at since are yielded, so callers that pass the 'created_at' of an order they already
+    processed get that order again and have to skip it by its id.
+
+    If a request fails the last page is [None], like robin_stocks returns for lists, so callers can tell it from the end
+    of the order history.
+    """
+    url = rh.urls.crypto_orders_url()
+
+    while url:
+        data = rh.helper.request_get(url, 'regular')
+
+        # robin_stocks returns None when the request fails
+        if data is None:
+            yield [None]
+
+            return
+
+        page = []
+        finished = False
+
+        for order_info in data['results']:
+            if since is not None and order_info['created_at'] < since:
+                finished = True
+
+                break
 
-    return completed_orders
+            page.append(order_info)
+
+        if len(page) > 0:
+            yield page
+
+        if finished:
+            return
+
+        url = data['next']
+
+def iterate_order_pages(since=None):
+    """
+    Yields the orders (Order class) of the account one page at a time, newest orders first
+
+    Orders created before since are left out, orders created at since are included, see iterate_order_info_pages().
+    The pages stop at a failed request.
+    """
+    for page in iterate_order_info_pages(since):
+        if None in page:
+            return
+
+        yield [Order(order_info) for order_info in page]
+
+def iterate_orders(since=None):
+    """
+    Yields the orders (Order class) of the account one at a time, newest orders first
+
+    Orders created before since are left out, see iterate_order_info_pages(). Passing the 'created_at' of the newest order
+    that was processed as since yields that order again along with the newer ones, so skip the orders whose id was processed.
+    """
+    for page in iterate_order_pages(since):
+        for order in page:
+            yield order
 
 def get_all_open_orders():
     """
@@ -28,7 +89,26 @@ def get_all_open_orders():
 
     return open_orders
 
+# Fields of the order information, the fields of NUMERIC_FIELDS are parsed to floats (or None)
+# 'executions', the remaining field, is kept raw in raw_executions and only parsed by Order.executions
+FIELDS = ['account_id', 'average_price', 'cancel_url', 'created_at', 'cumulative_quantity', 'currency_pair_id', 'entered_price',
+          'funding_source_id', 'id', 'initiator_id', 'initiator_type', 'is_visible_to_user', 'last_transaction_at', 'price',
+          'quantity', 'ref_id', 'rounded_executed_notional', 'side', 'state', 'time_in_force', 'type', 'updated_at']
+
+NUMERIC_FIELDS = ['average_price', 'cumulative_quantity', 'entered_price', 'price', 'quantity', 'rounded_executed_notional']
+
+def parse_number(text):
+    """
+    Returns text as a float or None if there is no number
+    """
+    if text is None or text == '':
+        return None
+
+    return float(text)
+
 class Order():
+    __slots__ = FIELDS + ['raw_executions', 'parsed_executions']
+
     def __init__(self, order_info):
         """
         order_info = {
@@ -56,35 +136,35 @@ class Order():
         'type': 'market',
         'updated_at': 'some_time'
         }
+
+        The fields of NUMERIC_FIELDS are stored as floats (None if missing) and executions are only parsed when they are used.
         """
-        
-        self.account_id = order_info['account_id']
-        self.average_price = order_info['average_price']
-        self.cancel_url = order_info['cancel_url']
-        self.created_at = order_info['created_at']
-        self.cumulative_quantity = order_info['cumulative_quantity']
-        self.currency_pair_id = order_info['currency_pair_id']
-        self.entered_price = order_info['entered_price']
-        self.executions = order_info['executions']
-        self.funding_source_id = order_info['funding_source_id']
-        self.id = order_info['id']
-        self.initiator_id = order_info['initiator_id']
-        self.initiator_type = order_info['initiator_type']
-        self.is_visible_to_user = order_info['is_visible_to_user']
-        self.last_transaction_at = order_info['last_transaction_at']
-        self.price = order_info['price']
-        self.quantity = order_info['quantity']
-        self.ref_id = order_info['ref_id']
-        self.rounded_executed_notional = order_info['rounded_executed_notional']
-        self.side = order_info['side']
-        self.state = order_info['state']
-        self.time_in_force = order_info['time_in_force']
-        self.type = order_info['type']
-        self.updated_at = order_info['updated_at']
+        self.id = order_info.get('id')
+
+        self.update(order_info)
     
     def __repr__(self):
         return 'order_id:' + str(self.id) + ', side:' + self.side + ', state:' + self.state
     
+    @property
+    def executions(self):
+        """
+        List of the executions of the order, e.g. [{'effective_price': 20000.0, 'id': 'some_id', 'quantity': 0.01, 'timestamp': 'some_time'}]
+        """
+        if self.parsed_executions is None:
+            self.parsed_executions = []
+
+            for execution in self.raw_executions or []:
+                execution = dict(execution)
+
+                for field in ['effective_price', 'quantity']:
+                    if field in execution:
+                        execution[field] = parse_number(execution[field])
+
+                self.parsed_executions.append(execution)
+
+        return self.parsed_executions
+    
     def is_filled(self):
         if self.state == "filled":
             return True
@@ -95,28 +175,16 @@ class Order():
         if new_order_info == None:
             new_order_info = rh.orders.get_crypto_order_info(self.id)
 
-        self.account_id = new_order_info['account_id']
-        self.average_price = new_order_info['average_price']
-        self.cancel_url = new_order_info['cancel_url']
-        self.created_at = new_order_info['created_at']
-        self.cumulative_quantity = new_order_info['cumulative_quantity']
-        self.currency_pair_id = new_order_info['currency_pair_id']
-        self.entered_price = new_order_info['entered_price']
-        self.executions = new_order_info['executions']
-        self.funding_source_id = new_order_info['funding_source_id']
-        self.initiator_id = new_order_info['initiator_id']
-        self.initiator_type = new_order_info['initiator_type']
-        self.is_visible_to_user = new_order_info['is_visible_to_user']
-        self.last_transaction_at = new_order_info['last_transaction_at']
-        self.price = new_order_info['price']
-        self.quantity = new_order_info['quantity']
-        self.ref_id = new_order_info['ref_id']
-        self.rounded_executed_notional = new_order_info['rounded_executed_notional']
-        self.side = new_order_info['side']
-        self.state = new_order_info['state']
-        self.time_in_force = new_order_info['time_in_force']
-        self.type = new_order_info['type']
-        self.updated_at = new_order_info['updated_at']
+        for field in FIELDS:
+            if field == 'id':
+                continue
+            elif field in NUMERIC_FIELDS:
+                setattr(self, field, parse_number(new_order_info.get(field)))
+            else:
+                setattr(self, field, new_order_info.get(field))
+
+        self.raw_executions = new_order_info.get('executions')
+        self.parsed_executions = None
     
     def cancel(self):
         """
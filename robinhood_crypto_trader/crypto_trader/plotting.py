@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import queue
+import pickle
+import threading
+import subprocess
+import numpy as np
+
+# RGBA: [red, green, blue, alpha]
+STATUS_TO_COLOR = {'live_buy': [1, 0, 0, 1], 'simulated_buy': [1, 0, 0, 0.5], 'unable_to_buy': [1, 1, 0, 1], 'live_sell': [0, 1, 0, 1], 'simulated_sell': [0, 1, 0, 0.5], 'unable_to_sell': [0, 0, 1, 1]}
+
+# Runs main() in the plotting process, the package imports this module so it is not run with -m
+PROCESS_CODE = 'import sys; from robinhood_crypto_trader.crypto_trader.plotting import main; main(sys.argv[1:])'
+
+# Statuses of markers that are drawn as buys, the others are drawn as sells
+BUY_STATUSES = ['live_buy', 'simulated_buy', 'unable_to_buy']
+
+def nearest_index(times, marker_times):
+    """
+    Returns the index of the time in times that is nearest to every time in marker_times
+
+    times must be sorted, the search is a binary search so every marker takes O(log(len(times))).
+    """
+    times = np.asarray(times, dtype=np.float64)
+    marker_times = np.asarray(marker_times, dtype=np.float64)
+
+    if len(times) == 1:
+        return np.zeros(len(marker_times), dtype=np.int64)
+
+    right = np.clip(np.searchsorted(times, marker_times), 1, len(times) - 1)
+    left = right - 1
+
+    return np.where(marker_times - times[left] <= times[right] - marker_times, left, right)
+
+class PlotState():
+    def __init__(self):
+        """
+        What the renderer knows about the prices, trades and portfolio, built from the updates sent by Plotter
+
+        Times are in seconds since the epoch and kept sorted.
+        """
+        # self.prices looks like {'BTC': (times, prices)}, self.markers looks like {'BTC': [(time, status), ...]}
+        self.prices = {}
+        self.markers = {}
+
+        self.portfolio_times = np.empty(0, dtype=np.float64)
+        self.portfolio_values = np.empty(0, dtype=np.float64)
+
+        # The names of the plots that changed since they were last drawn
+        self.changed = set()
+
+    def apply(self, update):
+        """
+        Applies one update from Plotter, which is a tuple whose first entry is its kind
+        """
+        kind = update[0]
+
+        if kind == 'prices':
+            _, crypto_name, times, prices = update
+
+            old_times, old_prices = self.prices.get(crypto_name, (np.empty(0), np.empty(0)))
+
+            # The new prices replace the stored prices from their first time onwards, so a candle can be updated
+            keep = np.searchsorted(old_times, times[0]) if len(times) > 0 else len(old_times)
+
+            self.prices[crypto_name] = (np.concatenate([old_times[:keep], times]), np.concatenate([old_prices[:keep], prices]))
+
+            self.changed.add(crypto_name)
+        elif kind == 'markers':
+            _, crypto_name, times, statuses = update
+
+            self.markers.setdefault(crypto_name, []).extend(zip(times, statuses))
+
+            self.changed.add(crypto_name)
+        elif kind == 'portfolio':
+            _, times, values = update
+
+            self.portfolio_times = np.concatenate([self.portfolio_times, times])
+            self.portfolio_values = np.concatenate([self.portfolio_values, values])
+
+            self.changed.add('portfolio')
+
+    def get_markers(self, crypto_name):
+        """
+        Returns buy_x, buy_y, buy_color, sell_x, sell_y, sell_color of the markers of crypto_name placed on its nearest candle
+        """
+        times, prices = self.prices.get(crypto_name, (np.empty(0), np.empty(0)))
+        markers = self.markers.get(crypto_name, [])
+
+        if len(times) == 0 or len(markers) == 0:
+            return [], [], [], [], [], []
+
+        indices = nearest_index(times, [time for time, status in markers])
+
+        buy_x, buy_y, buy_color = [], [], []
+        sell_x, sell_y, sell_color = [], [], []
+
+        for index, (time, status) in zip(indices, markers):
+            if status in BUY_STATUSES:
+                buy_x.append(times[index])
+                buy_y.append(prices[index])
+                buy_color.append(STATUS_TO_COLOR[status])
+            else:
+                sell_x.append(times[index])
+                sell_y.append(prices[index])
+                sell_color.append(STATUS_TO_COLOR[status])
+
+        return buy_x, buy_y, buy_color, sell_x, sell_y, sell_color
+
+def draw(state, name, figure):
+    """
+    Draws the plot called name ('portfolio' or a crypto) of state on figure
+    """
+    figure.clear()
+
+    axes = figure.add_subplot()
+
+    if name == 'portfolio':
+        axes.plot(state.portfolio_times, state.portfolio_values, 'g-')
+        axes.set_title("Portfolio (cash + crypto equity)")
+        axes.set_xlabel("Runtime (in seconds)")
+        axes.set_ylabel("Price ($)")
+    else:
+        times, prices = state.prices.get(name, (np.empty(0), np.empty(0)))
+
+        buy_x, buy_y, buy_color, sell_x, sell_y, sell_color = state.get_markers(name)
+
+        # Times are drawn as UTC dates
+        to_dates = lambda seconds: np.asarray(seconds, dtype=np.float64).astype('datetime64[s]')
+
+        axes.plot(to_dates(times), prices, 'g-')
+
+        # https://matplotlib.org/stable/api/markers_api.html#module-matplotlib.markers
+        if len(buy_x) > 0:
+            axes.scatter(x=to_dates(buy_x), y=buy_y, c=buy_color)
+
+        if len(sell_x) > 0:
+            axes.scatter(x=to_dates(sell_x), y=sell_y, c=sell_color)
+
+        axes.set_title(name)
+        axes.set_ylabel("Price ($)")
+        axes.set_xlabel("Time")
+
+def read_updates(stream, updates):
+    """
+    Puts every update pickled on stream onto the queue updates, and None when stream ends
+    """
+    while True:
+        try:
+            update = pickle.load(stream)
+        except EOFError:
+            update = None
+
+        updates.put(update)
+
+        if update is None:
+            return
+
+def write_updates(updates, stream):
+    """
+    Pickles every update from the queue updates onto stream until None, then closes stream
+    """
+    try:
+        while True:
+            update = updates.get()
+
+            if update is None:
+                return
+
+            pickle.dump(update, stream)
+            stream.flush()
+    except (BrokenPipeError, OSError):
+        # The plotting process was closed, the updates are dropped
+        pass
+    finally:
+        try:
+            stream.close()
+        except (BrokenPipeError, OSError):
+            pass
+
+def render(updates, output, directory, refresh_interval):
+    """
+    Runs in the plotting process, applies the updates from the queue updates and redraws the plots that changed
+
+    output 'window' draws every plot in its own window and keeps the windows open after the trader stops,
+    output 'file' writes every plot to directory/<name>.png. Only the plots that changed are drawn again, once for
+    every batch of updates. Windows stay responsive by checking for updates every refresh_interval seconds.
+    """
+    import matplotlib
+
+    if output == 'file':
+        matplotlib.use('Agg')
+
+    import matplotlib.pyplot as plt
+
+    if output == 'window':
+        plt.ion()
+    else:
+        os.makedirs(directory, exist_ok=True)
+
+    state = PlotState()
+    figures = {}
+
+    running = True
+
+    while running:
+        try:
+            update = updates.get(timeout=refresh_interval)
+        except queue.Empty:
+            update = ('wait',)
+
+        # Every update that is already waiting is applied before drawing once
+        while True:
+            if update is None:
+                running = False
+            else:
+                state.apply(update)
+
+            try:
+                update = updates.get_nowait()
+            except queue.Empty:
+                break
+
+        for name in sorted(state.changed):
+            if name not in figures:
+                figures[name] = plt.figure(name)
+
+            draw(state, name, figures[name])
+
+            if output == 'file':
+                path = os.path.join(directory, name + '.png')
+
+                # Written to another file first so that a reader never sees a partially written image
+                figures[name].savefig(path + '.tmp.png')
+
+                os.replace(path + '.tmp.png', path)
+
+        state.changed = set()
+
+        if output == 'window' and len(figures) > 0:
+            plt.pause(0.01)
+
+    if output == 'window' and len(figures) > 0:
+        plt.ioff()
+        plt.show()
+
+def main(argv):
+    """
+    The plotting process, run by Plotter with the arguments: output directory refresh_interval
+    """
+    output, directory, refresh_interval = argv[0], argv[1], float(argv[2])
+
+    updates = queue.Queue()
+
+    reader = threading.Thread(target=read_updates, args=(sys.stdin.buffer, updates), daemon=True)
+    reader.start()
+
+    render(updates, output, directory, refresh_interval)
+
+class Plotter():
+    def __init__(self, output='window', directory='./plots', refresh_interval=1.0):
+        """
+        Plots prices, trades and the portfolio in a separate process so that trading never waits for matplotlib
+
+        Only what is new is sent to the plotting process: the candles from the latest candle that was sent onwards,
+        each trade marker once, and the new points of the portfolio. The process is started by the first update
+        and every update is put on its queue without waiting for the plotting process.
+
+        output is 'window' or 'file', see render()
+        """
+        assert output in ['window', 'file']
+
+        self.output = output
+        self.directory = directory
+        self.refresh_interval = refresh_interval
+
+        self.updates = None
+        self.process = None
+        self.writer = None
+
+        # The time of the latest candle that was sent for every crypto
+        self.sent = {}
+
+    def __repr__(self):
+        return 'Plotter(output:' + self.output + ', directory:' + self.directory + ')'
+
+    def start(self):
+        """
+        Starts the plotting process and the thread that writes the updates to it
+        """
+        # A new interpreter that only runs main(), so that the trader's script is not run again and matplotlib
+        # is never imported by the trader
+        environment = dict(os.environ, PYTHONPATH=os.pathsep.join(path for path in sys.path if path != ''))
+
+        self.process = subprocess.Popen([sys.executable, '-c', PROCESS_CODE, self.output, self.directory, str(self.refresh_interval)], stdin=subprocess.PIPE, env=environment)
+
+        self.updates = queue.Queue()
+
+        self.writer = threading.Thread(target=write_updates, args=(self.updates, self.process.stdin), name='plotter', daemon=True)
+        self.writer.start()
+
+    def send(self, update):
+        """
+        Queues an update for the plotting process without waiting for it
+        """
+        if self.process is None:
+            self.start()
+
+        self.updates.put(update)
+
+    def update_prices(self, crypto_name, times, prices):
+        """
+        Sends the candles of crypto_name that are not sent yet, times are in seconds since the epoch and sorted
+
+        The latest candle that was already sent is sent again since it may have changed.
+        """
+        times = np.asarray(times, dtype=np.float64)
+        prices = np.asarray(prices, dtype=np.float64)
+
+        start = np.searchsorted(times, self.sent[crypto_name]) if crypto_name in self.sent else 0
+
+        if start < len(times):
+            self.send(('prices', crypto_name, times[start:], prices[start:]))
+
+            self.sent[crypto_name] = times[-1]
+
+    def add_markers(self, crypto_name, times, statuses):
+        """
+        Sends trades of crypto_name at times (seconds since the epoch) with statuses, which are keys of STATUS_TO_COLOR
+
+        Every marker is drawn on the candle nearest to its time.
+        """
+        assert all(status in STATUS_TO_COLOR for status in statuses)
+
+        if len(statuses) > 0:
+            self.send(('markers', crypto_name, np.asarray(times, dtype=np.float64), list(statuses)))
+
+    def add_marker(self, crypto_name, time, status):
+        """
+        Sends one trade of crypto_name, see add_markers()
+        """
+        self.add_markers(crypto_name, [time], [status])
+
+    def update_portfolio(self, times, values):
+        """
+        Sends new points of the portfolio, times are in seconds (e.g. the runtime of the trader)
+        """
+        self.send(('portfolio', np.atleast_1d(np.asarray(times, dtype=np.float64)), np.atleast_1d(np.asarray(values, dtype=np.float64))))
+
+    def stop(self):
+        """
+        Tells the plotting process that no more updates are coming
+
+        Files are written one last time. Windows stay open until they are closed, the trader does not wait for them.
+        """
+        if self.process is not None:
+            self.updates.put(None)
+
+            # The updates that are already queued are written to the plotting process, for a few seconds at most
+            self.writer.join(5)
+
+            # Later updates start a new plotting process
+            self.updates = None
+            self.process = None
+            self.sent = {}
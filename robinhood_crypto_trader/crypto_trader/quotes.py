@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import time as t
+import threading
+import robin_stocks.robinhood as rh
+
+def download_quote(crypto_symbol):
+    """
+    Returns the latest quote of crypto_symbol from Robinhood
+    """
+    return rh.crypto.get_crypto_quote(crypto_symbol)
+
+class QuoteCache():
+    def __init__(self, fetch=download_quote, max_age=None, fetcher=None):
+        """
+        Serves quotes from a snapshot that is taken once per cryptocurrency
+
+        If max_age is None, a snapshot is kept until new_iteration() is called. Otherwise a snapshot is kept for
+        max_age seconds regardless of iterations.
+
+        fetch(crypto_symbol) returns a quote in the format of rh.crypto.get_crypto_quote()
+
+        If a Fetcher is given, snapshot() takes the missing snapshots concurrently. get() can be called from many threads
+        at once, the snapshots and counters are only changed while holding self.lock.
+        """
+        assert max_age is None or max_age >= 0
+
+        self.fetch = fetch
+        self.max_age = max_age
+        self.fetcher = fetcher
+
+        # self.snapshots looks like {'crypto1': (time_taken, quote), 'crypto2': (time_taken, quote)}
+        self.snapshots = {}
+
+        self.hits = 0
+        self.misses = 0
+
+        # Guards self.snapshots, self.hits and self.misses, quotes are downloaded without holding it
+        self.lock = threading.Lock()
+
+    def __repr__(self):
+        return 'QuoteCache(max_age:' + str(self.max_age) + ', hits:' + str(self.hits) + ', misses:' + str(self.misses) + ')'
+
+    def get(self, crypto_symbol):
+        """
+        Returns the snapshot of the quote of crypto_symbol, taking a new snapshot if there is none or it is too old
+        """
+        with self.lock:
+            if self.is_fresh(crypto_symbol):
+                self.hits += 1
+
+                return self.snapshots[crypto_symbol][1]
+
+            self.misses += 1
+
+        quote = self.fetch(crypto_symbol)
+
+        with self.lock:
+            self.snapshots[crypto_symbol] = (t.time(), quote)
+
+        return quote
+
+    def is_fresh(self, crypto_symbol):
+        """
+        Returns True if there is a snapshot of crypto_symbol that can still be served
+        """
+        snapshot = self.snapshots.get(crypto_symbol)
+
+        return snapshot is not None and (self.max_age is None or t.time() - snapshot[0] <= self.max_age)
+
+    def snapshot(self, crypto_symbols):
+        """
+        Takes a snapshot of every crypto in crypto_symbols that does not have one that can still be served
+
+        Returns the quotes keyed by crypto symbol.
+        """
+        with self.lock:
+            missing = [crypto_symbol for crypto_symbol in crypto_symbols if not self.is_fresh(crypto_symbol)]
+
+        if self.fetcher is not None:
+            quotes = self.fetcher.map(self.fetch, missing)
+        else:
+            quotes = {crypto_symbol: self.fetch(crypto_symbol) for crypto_symbol in missing}
+
+        self.put(quotes)
+
+        with self.lock:
+            return {crypto_symbol: self.snapshots[crypto_symbol][1] for crypto_symbol in crypto_symbols}
+
+    def put(self, quotes):
+        """
+        Stores quotes ({crypto_symbol: quote}) that were downloaded elsewhere as snapshots taken now
+        """
+        time_taken = t.time()
+
+        with self.lock:
+            for crypto_symbol, quote in quotes.items():
+                self.snapshots[crypto_symbol] = (time_taken, quote)
+
+            self.misses += len(quotes)
+
+    def new_iteration(self):
+        """
+        Drops the snapshots of the previous iteration when the snapshots are not kept by age
+        """
+        if self.max_age is None:
+            with self.lock:
+                self.snapshots = {}
+
+    def invalidate(self, crypto_symbol=None):
+        """
+        Drops the snapshot of crypto_symbol, or every snapshot if crypto_symbol is None
+        """
+        with self.lock:
+            if crypto_symbol is None:
+                self.snapshots = {}
+            else:
+                self.snapshots.pop(crypto_symbol, None)
+
+    def get_hit_rate(self):
+        """
+        Returns the fraction of requests that were served from a snapshot
+        """
+        if self.hits + self.misses == 0:
+            return 0.0
+
+        return self.hits / (self.hits + self.misses)
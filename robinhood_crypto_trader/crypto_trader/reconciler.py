@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import robin_stocks.robinhood as rh
+
+from robinhood_crypto_trader.crypto_trader.order import iterate_order_info_pages
+from robinhood_crypto_trader.crypto_trader.ledger import FINAL_STATES, to_float
+
+def download_open_orders(since=None, fetch_pages=iterate_order_info_pages):
+    """
+    Returns the order information of every open crypto order of the account created at or after since
+
+    Only the pages of orders back to since are downloaded instead of the whole order history.
+    fetch_pages(since) yields pages of order information newest first (see order.iterate_order_info_pages)
+
+    Returns [None] if a page could not be downloaded, like robin_stocks does for lists.
+    """
+    open_orders = []
+
+    for page in fetch_pages(since):
+        if None in page:
+            return [None]
+
+        open_orders += [order_info for order_info in page if order_info['cancel_url'] is not None]
+
+    return open_orders
+
+def download_order(order_id):
+    """
+    Returns the order information of the crypto order with id order_id
+    """
+    return rh.orders.get_crypto_order_info(order_id)
+
+class OrderReconciler():
+    def __init__(self, fetch_open_orders=download_open_orders, fetch_order=download_order):
+        """
+        Keeps the orders placed by the trader up to date with one bulk request per poll
+
+        Orders are indexed by id. poll() downloads the open orders of the account with fetch_open_orders(since), where since
+        is the 'created_at' of the oldest open order, and only updates the orders whose state or updated_at changed.
+        An order that is no longer open is downloaded on its own once so that its final state is known. If the open orders
+        can not be downloaded (None or [None]) the poll is skipped, the next poll downloads them again.
+
+        Every change is reported as an event to the callbacks added with subscribe(). Events look like
+        {'type': 'fill', 'order': Order, 'crypto': 'BTC', 'side': 'buy', 'quantity': 0.01, 'notional': 200.00, 'price': 20000.00, 'state': 'filled'}
+        where quantity and notional are the part that was filled since the previous event of the order, or
+        {'type': 'state', ...} with a quantity of 0 when only the state changed.
+        """
+        self.fetch_open_orders = fetch_open_orders
+        self.fetch_order = fetch_order
+
+        # self.orders looks like {order_id: Order}, self.crypto looks like {order_id: 'BTC'}
+        self.orders = {}
+        self.crypto = {}
+
+        # The filled quantity and notional of every order that were last reported, {order_id: (quantity, notional)}
+        self.filled = {}
+
+        self.callbacks = []
+
+        self.polls = 0
+        self.requests = 0
+        self.failures = 0
+
+    def __repr__(self):
+        return 'OrderReconciler(orders:' + str(len(self.orders)) + ', open:' + str(len(self.get_open_orders())) + ', polls:' + str(self.polls) + ')'
+
+    def subscribe(self, callback):
+        """
+        Calls callback(event) for every event from now on
+        """
+        self.callbacks.append(callback)
+
+    def add(self, order, crypto_name):
+        """
+        Starts keeping order (Order class) placed for crypto_name up to date and returns the events of its current state
+        """
+        self.orders[order.id] = order
+        self.crypto[order.id] = crypto_name
+        self.filled[order.id] = (0.0, 0.0)
+
+        return self.emit(order)
+
+    def get_open_orders(self):
+        """
+        Returns the orders (Order class) that are not in a final state
+        """
+        return [order for order in self.orders.values() if order.state not in FINAL_STATES]
+
+    def poll(self):
+        """
+        Downloads the open orders in bulk, updates the orders that changed and returns the events of the changes
+        """
+        open_orders = self.get_open_orders()
+
+        if len(open_orders) == 0:
+            return []
+
+        self.polls += 1
+        self.requests += 1
+
+        events = []
+        seen = set()
+
+        since = min([order.created_at for order in open_orders if order.created_at is not None], default=None)
+
+        downloaded = self.fetch_open_orders(since)
+
+        # robin_stocks returns None or [None] when the request fails, the orders that are missing then may still be open
+        if downloaded is None or None in downloaded:
+            self.failures += 1
+
+            print('Could not download the open orders: skipping the order poll')
+
+            return []
+
+        for order_info in downloaded:
+            order = self.orders.get(order_info['id'])
+
+            if order is None:
+                continue
+
+            seen.add(order.id)
+
+            events += self.update(order, order_info)
+
+        # Orders that are not open anymore are filled, canceled, rejected or failed
+        for order in open_orders:
+            if order.id not in seen:
+                self.requests += 1
+
+                order_info = self.fetch_order(order.id)
+
+                if order_info is not None and 'id' in order_info:
+                    events += self.update(order, order_info)
+
+        return events
+
+    def update(self, order, order_info):
+        """
+        Updates order with order_info if it changed and returns the events of the change
+        """
+        if order_info['state'] == order.state and order_info['updated_at'] == order.updated_at:
+            return []
+
+        order.update(order_info)
+
+        return self.emit(order)
+
+    def emit(self, order):
+        """
+        Sends the events of order since its previous event to every callback and returns them
+        """
+        quantity = to_float(order.cumulative_quantity)
+        notional = to_float(order.rounded_executed_notional) or quantity * to_float(order.average_price)
+
+        previous_quantity, previous_notional = self.filled[order.id]
+
+        new_quantity = quantity - previous_quantity
+        new_notional = notional - previous_notional
+
+        self.filled[order.id] = (quantity, notional)
+
+        event = {
+            'type': 'fill' if new_quantity > 0 else 'state',
+            'order': order,
+            'crypto': self.crypto[order.id],
+            'side': order.side,
+            'quantity': max(new_quantity, 0.0),
+            'notional': max(new_notional, 0.0),
+            'price': new_notional / new_quantity if new_quantity > 0 else 0.0,
+            'state': order.state
+        }
+
+        for callback in self.callbacks:
+            callback(event)
+
+        return [event]
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import math
+import asyncio
+import time as t
+
+# 1970-01-01 was a Thursday, weekly candles begin on Monday
+WEEK_OFFSET = 4 * 86400
+
+def get_next_boundary(now, interval, offset=0):
+    """
+    Returns the first candle boundary after now, in seconds since the epoch
+
+    Candles of interval seconds begin at multiples of interval since the epoch, shifted by offset seconds.
+    """
+    return (math.floor((now - offset) / interval) + 1) * interval + offset
+
+class Scheduler():
+    def __init__(self, interval, delay=0.0, offset=0, clock=t.time, sleep=asyncio.sleep):
+        """
+        Runs a coroutine right after every candle boundary of interval seconds
+
+        Every tick is scheduled from the wall clock, so a slow tick does not push back the ticks after it.
+        If a tick runs past the next boundary, the boundaries it missed are skipped and recorded in self.overruns.
+
+        delay is the number of seconds to wait after a boundary so that the closed candle is available.
+        """
+        assert interval > 0 and delay >= 0
+
+        self.interval = interval
+        self.delay = delay
+        self.offset = offset
+        self.clock = clock
+        self.sleep = sleep
+
+        # self.overruns looks like [{'boundary': 1674251040, 'runtime': 21.3, 'skipped': 1}, ...]
+        self.overruns = []
+
+        self.ticks = 0
+
+    def __repr__(self):
+        return 'Scheduler(interval:' + str(self.interval) + ', delay:' + str(self.delay) + ', ticks:' + str(self.ticks) + ', overruns:' + str(len(self.overruns)) + ')'
+
+    async def wait(self):
+        """
+        Sleeps until the next boundary plus self.delay and returns the boundary
+        """
+        boundary = get_next_boundary(self.clock() - self.delay, self.interval, self.offset)
+
+        wait_time = boundary + self.delay - self.clock()
+
+        if wait_time > 0:
+            await self.sleep(wait_time)
+
+        return boundary
+
+    async def run(self, tick, continue_running):
+        """
+        Awaits tick(boundary) after every boundary for as long as continue_running() returns True
+        """
+        while continue_running():
+            boundary = await self.wait()
+
+            start = self.clock()
+
+            await tick(boundary)
+
+            end = self.clock()
+
+            self.ticks += 1
+
+            # The boundaries between the boundary of this tick and now were missed
+            skipped = math.floor((end - self.delay - self.offset) / self.interval) - math.floor((boundary - self.offset) / self.interval)
+
+            if skipped > 0:
+                self.overruns.append({'boundary': boundary, 'runtime': end - start, 'skipped': skipped})
+
+                print('Iteration took ' + str(round(end - start, 2)) + ' seconds, skipping ' + str(skipped) + ' candle(s)')
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import pickle
+import subprocess
+
+from robinhood_crypto_trader.crypto_trader import backtest
+from robinhood_crypto_trader.crypto_trader.candles import CandleStore, FIELDS
+from robinhood_crypto_trader.crypto_trader.fetch import Fetcher
+from robinhood_crypto_trader.crypto_trader.strategy import DECISIONS
+from robinhood_crypto_trader.crypto_trader.latency import LatencyRecorder
+from robinhood_crypto_trader.crypto_trader.broker import get_broker
+from robinhood_crypto_trader.crypto_trader.supervisor import RetryableError
+
+# Runs main() in a worker process, the package imports this module so it is not run with -m
+PROCESS_CODE = 'import sys; from robinhood_crypto_trader.crypto_trader.shard import main; main(sys.argv[1:])'
+
+def split_crypto(crypto, number_of_shards):
+    """
+    Returns crypto split into at most number_of_shards shards of nearly equal size, e.g. ['A', 'B', 'C'], 2 -> [['A', 'C'], ['B']]
+    """
+    assert number_of_shards >= 1
+
+    return [crypto[i::number_of_shards] for i in range(min(number_of_shards, len(crypto)))]
+
+def get_window(determine_trade_function, arguments):
+    """
+    Returns the number of latest prices that the builtin trade function determine_trade_function decides on
+
+    Trade functions other than 'boll' and 'macd_rsi' always HOLD and need one price.
+    """
+    if determine_trade_function == 'boll':
+        period, std_width = arguments if arguments != [] else backtest.BOLL_ARGUMENTS
+
+        return period
+    elif determine_trade_function == 'macd_rsi':
+        arguments = arguments if arguments != [] else backtest.MACD_RSI_ARGUMENTS
+
+        # rsi_index and macd_index are negative
+        return max(-arguments[1], -arguments[7])
+    else:
+        return 1
+
+class ShardWorker():
+    def __init__(self, config, crypto, crypto_meta_data, session=None, lookback=None):
+        """
+        Downloads the quotes and candles of the cryptos in crypto and decides their trades, run by a worker process of ShardPool
+
+        config is the configuration of the trader (see make_worker_config). The worker uses the broker of config and the
+        login session of the trader, so it never logs in itself. With a lookback the trades are decided by the strategy of the
+        trader, so the worker only returns the latest lookback candles of every crypto. Otherwise the worker decides the
+        trades with the builtin trade function config['determine_trade_function'] on the latest candles.
+        """
+        self.crypto = list(crypto)
+        self.crypto_meta_data = crypto_meta_data
+        self.lookback = lookback
+
+        self.determine_trade_func = config['determine_trade_function']
+        self.builtin_trade_function_arguments = config.get('builtin_trade_function_arguments', [])
+
+        self.window = get_window(self.determine_trade_func, self.builtin_trade_function_arguments)
+
+        self.broker = get_broker(config)
+        self.broker.resume_session(session)
+
+        self.fetcher = Fetcher(config.get('max_workers', 8))
+
+        # The latencies of the current iteration, sent to the trader with its results
+        self.latency = LatencyRecorder()
+
+        self.candles = {crypto_name: CandleStore(crypto_name, config['trader']['interval'], config['trader']['span'], config['trader']['bounds'], self.broker.get_crypto_historicals) for crypto_name in self.crypto}
+
+        self.fetcher.map(lambda crypto_name: self.candles[crypto_name].load(), self.crypto)
+
+    def __repr__(self):
+        return 'ShardWorker(crypto:' + str(self.crypto) + ')'
+
+    def download_quote(self, crypto_name):
+        """
+        Downloads the latest quote of crypto_name with the id from self.crypto_meta_data
+        """
+        with self.latency.time('quote_fetch', crypto_name):
+            if crypto_name in self.crypto_meta_data:
+                return self.broker.get_crypto_quote_from_id(self.crypto_meta_data[crypto_name]['id'])
+            else:
+                return self.broker.get_crypto_quote(crypto_name)
+
+    def update_crypto_candles(self, crypto_name):
+        """
+        Downloads the candles of crypto_name that are newer than its latest stored candle
+        """
+        with self.latency.time('historicals_fetch', crypto_name):
+            self.candles[crypto_name].update()
+
+    def decide(self, crypto_name):
+        """
+        Returns 'BUY', 'SELL' or 'HOLD' for crypto_name with the builtin trade function, like Trader.determine_trade()
+        """
+        with self.latency.time('indicator_compute', crypto_name):
+            prices = self.candles[crypto_name].close[-self.window:]
+
+            if len(prices) < self.window:
+                return 'HOLD'
+
+            return DECISIONS[int(backtest.compute_signals(self.determine_trade_func, self.builtin_trade_function_arguments, prices)[-1])]
+
+    def get_candles(self, crypto_name):
+        """
+        Returns (times, columns) of the latest self.lookback candles of crypto_name, see candles.stack_candles()
+        """
+        store = self.candles[crypto_name]
+
+        return store.times[-self.lookback:].copy(), {field: store.column(field)[-self.lookback:].copy() for field in FIELDS}
+
+    def iterate(self):
+        """
+        Downloads the quotes and the newest candles of every crypto of the shard and decides their trades
+
+        Returns {'quotes': {crypto_name: quote}, 'decisions': {crypto_name: trade}, 'candles': {crypto_name: (times, columns)},
+        'latency': {(phase, crypto_name): LatencyHistogram}}, where 'candles' are only returned for a strategy and
+        'decisions' only without one.
+        """
+        quotes = self.fetcher.map(self.download_quote, self.crypto)
+
+        self.fetcher.map(self.update_crypto_candles, self.crypto)
+
+        if self.lookback is not None:
+            decisions = {}
+            candles = {crypto_name: self.get_candles(crypto_name) for crypto_name in self.crypto}
+        else:
+            decisions = {crypto_name: self.decide(crypto_name) for crypto_name in self.crypto}
+            candles = {}
+
+        latency = self.latency.histograms
+
+        self.latency = LatencyRecorder()
+
+        return {'quotes': quotes, 'decisions': decisions, 'candles': candles, 'latency': latency}
+
+def write(stream, message):
+    """
+    Pickles message onto stream, nothing is written if message can not be pickled
+    """
+    data = pickle.dumps(message)
+
+    stream.write(data)
+    stream.flush()
+
+def main(argv):
+    """
+    The worker process, run by ShardPool
+
+    Reads the arguments of ShardWorker from stdin, then runs one iteration for every request until stdin is closed. Every
+    reply on stdout is ('ready', None), ('result', result) or ('error', exception).
+    """
+    requests = sys.stdin.buffer
+    replies = sys.stdout.buffer
+
+    # stdout only carries replies, whatever the worker prints goes to stderr
+    sys.stdout = sys.stderr
+
+    try:
+        worker = ShardWorker(*pickle.load(requests))
+    except Exception as exception:
+        write(replies, ('error', exception))
+
+        return
+
+    write(replies, ('ready', None))
+
+    while True:
+        try:
+            request = pickle.load(requests)
+        except EOFError:
+            return
+
+        if request is None:
+            return
+
+        try:
+            reply = ('result', worker.iterate())
+        except Exception as exception:
+            reply = ('error', exception)
+
+        try:
+            write(replies, reply)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            write(replies, ('error', RuntimeError(repr(reply[1]))))
+
+def close_requests(process):
+    """
+    Closes the requests of a worker process, which makes it stop once it finished its iteration
+    """
+    try:
+        process.stdin.close()
+    except (BrokenPipeError, OSError):
+        pass
+
+def stop_process(process, timeout=5):
+    """
+    Stops a worker process, killing it if it does not stop within timeout seconds
+    """
+    close_requests(process)
+
+    try:
+        process.wait(timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+    process.stdout.close()
+
+def make_worker_config(config):
+    """
+    Returns the part of the trader's configuration that a worker needs, without anything that can not be sent to it
+    """
+    return {
+        'broker': config.get('broker', 'robinhood'),
+        'simulation': config.get('simulation', {}),
+        'crypto': [],
+        'trader': config['trader'],
+        'max_workers': config.get('max_workers', 8),
+        'determine_trade_function': config['determine_trade_function'] if type(config['determine_trade_function']) == str else None,
+        'builtin_trade_function_arguments': config.get('builtin_trade_function_arguments', [])
+    }
+
+class ShardPool():
+    def __init__(self, config, crypto, crypto_meta_data, number_of_shards, session=None, lookback=None):
+        """
+        Splits crypto across number_of_shards worker processes that download the quotes and candles and decide the trades
+
+        Every worker owns its shard: it keeps the candles of its cryptos and downloads their quotes and candles concurrently.
+        The trader keeps the cash, the orders and the loss limits. Every iteration the trader asks every worker at once
+        and waits for all of them, so the network waits and the indicators of different shards overlap.
+
+        session is the login session of the trader (see RobinhoodBroker.get_session), lookback is the lookback of the
+        trader's strategy or None for a builtin trade function, see ShardWorker.
+
+        A worker that stopped is started again: before an iteration if it stopped in between, or after the iteration
+        that it stopped in, which then raises a RetryableError so that the trader runs the iteration again.
+        """
+        assert number_of_shards >= 1
+
+        self.config = make_worker_config(config)
+        self.crypto = list(crypto)
+        self.crypto_meta_data = crypto_meta_data
+        self.session = session
+        self.lookback = lookback
+
+        self.shards = split_crypto(self.crypto, number_of_shards)
+
+        self.processes = []
+        self.ready = []
+
+    def __repr__(self):
+        return 'ShardPool(shards:' + str(len(self.shards)) + ', running:' + str(len(self.processes) > 0) + ')'
+
+    def start(self):
+        """
+        Starts a worker process for every shard, the workers load their candles while the trader starts
+        """
+        self.processes = [self.start_worker(shard) for shard in self.shards]
+        self.ready = [False] * len(self.shards)
+
+    def start_worker(self, shard):
+        """
+        Starts and returns a worker process for the cryptos of shard
+        """
+        # New interpreters that only run main(), so that the trader's script is not run again
+        environment = dict(os.environ, PYTHONPATH=os.pathsep.join(path for path in sys.path if path != ''))
+
+        process = subprocess.Popen([sys.executable, '-c', PROCESS_CODE], stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=environment)
+
+        try:
+            write(process.stdin, (self.config, shard, {crypto_name: self.crypto_meta_data[crypto_name] for crypto_name in shard}, self.session, self.lookback))
+        except (BrokenPipeError, OSError):
+            # read() reports the worker as stopped
+            pass
+
+        return process
+
+    def restart(self, index):
+        """
+        Stops worker index if it is still running and starts a new one for its shard
+        """
+        print('Shard worker ' + str(index) + ' stopped: starting it again')
+
+        stop_process(self.processes[index])
+
+        self.processes[index] = self.start_worker(self.shards[index])
+        self.ready[index] = False
+
+    def read(self, index):
+        """
+        Returns the next reply of worker index, raising the exception of an error reply
+
+        Raises a RetryableError if the worker stopped.
+        """
+        try:
+            kind, value = pickle.load(self.processes[index].stdout)
+        except (EOFError, pickle.UnpicklingError, OSError):
+            raise RetryableError('shard worker ' + str(index) + ' stopped')
+
+        if kind == 'error':
+            raise value
+
+        return value
+
+    def iterate(self):
+        """
+        Runs one iteration on every worker and returns their results merged, see ShardWorker.iterate()
+
+        The 'latency' of the result is a list of the latency histograms of the workers.
+        """
+        if len(self.processes) == 0:
+            self.start()
+
+        for index in range(len(self.processes)):
+            if self.processes[index].poll() is not None:
+                self.restart(index)
+
+        for index in range(len(self.processes)):
+            if not self.ready[index]:
+                try:
+                    self.read(index)
+                except RetryableError:
+                    self.restart(index)
+
+                    raise
+
+                self.ready[index] = True
+
+        stopped = []
+
+        # Every worker is asked before any reply is read so that the workers run at the same time
+        for index, process in enumerate(self.processes):
+            try:
+                write(process.stdin, 'iterate')
+            except (BrokenPipeError, OSError):
+                stopped.append(index)
+
+        merged = {'quotes': {}, 'decisions': {}, 'candles': {}, 'latency': []}
+
+        error = None
+
+        for index in range(len(self.processes)):
+            try:
+                if index in stopped:
+                    raise RetryableError('shard worker ' + str(index) + ' stopped')
+
+                result = self.read(index)
+            except RetryableError as exception:
+                if error is None:
+                    error = exception
+
+                self.restart(index)
+
+                continue
+            except Exception as exception:
+                # The replies of the other workers are still read so that the next iteration gets its own replies
+                if error is None:
+                    error = exception
+
+                continue
+
+            for key in ['quotes', 'decisions', 'candles']:
+                merged[key].update(result[key])
+
+            merged['latency'].append(result['latency'])
+
+        if error is not None:
+            raise error
+
+        return merged
+
+    def stop(self):
+        """
+        Stops every worker process
+        """
+        for process in self.processes:
+            close_requests(process)
+
+        for process in self.processes:
+            stop_process(process)
+
+        self.processes = []
+        self.ready = []
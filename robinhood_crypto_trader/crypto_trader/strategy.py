@@ -1,18 +1,113 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import robin_stocks.robinhood as rh
+import numpy as np
+
+# Signals are stored as small integers so that a whole backtest can be kept in one array
+HOLD, BUY, SELL = 0, 1, -1
+
+# Decisions as they are named by Trader
+DECISIONS = {HOLD: 'HOLD', BUY: 'BUY', SELL: 'SELL'}
+
+# Strategies that can be selected by name with config['determine_trade_function'], see register()
+STRATEGIES = {}
+
+def to_signals(decisions, number_of_crypto):
+    """
+    Returns decisions as an int8 array of HOLD, BUY and SELL
+
+    decisions can be a single decision for every crypto or one decision per crypto, either as 'HOLD', 'BUY' and 'SELL'
+    or as HOLD, BUY and SELL.
+    """
+    codes = {'HOLD': HOLD, 'BUY': BUY, 'SELL': SELL}
+
+    if isinstance(decisions, str):
+        decisions = [decisions] * number_of_crypto
+
+    signals = np.array([codes[decision] if isinstance(decision, str) else decision for decision in np.ravel(np.asarray(decisions, dtype=object))], dtype=np.int8)
+
+    if len(signals) == 1:
+        signals = np.repeat(signals, number_of_crypto)
+
+    assert len(signals) == number_of_crypto
+    assert np.isin(signals, [HOLD, BUY, SELL]).all()
+
+    return signals
+
+def register(strategy):
+    """
+    Makes strategy selectable with config['determine_trade_function'] = strategy.name and returns it
+    """
+    STRATEGIES[strategy.name] = strategy
+
+    return strategy
+
+def get_strategy(determine_trade_function):
+    """
+    Returns the Strategy of config['determine_trade_function'], which is a Strategy or the name of a registered Strategy
+
+    Returns None for the builtin trade functions 'boll' and 'macd_rsi' and for names that are not registered.
+    """
+    if isinstance(determine_trade_function, Strategy):
+        return determine_trade_function
+
+    if isinstance(determine_trade_function, str):
+        return STRATEGIES.get(determine_trade_function)
+
+    return None
 
 class Strategy():
-    def __init__(self, function, arguments=[]):
+    def __init__(self, function, arguments=None, lookback=1, name=None):
+        """
+        A trading strategy that decides for every crypto at once from arrays of candles
+
+        function(ohlcv, *arguments) returns the decision of every crypto at the latest candle, as a list or array of
+        'BUY', 'SELL' and 'HOLD' (or backtest.BUY, backtest.SELL and backtest.HOLD), or a single decision for every crypto.
+
+        ohlcv = {'crypto': ['BTC', 'ETH'], 'begins_at': int64 array, 'open_price': float64 array, 'close_price': ..., 'high_price': ...,
+        'low_price': ..., 'volume': ...} where every array has one row per crypto and one column per candle, oldest first.
+        Trader downloads the candles once per iteration and passes every crypto to one call.
+
+        lookback is the number of candles that function needs, only the latest lookback candles are passed to it.
+
+        A Strategy can be given as config['determine_trade_function'] directly, or registered with register() and selected by name.
+        Subclasses can override decide(), and signals() to compute every candle of a backtest at once.
+        """
+        assert callable(function)
+        assert type(lookback) == int and lookback >= 1
+
         self.function = function
-        self.arguments = arguments
-    
-    def execute(self):
-        crypto_historicals = rh.crypto.get_crypto_historicals('BTC', interval='5minute', span='day', bounds='24_7')
-        
-        trade = eval(str(self.function) + '(crypto_historicals, self.arguments)')
-        
-        assert trade in ['BUY', 'SELL', 'HOLD']
-        
-        return trade
+        self.arguments = arguments if arguments is not None else []
+        self.lookback = lookback
+
+        if name is None:
+            name = getattr(function, '__name__', 'strategy')
+
+        self.name = name
+
+    def __repr__(self):
+        return 'Strategy(name:' + self.name + ', arguments:' + str(self.arguments) + ', lookback:' + str(self.lookback) + ')'
+
+    def decide(self, ohlcv):
+        """
+        Returns the decision of every crypto of ohlcv at its latest candle as an int8 array of HOLD, BUY and SELL
+        """
+        return to_signals(self.function(ohlcv, *self.arguments), len(ohlcv['crypto']))
+
+    def signals(self, ohlcv):
+        """
+        Returns the decision of every crypto at every candle of ohlcv using only the candles up to that candle
+
+        The result has the shape of ohlcv['close_price']. Candles without lookback candles before them are HOLD.
+        This calls decide() once per candle, subclasses with a vectorized strategy can compute every candle at once.
+        """
+        number_of_crypto, number_of_bars = ohlcv['close_price'].shape
+
+        signals = np.zeros((number_of_crypto, number_of_bars), dtype=np.int8)
+
+        for bar in range(self.lookback - 1, number_of_bars):
+            window = {key: (value[:, bar-self.lookback+1:bar+1] if key != 'crypto' else value) for key, value in ohlcv.items()}
+
+            signals[:, bar] = self.decide(window)
+
+        return signals
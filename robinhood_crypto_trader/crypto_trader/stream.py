@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from robinhood_crypto_trader.crypto_trader.backtest import Backtester
+from robinhood_crypto_trader.crypto_trader.candles import FIELDS, align
+from robinhood_crypto_trader.crypto_trader.strategy import HOLD
+from robinhood_crypto_trader.crypto_trader.shard import get_window
+
+class StreamingBacktester(Backtester):
+    def __init__(self, config, archive, crypto_meta_data, start=None, end=None, start_index=None):
+        """
+        Backtests a trader configuration over the candles of archive (a CandleArchive) one file at a time
+
+        Only one file of candles per crypto is in memory at once, together with the latest candles that the trade function
+        needs: the window of 'boll' or 'macd_rsi', or the lookback of a strategy. These are carried over to the next file,
+        so the signals are the same as those of a Backtester over the whole history. Cash, holdings and bought prices carry
+        over as well. Strategies must only use their latest lookback candles.
+
+        Every crypto is traded on the candles of the first crypto. Where another crypto has no candle at that time its
+        latest earlier close is used, and it is not traded before its first candle.
+
+        start and end limit the backtest to the candles that begin at or after start and before end (seconds since the epoch).
+        start_index is the first bar that is traded, see Backtester.
+        """
+        self.configure(config, crypto_meta_data, start_index)
+
+        self.archive = archive
+        self.start = start
+        self.end = end
+
+        if self.strategy is not None:
+            self.window = self.strategy.lookback
+        else:
+            self.window = get_window(self.determine_trade_func, self.builtin_trade_function_arguments)
+
+        self.times = np.zeros(0, dtype=np.int64)
+        self.closes = np.zeros((len(self.crypto), 0))
+        self.signals = np.zeros((len(self.crypto), 0), dtype=np.int8)
+        self.number_of_bars = 0
+
+        # The number of bars of the files that were simulated
+        self.bars = 0
+
+        self.reset()
+
+    def __repr__(self):
+        return 'StreamingBacktester(crypto:' + str(self.crypto) + ', determine_trade_function:' + str(self.determine_trade_func) + ', archive:' + str(self.archive) + ', bars:' + str(self.bars) + ')'
+
+    def iterate_bars(self):
+        """
+        Yields (times, ohlcv) for every file of the first crypto, with the candles of every crypto aligned to its times
+
+        ohlcv has arrays of shape (cryptos, bars) like the argument of Strategy.signals().
+        """
+        previous = {field: np.full(len(self.crypto), np.nan) for field in FIELDS}
+
+        for chunk_start, times, columns in self.archive.iterate(self.crypto[0], self.start, self.end):
+            ohlcv = {'crypto': list(self.crypto), 'begins_at': np.repeat(times[np.newaxis, :], len(self.crypto), axis=0)}
+
+            for field in FIELDS:
+                ohlcv[field] = np.empty((len(self.crypto), len(times)))
+
+            for j, crypto_name in enumerate(self.crypto):
+                if j == 0:
+                    for field in FIELDS:
+                        ohlcv[field][0] = columns[field]
+                else:
+                    other_times, other_columns = self.archive.read_chunk(crypto_name, chunk_start)
+
+                    for field in FIELDS:
+                        ohlcv[field][j] = align(times, other_times, other_columns[field], previous[field][j])
+
+            for field in FIELDS:
+                previous[field] = ohlcv[field][:, -1].copy()
+
+            yield times, ohlcv
+
+    def run(self):
+        """
+        Simulates trading every bar of the archive from self.start_index onwards, one file at a time
+
+        Yields {'times': times, 'closes': closes, 'outcomes': outcomes, 'portfolio': portfolio} for every file, with arrays
+        like those of Backtester. summary() returns the result once the generator is exhausted.
+        """
+        self.reset()
+
+        self.bars = 0
+
+        # The latest self.window - 1 bars, which the signals of the next file depend on
+        tail = None
+
+        for times, ohlcv in self.iterate_bars():
+            if tail is not None:
+                combined = {key: np.concatenate([tail[key], values], axis=1) if key != 'crypto' else values for key, values in ohlcv.items()}
+            else:
+                combined = ohlcv
+
+            signals = self.get_signals(combined)[:, -len(times):]
+
+            # Nothing is traded before the first candle of a crypto
+            signals[np.isnan(ohlcv['close_price'])] = HOLD
+
+            self.times = times
+            self.closes = ohlcv['close_price']
+            self.signals = signals
+            self.number_of_bars = len(times)
+
+            self.outcomes = np.zeros((len(self.crypto), len(times)), dtype=np.int8)
+            self.portfolio = np.full(len(times), np.nan)
+
+            self.simulate(min(max(self.start_index - self.bars, 0), len(times)), len(times))
+
+            self.bars += len(times)
+
+            if self.window > 1:
+                tail = {key: values[:, -(self.window - 1):] for key, values in combined.items() if key != 'crypto'}
+
+            yield {'times': self.times, 'closes': self.closes, 'outcomes': self.outcomes, 'portfolio': self.portfolio}
+
+            if self.stopped_by_loss:
+                return
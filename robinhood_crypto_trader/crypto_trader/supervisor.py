@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import pickle
+import random as r
+import time as t
+
+# Version of the checkpoint format, checkpoints of other versions are not resumed
+CHECKPOINT_VERSION = 1
+
+class RetryableError(Exception):
+    """
+    An error after which trading can continue, e.g. a shard worker that stopped and was started again
+    """
+
+# Robinhood internal errors show up as these exceptions, e.g.
+# 503 Server Error: Service Unavailable for url: https://api.robinhood.com/marketdata/forex/quotes/76637d50-c702-4ed1-bcb5-5b0732a81f48/ (TypeError)
+# 500 Server Error: Internal Server Error for url: https://api.robinhood.com/portfolios/ (KeyError)
+RETRY_EXCEPTIONS = (TypeError, KeyError, RetryableError)
+
+class Supervisor():
+    def __init__(self, max_retries=None, backoff=1.0, max_backoff=300.0, factor=2.0, jitter=0.1, exceptions=RETRY_EXCEPTIONS, sleep=t.sleep):
+        """
+        Runs a function again after it raises one of exceptions, in a loop so that retries never add to the stack
+
+        The n-th retry in a row waits backoff * factor ** (n - 1) seconds, at most max_backoff seconds, plus up to a fraction
+        jitter of that at random. reset() starts counting again, e.g. after an iteration succeeded. After max_retries retries
+        in a row the exception is raised, max_retries of None retries forever.
+        """
+        assert max_retries is None or max_retries >= 0
+        assert backoff >= 0 and max_backoff >= 0 and factor >= 1 and jitter >= 0
+
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.factor = factor
+        self.jitter = jitter
+        self.exceptions = exceptions
+        self.sleep = sleep
+
+        # Failures since the latest reset() and since the start
+        self.failures = 0
+        self.total_failures = 0
+
+    def __repr__(self):
+        return 'Supervisor(failures:' + str(self.failures) + ', total_failures:' + str(self.total_failures) + ', max_retries:' + str(self.max_retries) + ')'
+
+    def get_delay(self):
+        """
+        Returns the number of seconds to wait before the next retry
+        """
+        delay = min(self.backoff * self.factor ** (self.failures - 1), self.max_backoff)
+
+        return delay * (1 + self.jitter * r.random())
+
+    def reset(self):
+        """
+        Starts counting the failures in a row again
+        """
+        self.failures = 0
+
+    def run(self, function):
+        """
+        Calls function() until it returns without raising one of self.exceptions and returns what it returns
+        """
+        while True:
+            try:
+                return function()
+            except self.exceptions as exception:
+                self.failures += 1
+                self.total_failures += 1
+
+                if self.max_retries is not None and self.failures > self.max_retries:
+                    print('Robinhood Internal Error: ' + type(exception).__name__ + ': giving up after ' + str(self.max_retries) + ' retries')
+
+                    raise
+
+                delay = self.get_delay()
+
+                print('Robinhood Internal Error: ' + type(exception).__name__ + ': continuing trading in ' + str(round(delay, 2)) + ' seconds')
+
+                self.sleep(delay)
+
+class Checkpointer():
+    def __init__(self, path=None, interval=300, clock=t.time):
+        """
+        Writes the state of a trader to the file path every interval seconds so that a new trader can resume from it
+
+        The state is a dictionary that is pickled, see Trader.get_checkpoint(). Nothing is written when path is None.
+        """
+        assert interval >= 0
+
+        self.path = path
+        self.interval = interval
+        self.clock = clock
+
+        self.last_save = None
+        self.saves = 0
+
+    def __repr__(self):
+        return 'Checkpointer(path:' + str(self.path) + ', interval:' + str(self.interval) + ', saves:' + str(self.saves) + ')'
+
+    def load(self):
+        """
+        Returns the state of the latest checkpoint, or None if there is none that can be read
+        """
+        if self.path is None:
+            return None
+
+        try:
+            with open(self.path, 'rb') as file:
+                state = pickle.load(file)
+        except FileNotFoundError:
+            return None
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError, ValueError) as exception:
+            print('Could not read the checkpoint ' + self.path + ': ' + repr(exception))
+
+            return None
+
+        if type(state) != dict or state.get('version') != CHECKPOINT_VERSION:
+            print('Could not read the checkpoint ' + self.path + ': unknown format')
+
+            return None
+
+        return state
+
+    def save(self, state):
+        """
+        Writes state to self.path, replacing the file at once so that a crash never leaves a partial checkpoint
+        """
+        directory = os.path.dirname(self.path)
+
+        if directory != '':
+            os.makedirs(directory, exist_ok=True)
+
+        temporary_path = self.path + '.tmp' + str(os.getpid())
+
+        with open(temporary_path, 'wb') as file:
+            pickle.dump(dict(state, version=CHECKPOINT_VERSION, saved_at=self.clock()), file)
+
+        os.replace(temporary_path, self.path)
+
+        self.last_save = self.clock()
+        self.saves += 1
+
+    def is_due(self):
+        """
+        Returns True if self.path is set and interval seconds passed since the latest save
+        """
+        if self.path is None:
+            return False
+
+        return self.last_save is None or self.clock() - self.last_save >= self.interval
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import argparse
+import itertools
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+from robinhood_crypto_trader.crypto_trader.backtest import Backtester
+from robinhood_crypto_trader.crypto_trader.histcache import HistoricalsCache
+from robinhood_crypto_trader.crypto_trader.metacache import MetadataCache
+from robinhood_crypto_trader.crypto_trader.broker import get_broker
+
+# Columns of the table returned by sweep()
+COLUMNS = ['arguments', 'profit', 'percent_change', 'buys', 'sells', 'iterations', 'stopped_by_loss']
+
+# State of a worker process, set once by initialize_worker() so the candles are not sent with every task
+worker_state = {}
+
+def grid(values):
+    """
+    Returns every combination of arguments where values[i] lists the values of the i-th argument
+
+    E.g. grid([[10, 20], [2]]) returns [[10, 2], [20, 2]]
+    """
+    return [list(arguments) for arguments in itertools.product(*values)]
+
+def random_sample(ranges, samples, seed=None):
+    """
+    Returns samples combinations of arguments drawn uniformly where ranges[i] is [low, high] of the i-th argument
+
+    An argument is drawn as an int from low to high inclusive if both low and high are ints, otherwise as a float.
+    A range of None always gives None (see complete_arguments).
+    """
+    rng = np.random.default_rng(seed)
+
+    columns = []
+
+    for argument_range in ranges:
+        if argument_range is None:
+            columns.append([None] * samples)
+        elif type(argument_range[0]) == int and type(argument_range[1]) == int:
+            columns.append(rng.integers(argument_range[0], argument_range[1], samples, endpoint=True).tolist())
+        else:
+            columns.append(rng.uniform(argument_range[0], argument_range[1], samples).tolist())
+
+    return [list(arguments) for arguments in zip(*columns)]
+
+def complete_arguments(determine_trade_function, arguments):
+    """
+    Returns arguments with the window indices of 'macd_rsi' filled in where they are None
+
+    The indices of 'macd_rsi' are determined by its periods: rsi_index is -(rsi_period + 2) and macd_index is
+    -(max(macd_fast_period, macd_slow_period) + macd_signal_period - 1).
+    """
+    arguments = list(arguments)
+
+    if determine_trade_function == 'macd_rsi' and len(arguments) == 8:
+        if arguments[1] is None:
+            arguments[1] = -(arguments[0] + 2)
+
+        if arguments[7] is None:
+            arguments[7] = -(max(arguments[4], arguments[5]) + arguments[6] - 1)
+
+    return arguments
+
+def initialize_worker(config, candles, crypto_meta_data):
+    """
+    Stores the data shared by every task of a worker process
+    """
+    worker_state['config'] = config
+    worker_state['candles'] = candles
+    worker_state['crypto_meta_data'] = crypto_meta_data
+
+def evaluate(arguments):
+    """
+    Backtests the shared configuration with builtin_trade_function_arguments set to arguments and returns a row of the sweep table
+
+    Arguments that are rejected by the trade function give a row of NaN.
+    """
+    config = dict(worker_state['config'])
+    config['builtin_trade_function_arguments'] = arguments
+
+    try:
+        summary = Backtester(config, worker_state['candles'], worker_state['crypto_meta_data']).run()
+    except (AssertionError, ValueError, TypeError):
+        return [tuple(arguments), np.nan, np.nan, np.nan, np.nan, np.nan, np.nan]
+
+    return [tuple(arguments), summary['profit'], summary['percent_change'], summary['buys'], summary['sells'], summary['iterations'], summary['stopped_by_loss']]
+
+def sweep(config, candles, crypto_meta_data, arguments_list, processes=None, chunksize=None):
+    """
+    Backtests config once for every entry of arguments_list and returns the results ranked by profit
+
+    config is a Trader configuration whose 'determine_trade_function' is 'boll' or 'macd_rsi'
+    candles = {'crypto1': (times, columns), 'crypto2': (times, columns)} as returned by candles.parse_historicals()
+    crypto_meta_data = {'crypto1': rh.crypto.get_crypto_info('crypto1'), 'crypto2': rh.crypto.get_crypto_info('crypto2')}
+    arguments_list is a list of builtin_trade_function_arguments, e.g. from grid() or random_sample()
+    processes is the number of worker processes, by default the number of CPUs, 1 runs in this process
+
+    Returns a DataFrame with the columns of COLUMNS, best profit first
+    """
+    assert config['determine_trade_function'] in ['boll', 'macd_rsi']
+
+    arguments_list = [complete_arguments(config['determine_trade_function'], arguments) for arguments in arguments_list]
+
+    # Only the close prices are used by the backtest so only they are sent to the workers
+    candles = {crypto_name: (np.asarray(candles[crypto_name][0]), {'close_price': np.asarray(candles[crypto_name][1]['close_price'])}) for crypto_name in config['crypto']}
+    crypto_meta_data = {crypto_name: {key: crypto_meta_data[crypto_name][key] for key in ['min_order_price_increment', 'min_order_quantity_increment']} for crypto_name in config['crypto']}
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+
+    if processes == 1 or len(arguments_list) <= 1:
+        initialize_worker(config, candles, crypto_meta_data)
+
+        rows = [evaluate(arguments) for arguments in arguments_list]
+    else:
+        if chunksize is None:
+            chunksize = max(1, len(arguments_list) // (processes * 4))
+
+        with ProcessPoolExecutor(max_workers=processes, initializer=initialize_worker, initargs=(config, candles, crypto_meta_data)) as executor:
+            rows = list(executor.map(evaluate, arguments_list, chunksize=chunksize))
+
+    results = pd.DataFrame(rows, columns=COLUMNS)
+
+    results = results.sort_values('profit', ascending=False, na_position='last', kind='stable').reset_index(drop=True)
+    results.index += 1
+    results.index.name = 'rank'
+
+    return results
+
+def load_candles(config, broker=None, login=True):
+    """
+    Returns the candles of every crypto in config['crypto'] for the span of config['backtest'] using the historicals cache
+
+    The cache is config['backtest']['cache_directory'] or './historicals_cache'. Missing entries are downloaded from broker,
+    by default the broker of config['broker'] (see broker.get_broker()), logging in with config['username'] and
+    config['password'] first if login is True.
+    """
+    if broker is None:
+        broker = get_broker(config)
+
+    cache = HistoricalsCache(config['backtest'].get('cache_directory') or './historicals_cache', config['backtest'].get('cache_max_age'), broker.get_crypto_historicals)
+
+    interval, span, bounds = config['backtest']['interval'], config['backtest']['span'], config['backtest']['bounds']
+
+    refresh, offline = config['backtest'].get('refresh', False), config['backtest'].get('offline', False)
+
+    if login and not offline and (refresh or any(cache.is_expired(crypto_name, interval, span, bounds) for crypto_name in config['crypto'])):
+        broker.login(config['username'], config['password'], 60 * 60 * 24)
+
+    return {crypto_name: cache.load(crypto_name, interval, span, bounds, refresh, offline) for crypto_name in config['crypto']}
+
+def main(argv=None):
+    """
+    Runs a sweep from the command line and prints the best results
+
+    E.g. python -m robinhood_crypto_trader.crypto_trader.sweep config.json --grid "[[10, 20, 30], [1.5, 2, 2.5]]"
+    """
+    parser = argparse.ArgumentParser(description='Backtest builtin_trade_function_arguments over a grid or random sample')
+    parser.add_argument('config', help='JSON file with the Trader configuration')
+    parser.add_argument('--grid', help='JSON list with the values of every argument')
+    parser.add_argument('--random', help='JSON list with [low, high] of every argument')
+    parser.add_argument('--samples', type=int, default=1000, help='number of combinations drawn with --random')
+    parser.add_argument('--seed', type=int, default=None, help='seed of --random')
+    parser.add_argument('--processes', type=int, default=None, help='number of worker processes, by default the number of CPUs')
+    parser.add_argument('--top', type=int, default=20, help='number of results to print')
+    parser.add_argument('--output', default=None, help='CSV file to write every result to')
+
+    args = parser.parse_args(argv)
+
+    if (args.grid is None) == (args.random is None):
+        parser.error('exactly one of --grid and --random is required')
+
+    with open(args.config) as file:
+        config = json.load(file)
+
+    if args.grid is not None:
+        arguments_list = grid(json.loads(args.grid))
+    else:
+        arguments_list = random_sample(json.loads(args.random), args.samples, args.seed)
+
+    broker = get_broker(config)
+
+    candles = load_candles(config, broker)
+
+    crypto_meta_data = MetadataCache(config.get('metadata_cache'), config.get('metadata_max_age', 86400), broker.get_crypto_currency_pairs, config.get('warm_start', False)).get_meta_data(config['crypto'])
+
+    print('sweeping', len(arguments_list), 'combinations of arguments for', config['determine_trade_function'])
+
+    results = sweep(config, candles, crypto_meta_data, arguments_list, args.processes)
+
+    print(results.head(args.top).to_string())
+
+    if args.output is not None:
+        results.to_csv(args.output)
+
+    return results
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Cash is counted in cents
+CASH_PRECISION = 2
+
+# Number of decimal places of cryptos that are not in the table
+DEFAULT_PRECISION = 8
+
+def get_precision(text):
+    """
+    Returns the number of decimal places the number has
+
+    text needs to contain one and only one '1' and one and only one '.'
+
+    E.g. text: output
+    '100.000000000000': -2
+    '10.0000000000000': -1
+    '1.00000000000000': 0
+    '0.10000000000000': 1
+    '0.01000000000000': 2
+    '0.00100000000000': 3
+    '0.00010000000000': 4
+    """
+    one = text.find('1')
+    dot = text.find('.')
+
+    if one < dot:
+        return one - dot + 1
+    else:
+        return one - dot
+
+def to_ticks(value, precision):
+    """
+    Returns value as the nearest whole number of ticks of 10 ** -precision, e.g. 12.345, 2 -> 1234 and 150, -2 -> 2
+    """
+    if precision >= 0:
+        return int(round(value * 10 ** precision))
+    else:
+        return int(round(value / 10 ** -precision))
+
+def from_ticks(ticks, precision):
+    """
+    Returns ticks of 10 ** -precision as a float, e.g. 1234, 2 -> 12.34
+    """
+    if precision >= 0:
+        # Dividing integers gives the float nearest to the exact value
+        return ticks / 10 ** precision
+    else:
+        return float(ticks * 10 ** -precision)
+
+def divide(numerator, denominator):
+    """
+    Returns the integer nearest to numerator / denominator without going through a float, ties go to the even integer like round()
+    """
+    if denominator < 0:
+        numerator, denominator = -numerator, -denominator
+
+    quotient, remainder = divmod(numerator, denominator)
+
+    if 2 * remainder > denominator or (2 * remainder == denominator and quotient % 2 == 1):
+        quotient += 1
+
+    return quotient
+
+def rescale(ticks, precision, new_precision):
+    """
+    Returns ticks of 10 ** -precision as the nearest whole number of ticks of 10 ** -new_precision
+    """
+    if new_precision >= precision:
+        return ticks * 10 ** (new_precision - precision)
+    else:
+        return divide(ticks, 10 ** (precision - new_precision))
+
+class TickTable():
+    def __init__(self, crypto_meta_data=None, default_precision=DEFAULT_PRECISION):
+        """
+        Number of decimal places of the prices and quantities of every crypto, parsed once from crypto_meta_data
+
+        crypto_meta_data = {'BTC': {'min_order_price_increment': '0.01...', 'min_order_quantity_increment': '0.000001...'}}, as
+        returned by rh.crypto.get_crypto_info(). Cryptos without meta data use default_precision decimal places.
+        """
+        self.default_precision = default_precision
+
+        self.price_precision = {}
+        self.quantity_precision = {}
+
+        for crypto_name, meta_data in crypto_meta_data.items() if crypto_meta_data is not None else []:
+            self.add(crypto_name, get_precision(meta_data['min_order_price_increment']), get_precision(meta_data['min_order_quantity_increment']))
+
+    def __repr__(self):
+        return 'TickTable(price:' + str(self.price_precision) + ', quantity:' + str(self.quantity_precision) + ')'
+
+    def add(self, crypto_name, price_precision, quantity_precision):
+        """
+        Sets the number of decimal places of the prices and quantities of crypto_name
+        """
+        self.price_precision[crypto_name] = price_precision
+        self.quantity_precision[crypto_name] = quantity_precision
+
+    def get_price_precision(self, crypto_name):
+        """
+        Returns the number of decimal places of the prices of crypto_name
+        """
+        return self.price_precision.get(crypto_name, self.default_precision)
+
+    def get_quantity_precision(self, crypto_name):
+        """
+        Returns the number of decimal places of the quantities of crypto_name
+        """
+        return self.quantity_precision.get(crypto_name, self.default_precision)
+
+    def round_price(self, crypto_name, price):
+        """
+        Returns price rounded to the price increment of crypto_name
+        """
+        return round(price, self.get_price_precision(crypto_name))
+
+    def round_quantity(self, crypto_name, quantity):
+        """
+        Returns quantity rounded to the quantity increment of crypto_name
+        """
+        return round(quantity, self.get_quantity_precision(crypto_name))
+
+    def price_to_ticks(self, crypto_name, price):
+        """
+        Returns price as a whole number of price increments of crypto_name
+        """
+        return to_ticks(price, self.get_price_precision(crypto_name))
+
+    def quantity_to_ticks(self, crypto_name, quantity):
+        """
+        Returns quantity as a whole number of quantity increments of crypto_name
+        """
+        return to_ticks(quantity, self.get_quantity_precision(crypto_name))
+
+    def ticks_to_price(self, crypto_name, ticks):
+        """
+        Returns a whole number of price increments of crypto_name as a price
+        """
+        return from_ticks(ticks, self.get_price_precision(crypto_name))
+
+    def ticks_to_quantity(self, crypto_name, ticks):
+        """
+        Returns a whole number of quantity increments of crypto_name as a quantity
+        """
+        return from_ticks(ticks, self.get_quantity_precision(crypto_name))
+
+    def get_notional_ticks(self, crypto_name, quantity_ticks, price_ticks):
+        """
+        Returns the cash (in cents) of quantity_ticks of crypto_name at price_ticks, rounded to the nearest cent
+        """
+        precision = self.get_price_precision(crypto_name) + self.get_quantity_precision(crypto_name)
+
+        return rescale(quantity_ticks * price_ticks, precision, CASH_PRECISION)
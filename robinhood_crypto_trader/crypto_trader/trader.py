@@ -9,7 +9,6 @@ Issues:
 - Implement sell by price orders with thresholds in place to prevent orders from failing if applicable [thresholds found at rh.crypto.get_crypto_info(crypto_symbol)]
 
 To-do:
-- Implement the Strategy class from strategy.py so that users can bring in their own independent strategies to decide whether to buy, sell, or hold their cryptocurrency assets.
 - [Implemented, testing required] Only have self.buy_times and self.sell_times by initialized and used if config[plot_crypto] is True
 - Documentation of code
 - Documentation for user guide
@@ -18,17 +17,37 @@ To-do:
 """
 
 import numpy as np
-import pandas as pd
 import datetime as dt
 import time as t
-import matplotlib.pyplot as plt
+import asyncio
 import pandas_ta as ta
 import random as r
 import sys
-import robin_stocks.robinhood as rh
 import math
 
 from robinhood_crypto_trader.crypto_trader.order import *
+from robinhood_crypto_trader.crypto_trader import indicators
+from robinhood_crypto_trader.crypto_trader.candles import CandleStore, parse_historicals, stack_candles
+from robinhood_crypto_trader.crypto_trader.quotes import QuoteCache
+from robinhood_crypto_trader.crypto_trader.fetch import Fetcher
+from robinhood_crypto_trader.crypto_trader import backtest
+from robinhood_crypto_trader.crypto_trader.backtest import Backtester
+from robinhood_crypto_trader.crypto_trader.histcache import HistoricalsCache
+from robinhood_crypto_trader.crypto_trader.archive import CandleArchive, CHUNK_SIZE, parse_time
+from robinhood_crypto_trader.crypto_trader.stream import StreamingBacktester
+from robinhood_crypto_trader.crypto_trader.journal import Journal
+from robinhood_crypto_trader.crypto_trader.ledger import Ledger
+from robinhood_crypto_trader.crypto_trader.ticks import TickTable, get_precision
+from robinhood_crypto_trader.crypto_trader.scheduler import Scheduler, WEEK_OFFSET
+from robinhood_crypto_trader.crypto_trader.reconciler import OrderReconciler, download_open_orders
+from robinhood_crypto_trader.crypto_trader.export import Exporter, download_pair_symbols
+from robinhood_crypto_trader.crypto_trader.strategy import DECISIONS, get_strategy
+from robinhood_crypto_trader.crypto_trader.plotting import Plotter
+from robinhood_crypto_trader.crypto_trader.broker import get_broker
+from robinhood_crypto_trader.crypto_trader.latency import LatencyRecorder
+from robinhood_crypto_trader.crypto_trader.shard import ShardPool
+from robinhood_crypto_trader.crypto_trader.metacache import MetadataCache
+from robinhood_crypto_trader.crypto_trader.supervisor import Supervisor, Checkpointer
 
 class Trader():
     def __init__(self, config):
@@ -39,6 +58,9 @@ class Trader():
             'password': '',
             'days_to_run': 1,
             'export_csv': False,
+            'export_journal': False,
+            'journal_format': 'csv',
+            'export_directory': './',
             'plot_crypto': False,
             'plot_portfolio': False,
             'mode': '',
@@ -46,12 +68,23 @@ class Trader():
                 'interval': '',
                 'span': '',
                 'bounds': '',
-                'index': 10
+                'index': 10,
+                'cache_directory': None,
+                'cache_max_age': None,
+                'refresh': False,
+                'offline': False,
+                'archive': None,
+                'chunk_size': 5760,
+                'plot_points': 10000,
+                'start': None,
+                'end': None
             },
             'trader': {
                 'interval': '',
                 'span': '',
-                'bounds': ''
+                'bounds': '',
+                'scheduler': 'sleep',
+                'delay': 1.0
             },
             'determine_trade_function': 'function_name',
             'builtin_trade_function_arguments': [],
@@ -64,21 +97,70 @@ class Trader():
             'buy_order_type': 'market',
             'sell_order_type': 'market',
             'only_sell_above_average_bought_price': False,
-            'only_buy_below_average_bought_price': False
+            'only_buy_below_average_bought_price': False,
+            'quote_max_age': None,
+            'max_workers': 8,
+            'print_rows': 10,
+            'reconcile_interval': 300,
+            'broker': 'robinhood',
+            'latency_file': None,
+            'latency_interval': 60,
+            'shards': 1,
+            'metadata_cache': None,
+            'metadata_max_age': 86400,
+            'warm_start': False,
+            'max_retries': None,
+            'retry_backoff': 1.0,
+            'max_retry_backoff': 300.0,
+            'checkpoint_file': None,
+            'checkpoint_interval': 300,
+            'resume': True
         }
         """
+        # Every request to Robinhood goes through self.broker, 'simulated' trades against a local stand-in instead
+        self.broker = get_broker(config)
+        
+        # The currency pairs (ids, tradability and order increments of every crypto) are downloaded once, and only once per
+        # 'metadata_max_age' seconds when they are kept in the file 'metadata_cache'. 'warm_start' uses that file however old it is.
+        self.metadata = MetadataCache(config.get('metadata_cache'), config.get('metadata_max_age', 86400), self.broker.get_crypto_currency_pairs, config.get('warm_start', False))
+        
         self.check_config(config)
 
+        self.config = config
         self.id = self.generate_id()
         self.crypto = config['crypto']
         self.username = config['username']
         self.password = config['password']
         self.days_to_run = config['days_to_run']
         self.export_csv_config = config['export_csv']
+        self.export_journal_config = config.get('export_journal', False)
+        self.journal_format = config.get('journal_format', 'csv')
+        
+        # Exports only append what is new since the previous export
+        self.exporter = Exporter(config.get('export_directory', './'), fetch_pages=self.broker.iterate_order_info_pages, fetch_symbols=lambda: download_pair_symbols(self.broker.get_crypto_currency_pairs))
         self.plot_crypto_config = config['plot_crypto']
         self.plot_portfolio_config = config['plot_portfolio']
+        
+        # Plots are drawn by a separate process, in windows or as image files in 'plot_directory'
+        if self.plot_crypto_config or self.plot_portfolio_config:
+            self.plotter = Plotter(config.get('plot_output', 'window'), config.get('plot_directory', './plots'))
+        else:
+            self.plotter = None
         self.mode = config['mode']
-        self.determine_trade_func = config['determine_trade_function']
+        
+        # A Strategy (or the name of a registered Strategy) decides for every crypto at once, see strategy.py
+        self.strategy = get_strategy(config['determine_trade_function'])
+        
+        if self.strategy != None:
+            self.determine_trade_func = self.strategy.name
+        else:
+            self.determine_trade_func = config['determine_trade_function']
+        
+        # The builtin trade functions by name, each is called with (crypto_symbol, times, prices) by self.determine_trade()
+        self.builtin_trade_functions = {'boll': self.boll, 'macd_rsi': self.macd_rsi}
+        
+        # The decisions of the strategy at the current iteration, {'crypto1': 'BUY', 'crypto2': 'HOLD'}
+        self.decisions = {}
         self.only_sell_above_bought = config['only_sell_above_average_bought_price']
         self.only_buy_below_bought = config['only_buy_below_average_bought_price']
 
@@ -92,16 +174,64 @@ class Trader():
         
         self.login()
         
-        self.crypto_meta_data = {crypto_name: rh.crypto.get_crypto_info(crypto_name) for crypto_name in self.crypto}
+        # The latency of every phase of an iteration, written to 'latency_file' every 'latency_interval' seconds when it is set
+        self.latency = LatencyRecorder(config.get('latency_file'), config.get('latency_interval', 60))
+        
+        # Network requests for different cryptos are made concurrently by at most 'max_workers' threads
+        self.fetcher = Fetcher(config.get('max_workers', 8))
+        
+        self.crypto_meta_data = self.metadata.get_meta_data(self.crypto)
+        
+        # The price and quantity increments of every crypto are parsed once instead of for every price and quantity
+        self.ticks = TickTable(self.crypto_meta_data)
+        
+        # Quotes are taken once per crypto per iteration (or once per 'quote_max_age' seconds) and shared by every caller
+        self.quotes = QuoteCache(self.download_quote, config.get('quote_max_age'), self.fetcher)
 
         # self.buy_order_type and self.sell_order_type are only used when self.mode == 'live'
         self.buy_order_type = config['buy_order_type']
         self.sell_order_type = config['sell_order_type']
 
+        self.shards = None
+        
+        # Robinhood internal errors are retried in a loop with a delay that grows up to 'max_retry_backoff' seconds
+        self.supervisor = Supervisor(config.get('max_retries'), config.get('retry_backoff', 1.0), config.get('max_retry_backoff', 300.0))
+        
+        # The state of a live or safelive trader is written to 'checkpoint_file' every 'checkpoint_interval' seconds and a
+        # new trader resumes from it (unless 'resume' is False) instead of downloading its candles and starting over
+        self.checkpointer = Checkpointer(config.get('checkpoint_file') if self.mode != 'backtest' else None, config.get('checkpoint_interval', 300))
+        
+        checkpoint = self.load_checkpoint() if config.get('resume', True) else None
+        
         if self.mode == 'backtest':
             self.backtest_interval = config['backtest']['interval']
             self.backtest_span = config['backtest']['span']
             self.backtest_bounds = config['backtest']['bounds']
+            
+            # Historicals are kept on disk when 'cache_directory' is set so that repeated backtests do not download them again
+            if config['backtest'].get('cache_directory') != None:
+                self.historicals_cache = HistoricalsCache(config['backtest']['cache_directory'], config['backtest'].get('cache_max_age'), self.broker.get_crypto_historicals)
+            else:
+                self.historicals_cache = None
+            
+            self.backtest_refresh = config['backtest'].get('refresh', False)
+            self.backtest_offline = config['backtest'].get('offline', False)
+            
+            # With an 'archive' directory the backtest streams every candle from 'start' to 'end' in the archive one file of
+            # 'chunk_size' candles at a time, and the latest span is added to the archive first unless 'offline' is True
+            if config['backtest'].get('archive') != None:
+                self.archive = CandleArchive(config['backtest']['archive'], self.backtest_interval, self.backtest_bounds, config['backtest'].get('chunk_size', CHUNK_SIZE), self.broker.get_crypto_historicals)
+            else:
+                self.archive = None
+            
+            # The portfolio of a streamed backtest is plotted with at most 'plot_points' evenly spaced points
+            self.backtest_plot_points = config['backtest'].get('plot_points', 10000)
+            
+            self.backtest_start = parse_time(config['backtest'].get('start'))
+            self.backtest_end = parse_time(config['backtest'].get('end'))
+            
+            # The candles of every crypto that is loaded, kept so that a retry does not load them again
+            self.backtest_candles = {}
 
             self.is_live = False
 
@@ -109,6 +239,8 @@ class Trader():
                 self.backtest_index = 19
             elif self.determine_trade_func == 'macd_rsi':
                 self.backtest_index = 33
+            elif self.strategy != None:
+                self.backtest_index = config['backtest'].get('index', self.strategy.lookback - 1)
             else:
                 self.backtest_index = config['backtest']['index']
             
@@ -117,21 +249,55 @@ class Trader():
             self.interval = config['trader']['interval']
             self.span = config['trader']['span']
             self.bounds = config['trader']['bounds']
+            
+            # The 'asyncio' scheduler starts every iteration 'delay' seconds after a candle boundary of self.interval
+            if config['trader'].get('scheduler', 'sleep') == 'asyncio':
+                self.scheduler = Scheduler(self.convert_time_to_sec(self.interval), config['trader'].get('delay', 1.0), WEEK_OFFSET if self.interval == 'week' else 0)
+            else:
+                self.scheduler = None
 
             if self.mode == 'live':
                 self.is_live = True
             else:
                 self.is_live = False
+            
+            if config.get('shards', 1) > 1:
+                # The quotes, candles and trades of the cryptos are handled by 'shards' worker processes, the trader keeps
+                # the cash, orders and loss limits. self.candles holds the latest candles that the workers sent for the strategy.
+                self.shards = ShardPool(config, self.crypto, self.crypto_meta_data, config['shards'], self.broker.get_session(), self.strategy.lookback if self.strategy != None else None)
+                self.shards.start()
+                
+                self.candles = {}
+            else:
+                # Candles are downloaded once here and then only the newest candles are downloaded every iteration
+                self.candles = {crypto_name: CandleStore(crypto_name, self.interval, self.span, self.bounds, self.broker.get_crypto_historicals) for crypto_name in self.crypto}
+                
+                if self.determine_trade_func == 'boll':
+                    # The bands of every crypto are updated by its candle store as new candles arrive, see self.boll()
+                    for crypto_name in self.crypto:
+                        self.candles[crypto_name].add_bands(*self.get_boll_arguments())
+                
+                if checkpoint is not None and checkpoint['candles'] is not None:
+                    for crypto_name in self.crypto:
+                        self.candles[crypto_name].set_state(checkpoint['candles'][crypto_name])
+                else:
+                    self.fetcher.map(lambda crypto_name: self.candles[crypto_name].load(), self.crypto)
         
         if self.is_live:
             self.orders = {crypto_name: [] for crypto_name in self.crypto}
+            
+            # Open orders are refreshed with one bulk request per iteration and their fills are applied to the ledger
+            self.order_reconciler = OrderReconciler(lambda since: download_open_orders(since, self.broker.iterate_order_info_pages), self.broker.get_crypto_order_info)
+            self.order_reconciler.subscribe(self.on_order_event)
         
         self.use_cash = config['use_cash']
+        
+        # Cash, holdings and bought price are kept up to date locally from fills and only downloaded from the account every
+        # 'reconcile_interval' seconds or when the ledger finds that it no longer matches the account
+        self.ledger = Ledger(self.crypto, config.get('reconcile_interval', 300), self.ticks)
 
-        self.cash, self.equity = self.retrieve_cash_and_equity()
-
-        # Initialization of holdings and bought price (necessary to be here due to different modes and cash initializations)
-        self.holdings, self.bought_price = self.get_holdings_and_bought_price()
+        # Initialization of cash, equity, holdings and bought price (necessary to be here due to different modes and cash initializations)
+        self.reconcile()
 
         # Loss threshold (in dollars) taken to be a positive value
         self.loss_threshold = config['loss_threshold']
@@ -141,10 +307,12 @@ class Trader():
         
         # Need to set initial capital
         if self.use_cash == False or self.is_live:
-            self.initial_capital = self.get_crypto_holdings_capital() + self.cash
+            self.initial_capital = self.get_portfolio_value()
         else:
             self.initial_capital = round(config['cash'], 2)
             self.cash = round(config['cash'], 2)
+            
+            self.ledger.cash = self.cash
         
         assert self.initial_capital > 0
         
@@ -155,14 +323,10 @@ class Trader():
         
         self.trade = ''
         
-        if self.plot_crypto_config:
-            # self.buy_times and self.sell_times look like {'crypto1': {datetime: status, datetime: status}, 'crypto2': {datetime: status, datetime: status}}
-            # status possibilities are ['live_buy', 'simulated_buy', 'unable_to_buy', 'live_sell', 'simulated_sell', unable_to_sell']
-            self.buy_times = {crypto_name: {} for crypto_name in self.crypto}
-            self.sell_times = {crypto_name: {} for crypto_name in self.crypto}
-
         if self.plot_portfolio_config:
+            # Only the points after the first self.portfolio_plotted points still have to be sent to the plotter
             self.time_data, self.portfolio_data = [], []
+            self.portfolio_plotted = 0
         
         self.iteration_number = 1
 
@@ -175,8 +339,13 @@ class Trader():
         self.trade_dict = {self.crypto[i]: 0 for i in range(0, len(self.crypto))}
         self.price_dict = {self.crypto[i]: 0 for i in range(0, len(self.crypto))}
         
-        self.df_trades = pd.DataFrame(columns=self.crypto)
-        self.df_prices = pd.DataFrame(columns=self.crypto)
+        # The price and trade of every crypto at every iteration, df_trades and df_prices are built from it when requested
+        self.journal = Journal(self.crypto)
+        
+        self.print_rows = config.get('print_rows', 10)
+        
+        if checkpoint is not None:
+            self.restore_checkpoint(checkpoint)
     
     def __repr__(self):
         if self.mode != 'backtest':
@@ -187,297 +356,621 @@ class Trader():
     def run(self):
         try:
             print("cryptos: ", self.crypto)
+            
+            # Robinhood internal errors (TypeError and KeyError) are retried by self.supervisor, the trader keeps its state
+            self.supervisor.run(self.run_mode)
+            
+            if self.export_csv_config:
+                self.export_csv()
+        
+        except KeyboardInterrupt:
+            print("User ended execution of program.")
+            
+            self.save_checkpoint()
+            
+            if self.export_csv_config:
+                print("Exporting csv...")
+                self.export_csv()
+            
+            self.logout()
+        
+        except Exception:
+            print("An unexpected error occured: stopping trading")
+            
+            self.save_checkpoint()
+
+            if self.export_csv_config:
+                print("Exporting csv...")
+                self.export_csv()
+            
+            self.logout()
+            
+            raise Exception
+        
+        finally:
+            # The threads of self.fetcher are started again if the trader runs again
+            self.fetcher.close()
     
-            if self.mode == 'backtest':
-                crypto_historicals = self.download_backtest_data()
+    def run_mode(self):
+        """
+        Runs the backtest or trades live depending on self.mode, called again by self.supervisor after a Robinhood internal error
+        """
+        if self.mode == 'backtest':
+            self.run_backtest()
+        else:
+            self.run_live()
+    
+    def run_live(self):
+        """
+        Trades every self.interval until a loss limit is reached. Assumes self.mode is either 'live' or 'safelive'.
+        
+        With the 'asyncio' scheduler every iteration starts right after a candle boundary, otherwise the trader sleeps
+        for self.interval minus the average iteration runtime between iterations.
+        """
+        if self.scheduler is not None:
+            asyncio.run(self.scheduler.run(self.run_scheduled_iteration, self.continue_trading))
             
-            while self.continue_trading():
-                if self.mode != 'backtest':
-                    self.iteration_runtime_start = t.time()
-                
-                if self.mode == 'backtest':
-                    if self.backtest_index == len(crypto_historicals[self.crypto[0]]):
-                        print("backtesting finished")
-                        
-                        break
-                    elif self.backtest_index > len(crypto_historicals[self.crypto[0]]):
-                        print("not enough backtesting data to perform calculations")
-                        
-                        break
-                
-                prices = []
-                
-                if self.mode != 'backtest':
-                    for crypto_symbol in self.crypto:
-                        prices += [round(float(self.get_latest_quote(crypto_symbol)['ask_price']), self.get_precision(self.crypto_meta_data[crypto_symbol]['min_order_price_increment']))]
-                else:
-                    for i in range(len(self.crypto)):
-                        prices += [round(float(crypto_historicals[self.crypto[i]][self.backtest_index]['close_price']), self.get_precision(self.crypto_meta_data[self.crypto[i]]['min_order_price_increment']))]
-                
-                if self.use_cash == False or self.is_live:
-                    # Update holdings and bought_price
-                    self.holdings, self.bought_price = self.get_holdings_and_bought_price()
+            return
+        
+        while self.continue_trading():
+            self.iteration_runtime_start = t.time()
+            
+            self.quotes.new_iteration()
+            
+            self.download_iteration()
+            
+            self.run_iteration()
+
+            self.iteration_runtime_end = t.time()
+
+            self.update_average_iteration_runtime()
+            
+            # wait_time = self.convert_time_to_sec(self.get_interval()) - self.average_iteration_runtime
+            wait_time = self.convert_time_to_sec(self.interval) - self.average_iteration_runtime
+
+            if wait_time < 0:
+                wait_time = 0
+            
+            self.iteration_number += 1
+            
+            self.end_iteration()
+            
+            if wait_time > 0:
+                print('Waiting ' + str(round(wait_time, 2)) + ' seconds...')
+
+                t.sleep(wait_time)
     
-                    # Update cash and equity
-                    self.cash, self.equity = self.retrieve_cash_and_equity()
-                else:
-                    # Update equity only
-                    _, self.equity = self.retrieve_cash_and_equity()
-                
-                # Set the profit and percent change for the trader
-                # self.set_profit(self.cash + self.get_crypto_holdings_capital() - self.initial_capital)
-                self.profit = self.cash + self.get_crypto_holdings_capital() - self.initial_capital
-                # self.set_percent_change(((self.cash + self.get_crypto_holdings_capital() - self.initial_capital) * 100) / self.initial_capital)
-                self.percent_change = ((self.cash + self.get_crypto_holdings_capital() - self.initial_capital) * 100) / self.initial_capital
     
-                # Update console
-                self.update_output()
+    async def run_scheduled_iteration(self, boundary):
+        """
+        Runs one iteration for the candle that closed at boundary (seconds since the epoch), used by self.scheduler
+        """
+        self.iteration_runtime_start = t.time()
+        
+        self.quotes.new_iteration()
+        
+        loop = asyncio.get_running_loop()
+        
+        if self.shards is not None:
+            await loop.run_in_executor(self.fetcher.get_executor(), self.update_shards)
+        else:
+            # Every crypto downloads its quote and newest candles concurrently on the threads of self.fetcher
+            await asyncio.gather(*[loop.run_in_executor(self.fetcher.get_executor(), self.download_crypto, crypto_name) for crypto_name in self.crypto])
+        
+        self.run_iteration()
+        
+        self.iteration_runtime_end = t.time()
+        
+        self.update_average_iteration_runtime()
+        
+        self.iteration_number += 1
+        
+        self.end_iteration()
     
-                if self.plot_portfolio_config:
-                    self.time_data += [self.get_runtime()]
-                    self.portfolio_data += [self.cash + self.get_crypto_holdings_capital()]
+    def end_iteration(self):
+        """
+        Resets the retries of self.supervisor after an iteration succeeded and writes a checkpoint if one is due
+        """
+        self.supervisor.reset()
+        
+        if self.checkpointer.is_due():
+            self.save_checkpoint()
     
-                    self.plot_portfolio()
-                
-                for i, crypto_name in enumerate(self.crypto):
-                    price = prices[i]
-                    
-                    print('\n{} = ${}'.format(crypto_name, price))
+    def get_checkpoint(self):
+        """
+        Returns the state that a new trader resumes from, see load_checkpoint() and restore_checkpoint()
+        
+        The candles are only part of it when the trader keeps them itself (without shards). Indicators are computed from the
+        candles, so the candles are their state.
+        """
+        return {
+            'crypto': self.crypto,
+            'mode': self.mode,
+            'trader': [self.interval, self.span, self.bounds],
+            'ledger': self.ledger,
+            'journal': self.journal,
+            'iteration_number': self.iteration_number,
+            'initial_capital': self.initial_capital,
+            'start_time': self.start_time,
+            'average_iteration_runtime': self.average_iteration_runtime,
+            'portfolio': [self.time_data, self.portfolio_data] if self.plot_portfolio_config else None,
+            'candles': {crypto_name: store.get_state() for crypto_name, store in self.candles.items()} if self.shards is None else None
+        }
     
-                    if self.mode != 'backtest':
-                        trade = self.determine_trade(crypto_name)
-                    else:
-                        trade = self.determine_trade(crypto_name, crypto_historicals)
-                    
-                    print('trade:', trade, end='\n\n')
+    def save_checkpoint(self):
+        """
+        Writes the state of the trader to 'checkpoint_file' if it is set
+        """
+        if self.checkpointer.path is None:
+            return
+        
+        self.checkpointer.save(self.get_checkpoint())
     
-                    # Update cash for buy or sell calculations
-                    if self.use_cash == False or self.is_live:
-                        self.cash, self.equity = self.retrieve_cash_and_equity()
+    def load_checkpoint(self):
+        """
+        Returns the latest checkpoint of 'checkpoint_file', or None if there is none or it is of a different trader
+        """
+        checkpoint = self.checkpointer.load()
+        
+        if checkpoint is None:
+            return None
+        
+        trader = [self.config['trader']['interval'], self.config['trader']['span'], self.config['trader']['bounds']]
+        
+        if checkpoint['crypto'] != self.crypto or checkpoint['mode'] != self.mode or checkpoint['trader'] != trader:
+            print('The checkpoint ' + self.checkpointer.path + ' is of a different trader: starting over')
+            
+            return None
+        
+        return checkpoint
     
-                    if trade == 'BUY':
-                        if self.mode != 'backtest':
-                            price = round(float(self.get_latest_quote(crypto_name)['ask_price']), self.get_precision(self.crypto_meta_data[crypto_symbol]['min_order_price_increment']))
-                        
-                        if self.cash > 0:
-                            
-                            restricted_buy = False
-                            
-                            if self.only_buy_below_bought:
-                                if self.bought_price[crypto_name] <= price:
-                                    print('Price is not lower than average bought price')
-                                    restricted_buy = True
-                            
-                            if not restricted_buy:
-                                # https://robin-stocks.readthedocs.io/en/latest/robinhood.html#placing-and-cancelling-orders
+    def restore_checkpoint(self, checkpoint):
+        """
+        Continues from checkpoint (see get_checkpoint()), the candles were already restored
+        
+        A live trader keeps the cash and holdings downloaded from the account, a safelive trader takes its simulated ledger.
+        """
+        if not self.is_live:
+            self.ledger = checkpoint['ledger']
+            self.ledger.ticks = self.ticks
+            
+            self.cash = self.ledger.get_available_cash()
+            self.holdings = self.ledger.holdings
+            self.bought_price = self.ledger.bought_price
+        
+        self.journal = checkpoint['journal']
+        
+        self.iteration_number = checkpoint['iteration_number']
+        self.initial_capital = checkpoint['initial_capital']
+        self.start_time = checkpoint['start_time']
+        self.average_iteration_runtime = checkpoint['average_iteration_runtime']
+        
+        if self.plot_portfolio_config and checkpoint['portfolio'] is not None:
+            self.time_data, self.portfolio_data = checkpoint['portfolio']
+        
+        print('Resumed from the checkpoint of iteration ' + str(self.iteration_number))
+    
+    def download_iteration(self):
+        """
+        Downloads the quotes and the newest candles of every crypto concurrently, by the shard workers if there are any
+        """
+        if self.shards is not None:
+            self.update_shards()
+        else:
+            self.quotes.snapshot(self.crypto)
+            self.update_candles()
+    
+    def update_shards(self):
+        """
+        Runs one iteration of the shard workers and takes their quotes, trades (or candles for the strategy) and latencies
+        """
+        result = self.shards.iterate()
+        
+        self.quotes.put(result['quotes'])
+        
+        self.decisions = result['decisions']
+        self.candles = result['candles']
+        
+        for histograms in result['latency']:
+            self.latency.merge(histograms)
+    
+    def download_crypto(self, crypto_name):
+        """
+        Downloads the latest quote and the newest candles of crypto_name
+        """
+        self.get_latest_quote(crypto_name)
+        
+        self.update_crypto_candles(crypto_name)
+    
+    def update_average_iteration_runtime(self):
+        """
+        Adds the runtime of the latest iteration to self.average_iteration_runtime and to the latency histograms
+        """
+        self.latency.record('iteration', self.iteration_runtime_end - self.iteration_runtime_start)
+        
+        self.latency.write_if_due()
+        
+        if self.average_iteration_runtime == 0:
 
-                                dollars_to_spend = self.round_down_to_2(self.cash * self.cash_factor)
+            self.average_iteration_runtime = self.iteration_runtime_end - self.iteration_runtime_start
+        else:
+            # Update average iteration runtime
+            self.average_iteration_runtime *= self.iteration_number
 
-                                print('Attempting to BUY ${} of {} at price ${}'.format(dollars_to_spend, crypto_name, price))
+            self.average_iteration_runtime += (self.iteration_runtime_end - self.iteration_runtime_start)
 
-                                if self.is_live:
+            self.average_iteration_runtime /= (self.iteration_number + 1)
+    
+    def run_iteration(self):
+        """
+        Updates the account, determines the trade of every crypto, places or simulates it and records the result
+        
+        Assumes that the quotes and candles of this iteration are already downloaded.
+        """
+        prices = []
+        
+        for crypto_symbol in self.crypto:
+            prices += [self.ticks.round_price(crypto_symbol, float(self.get_latest_quote(crypto_symbol)['ask_price']))]
+        
+        with self.latency.time('account_refresh'):
+            if self.is_live:
+                # Apply the fills of open orders, or download the account if it is time to reconcile
+                self.update_ledger()
+            elif self.ledger.needs_reconcile():
+                # Simulated trades only exist in the ledger so only the equity is downloaded
+                _, self.equity = self.retrieve_cash_and_equity()
+                
+                self.ledger.reconcile_equity(self.equity)
+        
+        # Set the profit and percent change for the trader, open orders still hold their cash and holdings
+        self.profit = self.get_portfolio_value() - self.initial_capital
+        self.percent_change = (self.profit * 100) / self.initial_capital
+
+        # Update console
+        with self.latency.time('console_output'):
+            self.update_output()
 
-                                    if self.buy_order_type == 'limit':
-                                        # Limit order by price
-                                        order_info = rh.orders.order_buy_crypto_limit_by_price(symbol=crypto_name, amountInDollars=dollars_to_spend, limitPrice=price, timeInForce='gtc', jsonify=True)
+        if self.plot_portfolio_config:
+            self.time_data += [self.get_runtime()]
+            self.portfolio_data += [self.get_portfolio_value()]
 
-                                    else:
-                                        # Market order
-                                        order_info = rh.orders.order_buy_crypto_by_price(symbol=crypto_name, amountInDollars=dollars_to_spend, timeInForce='gtc', jsonify=True)
+            self.plot_portfolio()
+        
+        if self.strategy != None:
+            with self.latency.time('indicator_compute'):
+                self.decide_trades()
+        
+        for i, crypto_name in enumerate(self.crypto):
+            price = prices[i]
+            
+            print('\n{} = ${}'.format(crypto_name, price))
 
-                                    self.orders[crypto_name] += [Order(order_info)]
+            trade = self.determine_trade(crypto_name)
+            
+            print('trade:', trade, end='\n\n')
+            
+            if self.plot_crypto_config:
+                self.plot_crypto(crypto_name, self.candles[crypto_name].close, self.candles[crypto_name].times)
 
-                                    print("Order info:", order_info)
+            # Update cash for buy or sell calculations
+            self.cash = self.ledger.get_available_cash()
 
-                                    if self.plot_crypto_config:
-                                        self.buy_times[crypto_name][dt.datetime.now()] = 'live_buy'
-                                else:
-                                    # Simulate buying the crypto by subtracting from cash, adding to holdings, and adjusting average bought price
+            if trade == 'BUY':
+                price = self.ticks.round_price(crypto_name, float(self.get_latest_quote(crypto_name)['ask_price']))
+                
+                if self.cash > 0:
+                    
+                    restricted_buy = False
+                    
+                    if self.only_buy_below_bought:
+                        if self.bought_price[crypto_name] <= price:
+                            print('Price is not lower than average bought price')
+                            restricted_buy = True
+                    
+                    if not restricted_buy:
+                        # https://robin-stocks.readthedocs.io/en/latest/robinhood.html#placing-and-cancelling-orders
 
-                                    self.cash -= dollars_to_spend
+                        dollars_to_spend = self.round_down_to_2(self.cash * self.cash_factor)
 
-                                    holdings_to_add = round(dollars_to_spend / price, self.get_precision(self.crypto_meta_data[crypto_name]['min_order_quantity_increment']))
+                        print('Attempting to BUY ${} of {} at price ${}'.format(dollars_to_spend, crypto_name, price))
 
-                                    self.bought_price[crypto_name] = round( ((self.bought_price[crypto_name] * self.holdings[crypto_name]) + (holdings_to_add * price)) / (self.holdings[crypto_name] + holdings_to_add), self.get_precision(self.crypto_meta_data[crypto_name]['min_order_price_increment']))
+                        if self.is_live:
 
-                                    self.holdings[crypto_name] += holdings_to_add
+                            with self.latency.time('order_placement', crypto_name):
+                                if self.buy_order_type == 'limit':
+                                    # Limit order by price
+                                    order_info = self.broker.order_buy_crypto_limit_by_price(crypto_name, dollars_to_spend, price)
 
-                                    trade = 'SIMULATION BUY'
+                                else:
+                                    # Market order
+                                    order_info = self.broker.order_buy_crypto_by_price(crypto_name, dollars_to_spend)
 
-                                    if self.plot_crypto_config:
-                                        if self.mode == 'safelive':
-                                            self.buy_times[crypto_name][dt.datetime.now()] = 'simulated_buy'
-                                        else:
-                                            self.buy_times[crypto_name][self.convert_timestamp_to_datetime(crypto_historicals[i][self.backtest_index]['begins_at'])] = 'simulated_buy'
-                            else:
-                                trade = "UNABLE TO BUY (BOUGHT PRICE)"
+                                self.place_order(crypto_name, order_info)
+
+                            print("Order info:", order_info)
 
-                                if self.plot_crypto_config:
-                                    if self.mode != 'backtest':
-                                        self.buy_times[crypto_name][dt.datetime.now()] = 'unable_to_buy'
-                                    else:
-                                        self.buy_times[crypto_name][self.convert_timestamp_to_datetime(crypto_historicals[i][self.backtest_index]['begins_at'])] = 'unable_to_buy'
-                        else:
-                            print('Not enough cash')
-    
-                            trade = "UNABLE TO BUY (NOT ENOUGH CASH)"
-                            
                             if self.plot_crypto_config:
-                                if self.mode != 'backtest':
-                                    self.buy_times[crypto_name][dt.datetime.now()] = 'unable_to_buy'
-                                else:
-                                    self.buy_times[crypto_name][self.convert_timestamp_to_datetime(crypto_historicals[i][self.backtest_index]['begins_at'])] = 'unable_to_buy'
-                    elif trade == 'SELL':
-                        if self.holdings[crypto_name] > 0:
-                            
-                            # https://robin-stocks.readthedocs.io/en/latest/robinhood.html#placing-and-cancelling-orders
-    
-                            if self.mode != 'backtest':
-                                price = round(float(self.get_latest_quote(crypto_name)['ask_price']), self.get_precision(self.crypto_meta_data[crypto_symbol]['min_order_price_increment']))
-                            
-                            
-                            
-                            restricted_sell = False
-                            
-                            if self.only_sell_above_bought:
-                                if self.bought_price[crypto_name] >= price:
-                                    print('Price is not higher than average bought price')
-                                    restricted_sell = True
-                            
-                            if not restricted_sell:
-                                holdings_to_sell = round(self.holdings[crypto_name] * self.holdings_factor, self.get_precision(self.crypto_meta_data['min_order_quantity_increment']))
-
-                                print('Attempting to SELL {} of {} at price ${} for ${}'.format(holdings_to_sell, crypto_name, price, round(holdings_to_sell * price, 2)))
-
-                                if self.is_live:
-
-                                    if self.sell_order_type == 'limit':
-                                        # Limit order by price for a set quantity
-                                        order_info = rh.orders.order_sell_crypto_limit(symbol=crypto_name, quantity=holdings_to_sell, limitPrice=price, timeInForce='gtc', jsonify=True)
-
-                                    else:
-                                        # Market order
-                                        order_info = rh.orders.order_sell_crypto_by_quantity(symbol=crypto_name, quantity=holdings_to_sell, timeInForce='gtc', jsonify=True)
-
-
-                                    self.orders[crypto_name] += [Order(order_info)]
-
-                                    print("Order info:", order_info)
-
-                                    if self.plot_crypto_config:
-                                        self.sell_times[crypto_name][dt.datetime.now()] = 'live_sell'
-                                else:
-                                    # Simulate selling the crypto by adding to cash and substracting from holdings
-                                    self.cash += round(holdings_to_sell * price, 2)
-
-                                    self.holdings[crypto_name] -= holdings_to_sell
-
-                                    # Average bought price is unaffected when selling
-                                    if self.holdings[crypto_name] == 0:
-                                        self.bought_price[crypto_name] = 0
-
-                                    trade = 'SIMULATION SELL'
-                                    if self.plot_crypto_config:
-                                        if self.mode == 'safelive':
-                                            self.sell_times[crypto_name][dt.datetime.now()] = 'simulated_sell'
-                                        else:
-                                            self.sell_times[crypto_name][self.convert_timestamp_to_datetime(crypto_historicals[i][self.backtest_index]['begins_at'])] = 'simulated_sell'
-                            else:
-                                trade = 'UNABLE TO SELL (BOUGHT PRICE)'
-
-                                if self.plot_crypto_config:
-                                    if self.mode != 'backtest':
-                                        self.sell_times[crypto_name][dt.datetime.now()] = 'unable_to_sell'
-                                    else:
-                                        self.sell_times[crypto_name][self.convert_timestamp_to_datetime(crypto_historicals[i][self.backtest_index]['begins_at'])] = 'unable_to_sell'
+                                self.plotter.add_marker(crypto_name, t.time(), 'live_buy')
                         else:
-                            print("Not enough holdings")
-    
-                            trade = 'UNABLE TO SELL (NOT ENOUGH HOLDINGS)'
-                            
+                            # Simulate buying the crypto by subtracting from cash, adding to holdings, and adjusting average bought price
+
+                            holdings_to_add = self.ticks.round_quantity(crypto_name, dollars_to_spend / price)
+
+                            with self.latency.time('order_placement', crypto_name):
+                                self.ledger.apply_fill(crypto_name, 'buy', holdings_to_add, price, dollars_to_spend)
+
+                            self.cash = self.ledger.get_available_cash()
+
+                            trade = 'SIMULATION BUY'
+
                             if self.plot_crypto_config:
-                                if self.mode != 'backtest':
-                                    self.sell_times[crypto_name][dt.datetime.now()] = 'unable_to_sell'
-                                else:
-                                    self.sell_times[crypto_name][self.convert_timestamp_to_datetime(crypto_historicals[i][self.backtest_index]['begins_at'])] = 'unable_to_sell'
-                    
-                    self.price_dict[crypto_name] = price
+                                self.plotter.add_marker(crypto_name, t.time(), 'simulated_buy')
+                    else:
+                        trade = "UNABLE TO BUY (BOUGHT PRICE)"
+
+                        if self.plot_crypto_config:
+                            self.plotter.add_marker(crypto_name, t.time(), 'unable_to_buy')
+                else:
+                    print('Not enough cash')
+
+                    trade = "UNABLE TO BUY (NOT ENOUGH CASH)"
                     
-                    self.trade_dict[crypto_name] = trade
+                    if self.plot_crypto_config:
+                        self.plotter.add_marker(crypto_name, t.time(), 'unable_to_buy')
+            elif trade == 'SELL':
+                # Holdings that are held by open sell orders cannot be sold again
+                available_holdings = self.ledger.get_available_holdings(crypto_name)
                 
-                self.df_trades, self.df_prices = self.build_dataframes()
-    
-                print('\ndf_prices \n', self.df_prices, end='\n\n')
-                print('df_trades \n', self.df_trades, end='\n\n')
-    
-                if self.mode != 'backtest':
-                    self.iteration_runtime_end = t.time()
-    
-                    if self.average_iteration_runtime == 0:
-    
-                        self.average_iteration_runtime = self.iteration_runtime_end - self.iteration_runtime_start
+                if available_holdings > 0:
+                    
+                    # https://robin-stocks.readthedocs.io/en/latest/robinhood.html#placing-and-cancelling-orders
+
+                    price = self.ticks.round_price(crypto_name, float(self.get_latest_quote(crypto_name)['ask_price']))
+                    
+                    restricted_sell = False
+                    
+                    if self.only_sell_above_bought:
+                        if self.bought_price[crypto_name] >= price:
+                            print('Price is not higher than average bought price')
+                            restricted_sell = True
+                    
+                    if not restricted_sell:
+                        holdings_to_sell = self.ticks.round_quantity(crypto_name, available_holdings * self.holdings_factor)
+
+                        print('Attempting to SELL {} of {} at price ${} for ${}'.format(holdings_to_sell, crypto_name, price, round(holdings_to_sell * price, 2)))
+
+                        if self.is_live:
+
+                            with self.latency.time('order_placement', crypto_name):
+                                if self.sell_order_type == 'limit':
+                                    # Limit order by price for a set quantity
+                                    order_info = self.broker.order_sell_crypto_limit(crypto_name, holdings_to_sell, price)
+
+                                else:
+                                    # Market order
+                                    order_info = self.broker.order_sell_crypto_by_quantity(crypto_name, holdings_to_sell)
+
+
+                                self.place_order(crypto_name, order_info)
+
+                            print("Order info:", order_info)
+
+                            if self.plot_crypto_config:
+                                self.plotter.add_marker(crypto_name, t.time(), 'live_sell')
+                        else:
+                            # Simulate selling the crypto by adding to cash and substracting from holdings
+                            with self.latency.time('order_placement', crypto_name):
+                                self.ledger.apply_fill(crypto_name, 'sell', holdings_to_sell, price)
+
+                            self.cash = self.ledger.get_available_cash()
+
+                            trade = 'SIMULATION SELL'
+                            if self.plot_crypto_config:
+                                self.plotter.add_marker(crypto_name, t.time(), 'simulated_sell')
                     else:
-                        # Update average iteration runtime
-                        self.average_iteration_runtime *= self.iteration_number
-    
-                        self.average_iteration_runtime += (self.iteration_runtime_end - self.iteration_runtime_start)
-    
-                        self.average_iteration_runtime /= (self.iteration_number + 1)
+                        trade = 'UNABLE TO SELL (BOUGHT PRICE)'
+
+                        if self.plot_crypto_config:
+                            self.plotter.add_marker(crypto_name, t.time(), 'unable_to_sell')
+                else:
+                    print("Not enough holdings")
+
+                    trade = 'UNABLE TO SELL (NOT ENOUGH HOLDINGS)'
                     
-                    # wait_time = self.convert_time_to_sec(self.get_interval()) - self.average_iteration_runtime
-                    wait_time = self.convert_time_to_sec(self.interval) - self.average_iteration_runtime
+                    if self.plot_crypto_config:
+                        self.plotter.add_marker(crypto_name, t.time(), 'unable_to_sell')
+            
+            self.price_dict[crypto_name] = price
+            
+            self.trade_dict[crypto_name] = trade
+        
+        self.journal.append(t.time(), self.price_dict, self.trade_dict)
+        
+        self.print_journal()
+    
+    def run_backtest(self):
+        """
+        Backtests over the downloaded historical data with the vectorized backtest engine. Assumes self.mode is 'backtest'.
+        
+        The signals of every bar are computed once and the simulated trading only loops over the precomputed signals.
+        """
+        if self.archive is not None:
+            self.run_streaming_backtest()
+            
+            return
+        
+        candles = self.load_backtest_candles()
+        
+        backtester = Backtester(self.config, candles, self.crypto_meta_data, self.backtest_index)
+        
+        if backtester.number_of_bars <= self.backtest_index:
+            print("not enough backtesting data to perform calculations")
+            
+            return
+        
+        summary = backtester.run()
+        
+        self.cash = backtester.cash
+        self.holdings = backtester.holdings
+        self.bought_price = backtester.bought_price
+        self.profit = backtester.profit
+        self.percent_change = backtester.percent_change
+        
+        self.iteration_number = summary['iterations']
+        self.backtest_index += summary['iterations']
+        
+        self.record_backtest_bars(backtester.times, backtester.closes, backtester.outcomes, backtester.portfolio)
+        
+        if summary['stopped_by_loss']:
+            # Prints which loss limit was exceeded
+            self.continue_trading()
+        else:
+            print("backtesting finished")
+        
+        self.update_output()
+        
+        self.print_journal()
+        
+        print('buys:', backtester.buys)
+        print('sells:', backtester.sells)
+        
+        if self.plot_portfolio_config:
+            bars = ~np.isnan(backtester.portfolio)
+            
+            self.time_data = list(backtester.times[bars] - backtester.times[bars][0])
+            self.portfolio_data = list(backtester.portfolio[bars])
+            
+            self.plot_portfolio()
+        
+        if self.plot_crypto_config:
+            markers = {
+                'SIMULATION BUY': 'simulated_buy',
+                'UNABLE TO BUY (BOUGHT PRICE)': 'unable_to_buy',
+                'UNABLE TO BUY (NOT ENOUGH CASH)': 'unable_to_buy',
+                'SIMULATION SELL': 'simulated_sell',
+                'UNABLE TO SELL (BOUGHT PRICE)': 'unable_to_sell',
+                'UNABLE TO SELL (NOT ENOUGH HOLDINGS)': 'unable_to_sell'
+            }
+            
+            statuses = np.array([markers.get(trade_name, '') for trade_name in self.journal.trade_names], dtype=object)
+            
+            times, prices, trades = self.journal.get_columns()
+            
+            for j, crypto_name in enumerate(self.crypto):
+                self.plot_crypto(crypto_name, backtester.closes[j], backtester.times[:backtester.number_of_bars])
+                
+                marked = statuses[trades[:, j]] != ''
+                
+                self.plotter.add_markers(crypto_name, times[marked], list(statuses[trades[:, j]][marked]))
+        
+        if self.plotter != None:
+            self.plotter.stop()
     
-                    if wait_time < 0:
-                        wait_time = 0
-                    
-                    if wait_time > 0:
-                        print('Waiting ' + str(round(wait_time, 2)) + ' seconds...')
+    def record_backtest_bars(self, times, closes, outcomes, portfolio, trades_only=False):
+        """
+        Appends the bars of a backtest that were simulated (where portfolio is not NaN) to self.journal
+        
+        With trades_only only the bars where at least one crypto did not hold are appended.
+        """
+        simulated = ~np.isnan(portfolio)
+        
+        if trades_only:
+            simulated &= (outcomes != backtest.OUTCOMES.index('HOLD')).any(axis=0)
+        
+        bars = np.flatnonzero(simulated)
+        
+        prices = np.array([np.round(closes[j, bars], self.ticks.get_price_precision(crypto_name)) for j, crypto_name in enumerate(self.crypto)])
+        
+        self.journal.extend(times[bars], prices.T, outcomes[:, bars].T)
     
-                        t.sleep(wait_time)
-                else:
-                    self.backtest_index += 1
-                
-                self.iteration_number += 1
-            
-            if self.export_csv_config:
-                self.export_csv()
+    def run_streaming_backtest(self):
+        """
+        Backtests over every candle of self.archive between self.backtest_start and self.backtest_end, one file at a time
         
-        except KeyboardInterrupt:
-            print("User ended execution of program.")
+        Memory does not grow with the length of the history: self.journal only keeps the bars with a trade and the portfolio
+        plot keeps at most self.backtest_plot_points points.
+        """
+        if not self.backtest_offline:
+            # Every download of the latest span adds to the history in the archive
+            new = self.fetcher.map(lambda crypto_symbol: self.archive.update(crypto_symbol, self.backtest_span), self.crypto)
             
-            if self.export_csv_config:
-                print("Exporting csv...")
-                self.export_csv()
+            print("archived", sum(new.values()), "new candles")
+        
+        backtester = StreamingBacktester(self.config, self.archive, self.crypto_meta_data, self.backtest_start, self.backtest_end, self.backtest_index)
+        
+        if self.plot_portfolio_config:
+            self.time_data, self.portfolio_data = [], []
             
-            self.logout()
+            # Every plot_step-th simulated bar is kept, plotted_bars is the number of simulated bars so far
+            self.plot_step = 1
+            self.plotted_bars = 0
         
-        except TypeError:
-            # Robinhood Internal Error
-            # 503 Server Error: Service Unavailable for url: https://api.robinhood.com/marketdata/forex/quotes/76637d50-c702-4ed1-bcb5-5b0732a81f48/
-            print("Robinhood Internal Error: TypeError: continuing trading")
+        for chunk in backtester.run():
+            self.record_backtest_bars(chunk['times'], chunk['closes'], chunk['outcomes'], chunk['portfolio'], trades_only=True)
             
-            # Continue trading
-            self.run()
+            if self.plot_portfolio_config:
+                self.add_portfolio_points(chunk['times'], chunk['portfolio'])
         
-        except KeyError:
-            # Robinhood Internal Error
-            # 503 Service Error: Service Unavailable for url: https://api.robinhood.com/portfolios/
-            # 500 Server Error: Internal Server Error for url: https://api.robinhood.com/portfolios/
-            print("Robinhood Internal Error: KeyError: continuing trading")
+        if backtester.bars <= self.backtest_index:
+            print("not enough backtesting data to perform calculations")
             
-            # Continue trading
-            self.run()
+            return
         
-        except Exception:
-            print("An unexpected error occured: stopping trading")
-
-            if self.export_csv_config:
-                print("Exporting csv...")
-                self.export_csv()
+        summary = backtester.summary()
+        
+        self.cash = backtester.cash
+        self.holdings = backtester.holdings
+        self.bought_price = backtester.bought_price
+        self.profit = backtester.profit
+        self.percent_change = backtester.percent_change
+        
+        self.iteration_number = summary['iterations']
+        self.total_iteration_number = backtester.bars - self.backtest_index
+        self.backtest_index += summary['iterations']
+        
+        if summary['stopped_by_loss']:
+            # Prints which loss limit was exceeded
+            self.continue_trading()
+        else:
+            print("backtesting finished")
+        
+        self.update_output()
+        
+        self.print_journal()
+        
+        print('buys:', backtester.buys)
+        print('sells:', backtester.sells)
+        
+        if self.plot_portfolio_config:
+            self.time_data = [time - self.time_data[0] for time in self.time_data]
             
-            self.logout()
+            self.plot_portfolio()
+        
+        if self.plotter != None:
+            self.plotter.stop()
+    
+    def add_portfolio_points(self, times, portfolio):
+        """
+        Appends the simulated bars (where portfolio is not NaN) of a streamed backtest to self.time_data and
+        self.portfolio_data, keeping at most self.backtest_plot_points of them
+        
+        Every self.plot_step-th bar is kept. Once there are too many points every other point is dropped and
+        self.plot_step doubles, so the points stay evenly spaced.
+        """
+        bars = np.flatnonzero(~np.isnan(portfolio))
+        
+        kept = bars[(self.plotted_bars + np.arange(len(bars))) % self.plot_step == 0]
+        
+        self.plotted_bars += len(bars)
+        
+        self.time_data += list(times[kept])
+        self.portfolio_data += list(portfolio[kept])
+        
+        while len(self.time_data) > self.backtest_plot_points:
+            self.time_data = self.time_data[::2]
+            self.portfolio_data = self.portfolio_data[::2]
             
-            raise Exception
+            self.plot_step *= 2
     
     def generate_id(self):
         """
@@ -507,13 +1000,7 @@ class Trader():
         '0.00100000000000': 3
         '0.00010000000000': 4
         """
-        one = text.find('1')
-        dot = text.find('.')
-        
-        if one < dot:
-            return one - dot + 1
-        else:
-            return one - dot
+        return get_precision(text)
     
     def round_down_to_2(self, value):
         """
@@ -524,10 +1011,7 @@ class Trader():
         26.531 -> 26.53
         -26.539 -> -26.53
         """
-        if value < 0:
-            return math.ceil(value * 100)/100.0
-        else:
-            return math.floor(value * 100)/100.0
+        return backtest.round_down_to_2(value)
     
     def login(self):
         """
@@ -535,21 +1019,24 @@ class Trader():
         """
         time_logged_in = 60 * 60 * 24 * self.days_to_run
         
-        rh.authentication.login(username=self.username,
-                                password=self.password,
-                                expiresIn=time_logged_in,
-                                scope='internal',
-                                by_sms=True,
-                                store_session=False)
+        self.broker.login(self.username, self.password, time_logged_in)
         
         print("login successful")
     
     def logout(self):
         """
         Attempts to log out the user unless already logged out.
+        
+        The plotting process is told that no more updates are coming, open plot windows stay open.
         """
+        if self.plotter != None:
+            self.plotter.stop()
+        
+        if self.shards != None:
+            self.shards.stop()
+        
         try:
-            rh.authentication.logout()
+            self.broker.logout()
             
             print('logout successful')
         except:
@@ -557,15 +1044,77 @@ class Trader():
     
     def retrieve_cash_and_equity(self):
         """
-        Returns cash, equity as floats from robin_stocks.robinhood.account.build_user_profile() rounded to two decimal places
+        Returns cash, equity as floats from the user profile of self.broker (robin_stocks.robinhood.account.build_user_profile()) rounded to two decimal places
         """
-        rh_cash = rh.account.build_user_profile()
+        rh_cash = self.broker.build_user_profile()
         
         cash = round(float(rh_cash['cash']), 2)
         equity = round(float(rh_cash['equity']), 2)
         
         return cash, equity
     
+    def reconcile(self):
+        """
+        Replaces the ledger with the cash, equity, holdings and bought price downloaded from the account
+        """
+        self.holdings, self.bought_price = self.get_holdings_and_bought_price()
+        
+        cash, self.equity = self.retrieve_cash_and_equity()
+        
+        if self.is_live:
+            self.order_reconciler.poll()
+            
+            open_orders = self.order_reconciler.get_open_orders()
+        else:
+            open_orders = []
+        
+        self.ledger.reconcile(cash, self.equity, self.holdings, self.bought_price, open_orders)
+        
+        self.cash = self.ledger.get_available_cash()
+        self.holdings = self.ledger.holdings
+        self.bought_price = self.ledger.bought_price
+    
+    def update_ledger(self):
+        """
+        Applies the fills of the open orders to the ledger, or reconciles the ledger with the account if it is time to
+        """
+        if self.ledger.needs_reconcile():
+            self.reconcile()
+            
+            return
+        
+        self.order_reconciler.poll()
+        
+        self.cash = self.ledger.get_available_cash()
+    
+    def place_order(self, crypto_name, order_info):
+        """
+        Records an order that was just placed for crypto_name so that its fills are applied to the ledger
+        """
+        if order_info is None or 'id' not in order_info:
+            # The order may or may not have been placed
+            self.ledger.mark_drift('unexpected order info for ' + crypto_name + ': ' + str(order_info))
+            
+            return
+        
+        order = Order(order_info)
+        
+        self.orders[crypto_name] += [order]
+        
+        self.ledger.track(order, crypto_name)
+        self.order_reconciler.add(order, crypto_name)
+        
+        self.cash = self.ledger.get_available_cash()
+    
+    def on_order_event(self, event):
+        """
+        Applies an event of self.order_reconciler to the ledger
+        """
+        self.ledger.apply_order(event['order'])
+        
+        if event['type'] == 'fill':
+            print('Order filled: {} {} {} at ${} ({})'.format(event['side'], event['quantity'], event['crypto'], self.ticks.round_price(event['crypto'], event['price']), event['state']))
+    
     def payment(self, crypto_symbol, amount):
         """
         Need to finish implementation
@@ -574,7 +1123,7 @@ class Trader():
         if self.holdings[crypto_symbol] < amount:
             return
         
-        crypto_id = rh.crypto.get_crypto_id(crypto_symbol)
+        crypto_id = self.broker.get_crypto_id(crypto_symbol)
 
         # Ensure that all possible crypto_symbol can be found using payment_address
         # E.g. 'BTC' and 'BTC-USD' need to both point to Bitcoin
@@ -591,9 +1140,19 @@ class Trader():
     
     def get_latest_quote(self, crypto_symbol):
         """
-        Returns a string of the latest quote of the cryptocurrency.
+        Returns a dictionary of the latest quote of the cryptocurrency from the quote cache.
         """
-        return rh.crypto.get_crypto_quote(crypto_symbol)
+        return self.quotes.get(crypto_symbol)
+    
+    def download_quote(self, crypto_symbol):
+        """
+        Downloads the latest quote of the cryptocurrency, using the id from self.crypto_meta_data when it is available to avoid looking it up
+        """
+        with self.latency.time('quote_fetch', crypto_symbol):
+            if crypto_symbol in self.crypto_meta_data:
+                return self.broker.get_crypto_quote_from_id(self.crypto_meta_data[crypto_symbol]['id'])
+            else:
+                return self.broker.get_crypto_quote(crypto_symbol)
     
     def get_crypto_holdings_capital(self):
         """
@@ -606,6 +1165,14 @@ class Trader():
         
         return round(capital, 2)
     
+    def get_portfolio_value(self):
+        """
+        Returns the dollar value of the cash and crypto assets, including the cash and holdings held by open orders
+        
+        self.cash is only the cash that is available for new buy orders.
+        """
+        return round(self.ledger.cash + self.get_crypto_holdings_capital(), 2)
+    
     def convert_time_to_sec(self, time_str):
         """
         Input:
@@ -663,21 +1230,53 @@ class Trader():
         print("crypto equity and cash: $" + str(round(self.cash + self.get_crypto_holdings_capital(), 2)))
         
         print("profit: " + self.display_profit() + " (" + self.display_percent_change() + ")")
+        
+        print("quote cache: " + str(self.quotes.hits) + " hits, " + str(self.quotes.misses) + " misses")
 
         if self.is_live:
-            print("number of pending orders:", len(get_all_open_orders()))
+            print("number of pending orders:", len(self.ledger.open_orders))
             print("number of orders:", {crypto_symbol: len(self.orders[crypto_symbol]) for crypto_symbol in self.crypto})
     
+    @property
+    def df_trades(self):
+        """
+        DataFrame of the trade of every crypto at every iteration, indexed by the time of the iteration
+        """
+        return self.journal.to_dataframes()[0]
+    
+    @property
+    def df_prices(self):
+        """
+        DataFrame of the price of every crypto at every iteration, indexed by the time of the iteration
+        """
+        return self.journal.to_dataframes()[1]
+    
     def build_dataframes(self):
         """
-        Need to determine if self.df_trades and self.df_prices are changed and therefore do not need to be returned
+        Returns df_trades, df_prices built from self.journal
+        """
+        with self.latency.time('dataframe_build'):
+            return self.journal.to_dataframes()
+    
+    def get_latency(self):
         """
-        time_now = str(dt.datetime.now().time())[:8]
+        Returns a DataFrame with the count, mean, p50, p95, p99 and max latency (in seconds) of every phase of the iterations
         
-        self.df_trades.loc[time_now] = self.trade_dict
-        self.df_prices.loc[time_now] = self.price_dict
+        Phases that are done for every crypto on its own ('quote_fetch', 'historicals_fetch', 'indicator_compute' and
+        'order_placement') have a row per crypto, the others have no crypto. See latency.py.
+        """
+        return self.latency.summary()
+    
+    def print_journal(self):
+        """
+        Prints the latest self.print_rows rows of df_prices and df_trades
+        """
+        with self.latency.time('dataframe_build'):
+            df_trades, df_prices = self.journal.tail(self.print_rows)
         
-        return self.df_trades, self.df_prices
+        with self.latency.time('console_output'):
+            print('\ndf_prices (last ' + str(len(df_prices)) + ' of ' + str(len(self.journal)) + ' rows) \n', df_prices, end='\n\n')
+            print('df_trades (last ' + str(len(df_trades)) + ' of ' + str(len(self.journal)) + ' rows) \n', df_trades, end='\n\n')
     
     def build_holdings(self):
         """
@@ -694,7 +1293,10 @@ class Trader():
                 }}
         """
         
-        holdings_data = rh.crypto.get_crypto_positions()
+        holdings_data = self.broker.get_crypto_positions()
+        
+        # Download the quotes of every position at once
+        self.quotes.snapshot([holdings_data[i]["currency"]["code"] for i in range(len(holdings_data))])
         
         build_holdings_data = dict()
         
@@ -727,9 +1329,9 @@ class Trader():
 
         for crypto_symbol in self.crypto:
             try:
-                holdings[crypto_symbol] = round(float(rh_holdings[crypto_symbol]['quantity']), self.get_precision(self.crypto_meta_data[crypto_symbol]['min_order_quantity_increment']))
+                holdings[crypto_symbol] = self.ticks.round_quantity(crypto_symbol, float(rh_holdings[crypto_symbol]['quantity']))
                 
-                bought_price[crypto_symbol] = round( float(rh_holdings[crypto_symbol]['average_buy_price']), self.get_precision(self.crypto_meta_data[crypto_symbol]['min_order_price_increment']))
+                bought_price[crypto_symbol] = self.ticks.round_price(crypto_symbol, float(rh_holdings[crypto_symbol]['average_buy_price']))
             except:
                 holdings[crypto_symbol] = 0
                 bought_price[crypto_symbol] = 0
@@ -744,33 +1346,47 @@ class Trader():
 
         for crypto, amount in self.holdings.items():
             
-            text += '\t' + str(amount) + ' ' + crypto + " at $" + str(round(float(self.get_latest_quote(crypto)['mark_price']), self.get_precision(self.crypto_meta_data[crypto]['min_order_price_increment']))) + '\n'
+            text += '\t' + str(amount) + ' ' + crypto + " at $" + str(self.ticks.round_price(crypto, float(self.get_latest_quote(crypto)['mark_price']))) + '\n'
         
         text = text[:-2]
         
         return text
         
-    def download_backtest_data(self):
+    def load_backtest_candles(self):
         """
-        Returns historical crypto data for every crypto in self.crypto
+        Returns the historical crypto data for every crypto in self.crypto as arrays (see candles.parse_historicals)
         
+        The data is read from self.historicals_cache when it is set and only downloaded if it is missing, expired, or a refresh was requested.
         Assumes that self.mode is 'backtest'
         """
-        crypto_historical_data = {}
+        # Cryptos that were loaded before a retry of self.supervisor are not loaded again
+        self.fetcher.map(self.load_backtest_crypto, [crypto_symbol for crypto_symbol in self.crypto if crypto_symbol not in self.backtest_candles])
         
-        for i in range(len(self.crypto)):
-            
-            crypto_historical_data[self.crypto[i]] = rh.crypto.get_crypto_historicals(symbol=self.crypto[i], interval=self.backtest_interval, span=self.backtest_span, bounds=self.backtest_bounds)
+        print("loading backtesting data finished")
         
-        print("downloading backtesting data finished")
+        return {crypto_symbol: self.backtest_candles[crypto_symbol] for crypto_symbol in self.crypto}
+    
+    def load_backtest_crypto(self, crypto_symbol):
+        """
+        Loads the historical data of crypto_symbol into self.backtest_candles, see load_backtest_candles()
+        """
+        if self.historicals_cache is None:
+            candles = parse_historicals(self.broker.get_crypto_historicals(crypto_symbol, self.backtest_interval, self.backtest_span, self.backtest_bounds))
+        else:
+            candles = self.historicals_cache.load(crypto_symbol, self.backtest_interval, self.backtest_span, self.backtest_bounds, self.backtest_refresh, self.backtest_offline)
         
-        return crypto_historical_data
+        self.backtest_candles[crypto_symbol] = candles
     
     def export_csv(self):
         """
-        Exports a csv of completed crypto orders
+        Appends the completed crypto orders that are new since the previous export to a csv of completed crypto orders
+        
+        If 'export_journal' is True, the rows of self.journal that are new since the previous export are appended as well.
         """
-        rh.export.export_completed_crypto_orders('./', 'completed_crypto_orders')
+        print("exported", self.exporter.export_orders(), "new completed orders")
+        
+        if self.export_journal_config:
+            print("exported", self.exporter.export_journal(self.journal, 'journal', self.journal_format), "new journal rows")
     
     def check_config(self, config):
         """
@@ -784,11 +1400,23 @@ class Trader():
         
         assert config['mode'] in ['live', 'backtest', 'safelive']
         
+        assert type(config.get('simulation', {})) == dict
+        
         assert type(config['export_csv']) == bool
         
+        assert type(config.get('export_journal', False)) == bool
+        
+        assert config.get('journal_format', 'csv') in ['csv', 'parquet']
+        
+        assert type(config.get('export_directory', './')) == str
+        
         assert type(config['plot_crypto']) == bool
         
         assert type(config['plot_portfolio']) == bool
+        
+        assert config.get('plot_output', 'window') in ['window', 'file']
+        
+        assert type(config.get('plot_directory', './plots')) == str
 
         assert type(config['crypto']) == list and len(config['crypto']) > 0
 
@@ -800,13 +1428,39 @@ class Trader():
         
         assert config['loss_percentage'] >= 0
         
-        assert type(config['determine_trade_function']) == str
+        assert type(config['determine_trade_function']) == str or get_strategy(config['determine_trade_function']) != None
         
         assert type(config['only_buy_below_average_bought_price']) == bool
         
         assert type(config['only_sell_above_average_bought_price']) == bool
         
         assert type(config.get('builtin_trade_function_arguments', [])) == list
+        
+        assert type(config.get('max_workers', 8)) == int and config.get('max_workers', 8) >= 1
+        
+        assert type(config.get('print_rows', 10)) == int and config.get('print_rows', 10) >= 0
+        
+        assert config.get('latency_file') == None or type(config['latency_file']) == str
+        
+        assert type(config.get('latency_interval', 60)) in [int, float] and config.get('latency_interval', 60) >= 0
+        
+        assert type(config.get('shards', 1)) == int and config.get('shards', 1) >= 1
+        
+        if config.get('shards', 1) > 1:
+            # Shard workers are separate processes that create the broker by name and keep the candles that plot_crypto needs
+            assert type(config.get('broker', 'robinhood')) == str
+            
+            assert config['plot_crypto'] == False
+        
+        if config.get('reconcile_interval', 300) != None:
+            assert type(config.get('reconcile_interval', 300)) == float or type(config.get('reconcile_interval', 300)) == int
+            
+            assert config.get('reconcile_interval', 300) >= 0
+        
+        if config.get('quote_max_age') != None:
+            assert type(config['quote_max_age']) == float or type(config['quote_max_age']) == int
+            
+            assert config['quote_max_age'] >= 0
 
         assert type(config['cash_factor']) == int or type(config['cash_factor']) == float
         
@@ -826,16 +1480,28 @@ class Trader():
 
         assert config['sell_order_type'] in order_types
         
-        # Use rh.crypto.get_crypto_currency_pairs() for 'pairs' so that it is up-to-date
+        assert config.get('metadata_cache') == None or type(config['metadata_cache']) == str
+        
+        if config.get('metadata_max_age', 86400) != None:
+            assert type(config.get('metadata_max_age', 86400)) in [int, float] and config.get('metadata_max_age', 86400) >= 0
+        
+        assert type(config.get('warm_start', False)) == bool
+        
+        if config.get('max_retries') != None:
+            assert type(config['max_retries']) == int and config['max_retries'] >= 0
+        
+        assert type(config.get('retry_backoff', 1.0)) in [int, float] and config.get('retry_backoff', 1.0) >= 0
+        
+        assert type(config.get('max_retry_backoff', 300.0)) in [int, float] and config.get('max_retry_backoff', 300.0) >= 0
+        
+        assert config.get('checkpoint_file') == None or type(config['checkpoint_file']) == str
         
-        crypto_pair_data = rh.crypto.get_crypto_currency_pairs()
+        assert type(config.get('checkpoint_interval', 300)) in [int, float] and config.get('checkpoint_interval', 300) >= 0
         
-        pairs = []
+        assert type(config.get('resume', True)) == bool
         
-        for i in range(len(crypto_pair_data)):
-            if crypto_pair_data[i]['tradability'] == 'tradable':
-                pairs += [crypto_pair_data[i]['asset_currency']['code']]
-                pairs += [crypto_pair_data[i]['symbol']]
+        # The currency pairs of the broker (rh.crypto.get_crypto_currency_pairs()), from self.metadata when they are not too old
+        pairs = self.metadata.get_tradable_symbols()
         
         for i in range(len(config['crypto'])):
             assert config['crypto'][i] in pairs
@@ -863,10 +1529,38 @@ class Trader():
             assert type(config['backtest']['bounds']) == str
             
             assert config['backtest']['bounds'] in bounds
+            
+            assert config['backtest'].get('cache_directory') == None or type(config['backtest']['cache_directory']) == str
+            
+            if config['backtest'].get('cache_max_age') != None:
+                assert type(config['backtest']['cache_max_age']) == float or type(config['backtest']['cache_max_age']) == int
+                
+                assert config['backtest']['cache_max_age'] >= 0
+            
+            assert type(config['backtest'].get('refresh', False)) == bool
+            
+            assert type(config['backtest'].get('offline', False)) == bool
+            
+            assert config['backtest'].get('archive') == None or type(config['backtest']['archive']) == str
+            
+            assert type(config['backtest'].get('chunk_size', 5760)) == int and config['backtest'].get('chunk_size', 5760) >= 1
+            
+            assert type(config['backtest'].get('plot_points', 10000)) == int and config['backtest'].get('plot_points', 10000) >= 2
+            
+            for key in ['start', 'end']:
+                assert config['backtest'].get(key) == None or type(config['backtest'][key]) in [int, float, str]
+            
+            if config['backtest'].get('archive') != None:
+                # The candles of every crypto are not kept in memory to be plotted
+                assert config['plot_crypto'] == False
 
             functions = ['boll', 'macd_rsi']
 
-            if config['determine_trade_function'] not in functions:
+            if get_strategy(config['determine_trade_function']) != None:
+                assert type(config['backtest'].get('index', 0)) == int
+
+                assert config['backtest'].get('index', 0) >= 0
+            elif config['determine_trade_function'] not in functions:
                 assert type(config['backtest']['index']) == int
 
                 assert config['backtest']['index'] >= 0
@@ -888,6 +1582,12 @@ class Trader():
             assert type(config['trader']['bounds']) == str
 
             assert config['trader']['bounds'] in bounds
+            
+            assert config['trader'].get('scheduler', 'sleep') in ['sleep', 'asyncio']
+            
+            assert type(config['trader'].get('delay', 1.0)) == float or type(config['trader'].get('delay', 1.0)) == int
+            
+            assert config['trader'].get('delay', 1.0) >= 0
         
         print("configuration test: PASSED")
     
@@ -978,70 +1678,48 @@ class Trader():
     
     def get_historical_data(self, crypto_symbol):
         """
-        Returns historical crypto data for crypto_symbol.
+        Returns historical crypto data for crypto_symbol from the candle store.
         Assumes self.mode is either 'live' or 'safelive'.
         """
-        historical_data = rh.crypto.get_crypto_historicals(crypto_symbol, interval=self.interval, span=self.span, bounds=self.bounds)
-        
-        # df contains all the data (eg. time, open, close, high, low, volume, session, interpolated, symbol)
-        df = pd.DataFrame(historical_data)
+        # df contains all the data (eg. time, open, close, high, low, volume)
+        df = self.candles[crypto_symbol].to_dataframe()
         
         return df
     
-    def get_historical_times(self, crypto_symbol):
-        # df contains all the data (eg. time, open, close, high, low)
-        df = self.get_historical_data(crypto_symbol)
-        
-        dates_times = pd.to_datetime(df.loc[:, 'begins_at'])
-        
-        return dates_times
-
-    def get_historical_prices(self, crypto_symbol):
-        # df contains all the data (eg. time, open, close, high, low)
-        df = self.get_historical_data(crypto_symbol)
-
-        dates_times = pd.to_datetime(df.loc[:, 'begins_at'])
-        close_prices = df.loc[:, 'close_price'].astype('float')
-
-        df_price = pd.concat([close_prices, dates_times], axis=1)
-        df_price = df_price.rename(columns={'close_price': crypto_symbol})
-        df_price = df_price.set_index('begins_at')
-
-        return df_price
+    def update_candles(self):
+        """
+        Downloads the candles that are newer than the latest stored candle for every crypto concurrently
+        """
+        self.fetcher.map(self.update_crypto_candles, self.crypto)
     
-    def convert_dataframe_to_list(self, df, is_nested=False):
-        df = df.to_numpy()
-        
-        data = []
-        
-        for i in range(len(df)):
-            if is_nested:
-                data.append(df[i][0])
-            else:
-                data.append(df[i])
-        
-        return data
+    def update_crypto_candles(self, crypto_name):
+        """
+        Downloads the candles of crypto_name that are newer than its latest stored candle
+        """
+        with self.latency.time('historicals_fetch', crypto_name):
+            self.candles[crypto_name].update()
     
-    def determine_trade(self, crypto_symbol, crypto_historicals=None):
-        if self.mode == 'backtest':
-            assert crypto_historicals != None
-            
-            # Set times and prices given stock_historicals
-            times, prices = [], []
-            
-            for k in range(len(crypto_historicals[crypto_symbol])):
-                times += [crypto_historicals[crypto_symbol][k]['begins_at']]
-                
-                prices += [float(crypto_historicals[crypto_symbol][k]['close_price'])]
-        else:
-            df_historical_prices = self.get_historical_prices(crypto_symbol)
-            
-            # https://pandas.pydata.org/docs/reference/api/pandas.Timestamp.html#pandas.Timestamp
-            times = self.convert_dataframe_to_list(self.get_historical_times(crypto_symbol))
-            prices = self.convert_dataframe_to_list(df_historical_prices, True)
+    def decide_trades(self):
+        """
+        Calls the strategy once with the latest candles of every crypto and stores its decisions in self.decisions
+        """
+        signals = self.strategy.decide(stack_candles(self.candles, self.crypto, self.strategy.lookback))
         
-        if self.determine_trade_func in ['boll', 'macd_rsi']:
-            trade = eval('self.' + self.determine_trade_func + '(crypto_symbol, times, prices)')
+        self.decisions = {crypto_name: DECISIONS[signal] for crypto_name, signal in zip(self.crypto, signals)}
+    
+    def determine_trade(self, crypto_symbol):
+        if crypto_symbol in self.decisions:
+            # Decided for every crypto at once by self.decide_trades() or by the shard workers
+            return self.decisions[crypto_symbol]
+        
+        # The candle store is brought up to date by self.update_candles() at the start of every iteration
+        # times are in seconds since the epoch
+        times = self.candles[crypto_symbol].times
+        prices = self.candles[crypto_symbol].close
+        
+        if self.determine_trade_func in self.builtin_trade_functions:
+            with self.latency.time('indicator_compute', crypto_symbol):
+                trade = self.builtin_trade_functions[self.determine_trade_func](crypto_symbol, times, prices)
         else:
             # Need to finish implementation for personalized trading strategies
             trade = 'HOLD'
@@ -1050,9 +1728,6 @@ class Trader():
 
             self.trade = trade
         
-        if self.plot_crypto_config:
-            self.plot_crypto(crypto_symbol, prices, times)
-        
         return trade
 
     def macd_rsi(self, crypto_name, times, prices):
@@ -1062,130 +1737,38 @@ class Trader():
         If both RSI and MACD are cross their respective thresholds, then either buy or sell
         Else hold
         """
-
-        """
-        Start Helper Functions
-        """
-        def RSI(times, prices, period):
-            """
-            Relative Strength Index (RSI)
-            """
-            
-            assert len(times) == len(prices)
-            assert len(times) >= period + 2
-            assert len(prices) >= period + 2
-            
-            RSI = []
-            
-            for i in range(1, len(prices) - period):
-                count_gain, count_loss = 0, 0
-                
-                for j in range(i, i + period):
-                    if prices[j] - prices[j-1] > 0:
-                        count_gain += 1
-                    elif prices[j] - prices[j-1] < 0:
-                        count_loss += 1
-                
-                avgU = count_gain / period
-                avgD = count_loss / period
-                
-                try:
-                    RSI.append([times[j+1], 100 - 100 / (1 + (avgU / avgD))])
-                except ZeroDivisionError:
-                    RSI.append([times[j+1], 100])
-            
-            return RSI
-        
-        def MACD(times, prices, fast_period, slow_period, signal_period):
-            """
-            Moving Average Convergence Divergence (MACD)
-            """
-
-            def EMA(times, prices, period):
-                """
-                Exponential Moving Average (EMA)
-                """
-                
-                assert len(times) == len(prices)
-                
-                ema = []
-                
-                # First calculate the moving average for the first length
-                ma = 0
-                
-                for i in range(period):
-                    ma += prices[i]
-                
-                ma /= period
-                
-                
-                ema.append([times[period-1], ma])
-                
-                multiplier = 2 / (period + 1)
-                
-                # Calculate the EMA for the rest of the lengths
-                for i in range(period, len(prices)):
-                    ema.append([times[i], (prices[i] * multiplier + (ema[-1][1] * (1 - multiplier)))])
-                
-                return ema
-            
-            assert len(times) == len(prices)
-            assert len(times) >= slow_period + signal_period - 1
-            assert len(prices) >= slow_period + signal_period - 1
-            
-            macd = []
-            signal = []
-            
-            fast = EMA(times, prices, fast_period)
-            
-            slow = EMA(times, prices, slow_period)
-            
-            for i in range(len(slow)):
-                for j in range(len(fast)):
-                    if slow[i][0] == fast[j][0]:
-                        macd.append([slow[i][0], fast[j][1] - slow[i][1]])
-            
-            macd_times, macd_values = [], []
-            
-            for i in range(len(macd)):
-                macd_times.append(macd[i][0])
-                macd_values.append(macd[i][1])
-            
-            signal = EMA(macd_times, macd_values, signal_period)
-            
-            return macd, signal
-        """
-        End Helper Functions
-        """
         if self.builtin_trade_function_arguments == []:
-            rsi_period, rsi_index, rsi_sell_level, rsi_buy_level, macd_fast_period, macd_slow_period, macd_signal_period, macd_index = 14, -16, 70, 30, 12, 26, 9, -34
+            rsi_period, rsi_index, rsi_sell_level, rsi_buy_level, macd_fast_period, macd_slow_period, macd_signal_period, macd_index = backtest.MACD_RSI_ARGUMENTS
         else:
             rsi_period, rsi_index, rsi_sell_level, rsi_buy_level, macd_fast_period, macd_slow_period, macd_signal_period, macd_index = self.builtin_trade_function_arguments[0], self.builtin_trade_function_arguments[1], self.builtin_trade_function_arguments[2], self.builtin_trade_function_arguments[3], self.builtin_trade_function_arguments[4], self.builtin_trade_function_arguments[5], self.builtin_trade_function_arguments[6], self.builtin_trade_function_arguments[7]
         
-        rsi_data = RSI(times[rsi_index:], prices[rsi_index:], rsi_period)
+        prices = np.asarray(prices, dtype=np.float64)
+        
+        # The RSI is taken over the window that ends one price before the latest price
+        rsi_prices = prices[rsi_index:]
+        
+        assert len(rsi_prices) == rsi_period + 2
         
-        assert len(rsi_data) == 1
+        rsi_value = indicators.rsi(rsi_prices, rsi_period)[-2]
         
-        if rsi_data[-1][1] > rsi_sell_level:
+        if rsi_value > rsi_sell_level:
             rsi_indicator = "SELL"
-        elif rsi_data[-1][1] < rsi_buy_level:
+        elif rsi_value < rsi_buy_level:
             rsi_indicator = "BUY"
         else:
             rsi_indicator = "HOLD"
         
-        macd, signal = MACD(times[macd_index:], prices[macd_index:], macd_fast_period, macd_slow_period, macd_signal_period)
-        macd_signal_difference = []
+        macd_prices = prices[macd_index:]
         
-        assert len(signal) == 1
+        assert len(macd_prices) == max(macd_fast_period, macd_slow_period) + macd_signal_period - 1
         
-        for i in range(len(macd)):
-            for j in range(len(signal)):
-                if macd[i][0] == signal[j][0]:
-                    macd_signal_difference.append([signal[j][0], macd[i][1] - signal[j][1]])
+        macd, signal = indicators.macd(macd_prices, macd_fast_period, macd_slow_period, macd_signal_period)
         
-        if macd_signal_difference[-1][1] > 0:
+        macd_signal_difference = macd[-1] - signal[-1]
+        
+        if macd_signal_difference > 0:
             macd_signal_indicator = "SELL"
-        elif macd_signal_difference[-1][1] < 0:
+        elif macd_signal_difference < 0:
             macd_signal_indicator = "BUY"
         else:
             macd_signal_indicator = "HOLD"
@@ -1202,82 +1785,32 @@ class Trader():
 
         return self.trade
     
+    def get_boll_arguments(self):
+        """
+        Returns the period and std_width of the bollinger bands, from builtin_trade_function_arguments or the defaults
+        """
+        if self.builtin_trade_function_arguments == []:
+            return backtest.BOLL_ARGUMENTS
+        else:
+            return self.builtin_trade_function_arguments[0], self.builtin_trade_function_arguments[1]
+    
     def boll(self, crypto_name, times, prices):
         """
         Determines whether the trade is a 'BUY', 'SELL', or 'HOLD'
         
         Algorithm uses bollinger bands
         """
-        if self.builtin_trade_function_arguments == []:
-            period = 20
-            std_width = 2
-        else:
-            period = self.builtin_trade_function_arguments[0]
-            std_width = self.builtin_trade_function_arguments[1]
-
-        # Helper function
-        def BOLL(times, prices, period, std_width):
-            """
-            Bollinger bands (BOLL)
-            
-            Returns:
-                [{'time': 'time1',
-                'moving_average': 0.397,
-                'upper_band': 0.348,
-                'lower_band': 0.299},
-                {'time': 'time2',
-                'moving_average': 0.972,
-                'upper_band': 1.000
-                'lower_band': 0.944}
-                ]
-            """
-
-            # Helper function
-            def MA(times, prices, period):
-                """
-                Moving Average (MA)
-                """
-                
-                assert len(times) == len(prices)
-                
-                ma = []
-                
-                for i in range(len(prices) - period + 1):
-                    total = 0
-                    
-                    for j in range(i, i+period):
-                        
-                        total += prices[j]
-                    
-                    total /= period
-                    
-                    ma.append([times[i + period - 1], total])
-                
-                return ma
-            
-            assert len(times) == len(prices)
-            assert len(times) >= period
-            assert len(prices) >= period
-            
-            moving_average = MA(times, prices, period)
-            
-            boll = []
-            
-            for i in range(len(moving_average)):
-                std = np.std(prices[i:i+period])
-                
-                boll += [{'time': moving_average[i][0], 'moving_average': moving_average[i][1], 'upper_band': moving_average[i][1] + (std * std_width), 'lower_band': moving_average[i][1] - (std * std_width)}]
-            
-            return boll
-
-        boll_data = BOLL(times[-1 * period:], prices[-1 * period:], period, std_width)
+        period, std_width = self.get_boll_arguments()
         
-        assert len(boll_data) == 1
+        assert len(prices) >= period
         
-        if boll_data[-1]['upper_band'] < prices[-1]:
+        # The bands of the window ending at the latest price, kept up to date by the candle store of crypto_name
+        moving_average, upper_band, lower_band = self.candles[crypto_name].bands.bands()
+        
+        if upper_band < prices[-1]:
 
             self.trade = "SELL"
-        elif boll_data[-1]['lower_band'] > prices[-1]:
+        elif lower_band > prices[-1]:
 
             self.trade = "BUY"
         else:
@@ -1287,70 +1820,26 @@ class Trader():
         return self.trade
     
     def plot_crypto(self, stock, prices, price_times):
-        # RGBA: [red, green, blue, alpha]
-        """
-        status_to_color = {
-            'live_buy': dark_red,
-            'simulated_buy': light_red,
-            'unable_to_buy': yellow,
-            'live_sell': dark_green,
-            'simulated_sell': light_green,
-            'unable_to_sell': blue
-        }
         """
-        status_to_color = {'live_buy': [1, 0, 0, 1], 'simulated_buy': [1, 0, 0, 0.5], 'unable_to_buy': [1, 1, 0, 1], 'live_sell': [0, 1, 0, 1], 'simulated_sell': [0, 1, 0, 0.5], 'unable_to_sell': [0, 0, 1, 1]}
+        Sends the candles of stock that the plotter does not have yet, price_times are in seconds since the epoch
         
-        buy_x, buy_y, buy_color = [], [], []
-        sell_x, sell_y, sell_color = [], [], []
-        
-        for i in range(len(price_times)):
-            price_times[i] = self.convert_timestamp_to_datetime(price_times[i])
-        
-        for time, status in self.buy_times[stock].items():
-            
-            min_abs_distance, min_index = dt.timedelta(days=9999), 0
-            
-            for i in range(len(price_times)):
-                if abs(price_times[i] - time) < min_abs_distance:
-                    min_abs_distance = abs(price_times[i] - time)
-                    min_index = i
-            
-            buy_x += [price_times[min_index]]
-            buy_y += [prices[min_index]]
-            buy_color += [status_to_color[status]]
-        
-        for time, status in self.sell_times[stock].items():
-            min_abs_distance, min_index = dt.timedelta(days=9999), 0
-            
-            for i in range(len(price_times)):
-                if abs(price_times[i] - time) < min_abs_distance:
-                    min_abs_distance = abs(price_times[i] - time)
-                    min_index = i
-            
-            sell_x += [price_times[min_index]]
-            sell_y += [prices[min_index]]
-            sell_color += [status_to_color[status]]
-        
-        plt.figure(clear=True)
-        plt.plot_date(price_times, prices, 'g-')
-        
-        # https://matplotlib.org/stable/api/markers_api.html#module-matplotlib.markers
-        plt.scatter(x=buy_x, y=buy_y, c=buy_color)
-        plt.scatter(x=sell_x, y=sell_y, c=sell_color)
-        
-        plt.title(stock)
-        plt.ylabel("Price ($)")
-        plt.xlabel("Time")
-        plt.show()
+        Trades are sent to the plotter as they happen and drawn on the nearest candle by the plotting process.
+        """
+        self.plotter.update_prices(stock, price_times, prices)
     
     def plot_portfolio(self):
-        plt.plot(self.time_data, self.portfolio_data, 'g-')
-        plt.title("Portfolio (cash + crypto equity)")
-        plt.xlabel("Runtime (in seconds)")
-        plt.ylabel("Price ($)")
-        plt.show()
+        """
+        Sends the points of self.time_data and self.portfolio_data that the plotter does not have yet
+        """
+        self.plotter.update_portfolio(self.time_data[self.portfolio_plotted:], self.portfolio_data[self.portfolio_plotted:])
+        
+        self.portfolio_plotted = len(self.time_data)
     
     def convert_timestamp_to_datetime(self, timestamp):
+        if isinstance(timestamp, (int, np.integer)):
+            # Seconds since the epoch (UTC)
+            return dt.datetime(1970, 1, 1) + dt.timedelta(seconds=int(timestamp))
+        
         if type(timestamp) != str:
             timestamp = str(timestamp)[:-6]
         
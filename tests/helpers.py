@@ -0,0 +1,50 @@
+import numpy as np
+
+# Helpers shared by the test modules
+
+class Clock():
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+def make_order_info(order_id, state='unconfirmed', cumulative_quantity='0', updated_at='0'):
+    return {
+        'account_id': 'account', 'average_price': '20000.00' if cumulative_quantity != '0' else None, 'cancel_url': None,
+        'created_at': '2023-01-20T21:44:00Z', 'cumulative_quantity': cumulative_quantity, 'currency_pair_id': 'pair',
+        'entered_price': '400.00', 'executions': [], 'funding_source_id': None, 'id': order_id, 'initiator_id': None,
+        'initiator_type': None, 'is_visible_to_user': True, 'last_transaction_at': None, 'price': '20000.00',
+        'quantity': '0.02', 'ref_id': 'ref', 'rounded_executed_notional': str(round(float(cumulative_quantity) * 20000, 2)),
+        'side': 'buy', 'state': state, 'time_in_force': 'gtc', 'type': 'market', 'updated_at': updated_at
+    }
+
+crypto_meta_data = {
+    'BTC': {'min_order_price_increment': '0.010000000000000000', 'min_order_quantity_increment': '0.000001000000000000'},
+    'ETH': {'min_order_price_increment': '0.010000000000000000', 'min_order_quantity_increment': '0.000001000000000000'}
+}
+
+def make_config(determine_trade_function):
+    return {
+        'crypto': ['BTC', 'ETH'],
+        'determine_trade_function': determine_trade_function,
+        'builtin_trade_function_arguments': [],
+        'cash': 2000,
+        'cash_factor': 0.20,
+        'holdings_factor': 0.20,
+        'loss_threshold': 50.00,
+        'loss_percentage': 5,
+        'only_buy_below_average_bought_price': False,
+        'only_sell_above_average_bought_price': False,
+        'backtest': {'index': 10}
+    }
+
+def make_candles(number_of_bars, seed):
+    rng = np.random.default_rng(seed)
+
+    times = 1674251040 + 15 * np.arange(number_of_bars)
+
+    return {
+        'BTC': (times, {'close_price': 20000 * np.exp(np.cumsum(rng.normal(0, 0.002, number_of_bars)))}),
+        'ETH': (times, {'close_price': 1500 * np.exp(np.cumsum(rng.normal(0, 0.002, number_of_bars)))})
+    }
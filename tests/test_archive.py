@@ -0,0 +1,42 @@
+import numpy as np
+
+from robinhood_crypto_trader.crypto_trader.archive import CandleArchive, parse_time
+from robinhood_crypto_trader.crypto_trader.benchmark import make_candles
+from robinhood_crypto_trader.crypto_trader.broker import SimulatedBroker
+from tests.helpers import Clock
+
+def test_write_merges_by_time(tmp_path):
+    archive = CandleArchive(str(tmp_path), chunk_size=100)
+
+    times, columns = make_candles(['BTC'], 250)['BTC']
+
+    assert archive.write('BTC', times[:150], {field: values[:150] for field, values in columns.items()}) == 150
+
+    # Overlapping candles replace the stored ones, only the rest are new
+    columns['close_price'][149] = 1.0
+
+    assert archive.write('BTC', times[149:], {field: values[149:] for field, values in columns.items()}) == 100
+
+    chunks = list(archive.iterate('BTC'))
+
+    assert len(chunks) == len(archive.get_chunk_starts('BTC')) >= 3
+    assert (np.concatenate([chunk_times for _, chunk_times, _ in chunks]) == times).all()
+    assert (np.concatenate([chunk_columns['close_price'] for _, _, chunk_columns in chunks]) == columns['close_price']).all()
+
+    start, end = int(times[120]), int(times[130])
+
+    assert (np.concatenate([chunk_times for _, chunk_times, _ in archive.iterate('BTC', start, end)]) == times[120:130]).all()
+    assert list(archive.iterate('ETH')) == []
+
+def test_update_and_parse_time(tmp_path):
+    broker = SimulatedBroker(['BTC'], clock=Clock(1674251045.0))
+
+    archive = CandleArchive(str(tmp_path), fetch=broker.get_crypto_historicals)
+
+    assert archive.update('BTC', 'hour') == 240
+    assert archive.update('BTC', 'hour') == 0
+    assert archive.update('BTC', 'day') == 5760 - 240
+
+    assert parse_time(None) is None
+    assert parse_time(1674251040.5) == 1674251040
+    assert parse_time('2023-01-20') == parse_time('2023-01-20T00:00:00Z') == 1674172800
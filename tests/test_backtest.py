@@ -0,0 +1,105 @@
+import numpy as np
+
+from robinhood_crypto_trader.crypto_trader import backtest, indicators
+from tests.helpers import crypto_meta_data, make_config, make_candles
+
+def test_boll_signals_use_past_prices_only():
+    prices = make_candles(300, 0)['BTC'][1]['close_price']
+
+    signals = backtest.boll_signals(prices)
+
+    assert (signals[:19] == backtest.HOLD).all()
+
+    for bar in range(19, len(prices)):
+        moving_average, upper_band, lower_band = indicators.bollinger(prices[bar-19:bar+1], 20, 2)
+
+        if upper_band[-1] < prices[bar]:
+            assert signals[bar] == backtest.SELL
+        elif lower_band[-1] > prices[bar]:
+            assert signals[bar] == backtest.BUY
+        else:
+            assert signals[bar] == backtest.HOLD
+
+def test_macd_rsi_signals_match_single_window():
+    prices = make_candles(300, 1)['ETH'][1]['close_price']
+
+    signals = backtest.macd_rsi_signals(prices)
+
+    for bar in range(33, len(prices)):
+        window = prices[bar-33:bar+1]
+
+        macd, signal = indicators.macd(window, 12, 26, 9)
+        rsi = indicators.rsi(window[-16:], 14)[-2]
+
+        if rsi < 30 and macd[-1] < signal[-1]:
+            assert signals[bar] == backtest.BUY
+        elif rsi > 70 and macd[-1] > signal[-1]:
+            assert signals[bar] == backtest.SELL
+        else:
+            assert signals[bar] == backtest.HOLD
+
+def test_backtester_accounting():
+    backtester = backtest.Backtester(make_config('boll'), make_candles(2000, 2), crypto_meta_data)
+
+    summary = backtester.run()
+
+    assert summary['buys'] > 0
+
+    df_trades, df_prices = backtester.to_dataframes()
+
+    assert len(df_trades) == summary['iterations']
+    assert (df_trades.values == 'SIMULATION BUY').sum() == summary['buys']
+    assert (df_trades.values == 'SIMULATION SELL').sum() == summary['sells']
+
+    for crypto_name in backtester.crypto:
+        assert backtester.holdings[crypto_name] >= 0
+
+    assert backtester.cash >= 0
+
+def test_backtester_without_builtin_function_holds():
+    backtester = backtest.Backtester(make_config('personal_strategy'), make_candles(100, 3), crypto_meta_data)
+
+    summary = backtester.run()
+
+    assert summary['buys'] == 0 and summary['sells'] == 0
+    assert summary['iterations'] == 100 - 10
+    assert summary['cash'] == 2000
+
+def test_backtester_shares_cash_in_crypto_order():
+    times = 1674251040 + 15 * np.arange(20)
+
+    candles = {'BTC': (times, {'close_price': np.full(20, 20000.0)}), 'ETH': (times, {'close_price': np.full(20, 1000.0)})}
+
+    backtester = backtest.Backtester(make_config('personal_strategy'), candles, crypto_meta_data)
+
+    backtester.signals[:, 10] = backtest.BUY
+    backtester.signals[:, 11] = [backtest.SELL, backtest.BUY]
+
+    summary = backtester.run()
+
+    # BTC buys with 20% of $2000, ETH with 20% of the $1600 left, then ETH buys with 20% of the cash after BTC sold 20% of its holdings
+    assert summary['holdings'] == {'BTC': 0.016, 'ETH': 0.592}
+    assert summary['bought_price'] == {'BTC': 20000.0, 'ETH': 1000.0}
+    assert summary['cash'] == 2000 - 400 - 320 + 80 - 272
+    assert (backtester.outcomes[:, 11] == [4, 1]).all()
+    assert (backtester.portfolio[10:] == 2000).all()
+
+def test_backtester_stops_at_the_same_bar_in_any_bar_chunk(monkeypatch):
+    config = make_config('boll')
+    config['loss_threshold'] = 10
+
+    candles = make_candles(3000, 4)
+
+    results = []
+
+    for bar_chunk in [backtest.BAR_CHUNK, 7]:
+        monkeypatch.setattr(backtest, 'BAR_CHUNK', bar_chunk)
+
+        backtester = backtest.Backtester(config, candles, crypto_meta_data)
+
+        results.append((backtester.run(), backtester.outcomes, backtester.portfolio))
+
+    assert results[0][0]['stopped_by_loss'] and results[0][0]['iterations'] < 3000 - 19
+    assert results[0][0] == results[1][0]
+    assert (results[0][1] == results[1][1]).all()
+    assert np.array_equal(results[0][2], results[1][2], equal_nan=True)
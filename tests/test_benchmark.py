@@ -0,0 +1,26 @@
+import json
+
+from robinhood_crypto_trader.crypto_trader import benchmark
+
+def test_run_benchmarks():
+    results = benchmark.run_benchmarks([1, 3], [100], ['hour'], repeat=2)
+
+    assert len(results) == 2 * len(benchmark.BENCHMARKS)
+    assert set(result['benchmark'] for result in results) == set(benchmark.BENCHMARKS)
+    assert all(result['min'] <= result['median'] and result['repeat'] == 2 for result in results)
+    assert all(result['bars'] == benchmark.LIVE_SPANS['hour'] for result in results if result['benchmark'] in ['determine_trade', 'live_iteration'])
+
+def test_main_writes_and_compares(tmp_path):
+    output = str(tmp_path / 'benchmark.json')
+
+    old = benchmark.main(['--symbols', '2', '--bars', '100', '--spans', 'hour', '--benchmarks', 'boll', 'backtest', '--repeat', '1', '--output', output])
+
+    with open(output) as file:
+        assert json.load(file) == old
+
+    new = benchmark.main(['--symbols', '2', '--bars', '100', '--spans', 'hour', '--benchmarks', 'boll', '--repeat', '1', '--compare', output])
+
+    table = benchmark.compare(old, new)
+
+    assert list(table['benchmark']) == ['boll']
+    assert table['speedup'].iloc[0] > 0
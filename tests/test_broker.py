@@ -0,0 +1,75 @@
+from robinhood_crypto_trader.crypto_trader.broker import SimulatedBroker
+from robinhood_crypto_trader.crypto_trader.candles import parse_historicals
+from robinhood_crypto_trader.crypto_trader.reconciler import download_open_orders
+from tests.helpers import Clock
+
+def test_simulated_prices_are_deterministic_and_consistent():
+    clock = Clock(1674251045.0)
+
+    broker = SimulatedBroker(['BTC', 'ETH'], seed=3, clock=clock)
+    other = SimulatedBroker(['BTC', 'ETH'], seed=3, clock=clock)
+
+    historicals = broker.get_crypto_historicals('BTC', '15second', 'day', '24_7')
+
+    assert historicals == other.get_crypto_historicals('BTC', '15second', 'day', '24_7')
+
+    times, columns = parse_historicals(historicals)
+
+    assert len(times) == 5760
+    assert times[-1] == 1674251040
+    assert (times[1:] - times[:-1] == 15).all()
+
+    # The open candle closes at the current price
+    assert columns['close_price'][-1] == float(broker.get_crypto_quote('BTC')['mark_price'])
+
+    weekly, _ = parse_historicals(broker.get_crypto_historicals('ETH', 'week', 'year', '24_7'))
+
+    assert ((weekly - 4 * 86400) % 604800 == 0).all()
+
+def test_simulated_orders_update_the_account():
+    clock = Clock(1674251045.0)
+
+    broker = SimulatedBroker(['BTC'], cash=1000.00, fill_delay=30, clock=clock)
+
+    order_info = broker.order_buy_crypto_by_price('BTC', 400.00)
+
+    assert order_info['state'] == 'confirmed'
+    assert float(broker.build_user_profile()['cash']) == 600.00
+
+    # More than the cash that is not held by open orders
+    assert 'id' not in broker.order_buy_crypto_by_price('BTC', 700.00)
+
+    assert [info['id'] for info in download_open_orders(None, broker.iterate_order_info_pages)] == [order_info['id']]
+
+    clock.now += 30
+
+    filled = broker.get_crypto_order_info(order_info['id'])
+
+    assert filled['state'] == 'filled' and filled['cancel_url'] is None
+    assert broker.get_crypto_positions()[0]['quantity'] == filled['cumulative_quantity']
+    assert round(float(broker.build_user_profile()['cash']) + float(filled['rounded_executed_notional']), 2) == 1000.00
+
+    assert 'id' in broker.order_sell_crypto_by_quantity('BTC', float(filled['quantity']))
+
+    clock.now += 30
+
+    assert float(broker.get_crypto_positions()[0]['quantity']) == 0
+
+def test_simulated_errors():
+    slept = []
+
+    broker = SimulatedBroker(['BTC'], latency=0.25, error_rate=1.0, sleep=slept.append)
+
+    assert broker.get_crypto_quote('BTC') is None
+    assert broker.get_crypto_historicals('BTC', 'hour', 'week', '24_7') == [None]
+    assert parse_historicals([None])[0].size == 0
+
+    # A failed page ends the pages with [None]
+    broker.error_rate = 0.0
+    broker.order_buy_crypto_by_price('BTC', 10.00)
+    broker.error_rate = 1.0
+
+    assert list(broker.iterate_order_info_pages()) == [[None]]
+
+    assert slept == [0.25] * 4
+    assert broker.errors == {'get_crypto_quote': 1, 'get_crypto_historicals': 1, 'iterate_order_info_pages': 1}
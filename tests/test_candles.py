@@ -0,0 +1,94 @@
+import time as t
+import numpy as np
+
+from robinhood_crypto_trader.crypto_trader import indicators
+from robinhood_crypto_trader.crypto_trader.candles import CandleStore
+
+def make_historicals(times, prices):
+    return [{'begins_at': t.strftime('%Y-%m-%dT%H:%M:%SZ', t.gmtime(time)), 'open_price': str(price), 'close_price': str(price), 'high_price': str(price), 'low_price': str(price), 'volume': '0'} for time, price in zip(times, prices)]
+
+class Fetch():
+    def __init__(self, historicals):
+        self.historicals = historicals
+        self.spans = []
+
+    def __call__(self, crypto_symbol, interval, span, bounds):
+        self.spans.append(span)
+
+        return self.historicals
+
+def test_update_only_downloads_the_new_candles():
+    now = int(t.time()) // 15 * 15
+
+    times = now - 60 - 15 * np.arange(100)[::-1]
+
+    fetch = Fetch(make_historicals(times, np.arange(100)))
+
+    store = CandleStore('BTC', '15second', 'day', '24_7', fetch)
+    store.update()
+
+    assert fetch.spans == ['day'] and len(store) == 100
+
+    # The latest stored candle was still open, its newer download replaces it
+    fetch.historicals = make_historicals([now - 60, now - 45, now - 30, now - 15], [1000, 1001, 1002, 1003])
+    store.update()
+
+    assert fetch.spans == ['day', 'hour']
+    assert len(store) == 103
+    assert (store.times[-5:] == [now - 75, now - 60, now - 45, now - 30, now - 15]).all()
+    assert (store.close[-5:] == [98, 1000, 1001, 1002, 1003]).all()
+
+def test_only_the_latest_span_is_kept():
+    store = CandleStore('BTC', '15second', 'hour', '24_7')
+
+    assert store.capacity == 240
+
+    for k in range(10):
+        times = 15 * np.arange(100 * k, 100 * (k + 1))
+
+        store.append(make_historicals(times, times))
+
+    # The buffers are compacted in place instead of growing
+    assert len(store.buffer_times) == 480
+    assert (store.times == 15 * np.arange(760, 1000)).all()
+    assert (store.close == store.times).all()
+
+def test_failed_download_keeps_the_candles():
+    times = 15 * np.arange(10)
+
+    fetch = Fetch(make_historicals(times, np.arange(10)))
+
+    store = CandleStore('BTC', '15second', 'hour', '24_7', fetch)
+    store.load()
+
+    fetch.historicals = [None]
+    store.load()
+
+    assert (store.times == times).all()
+    assert (store.close == np.arange(10)).all()
+
+def test_bands_follow_the_appended_candles():
+    rng = np.random.default_rng(4)
+
+    times = 15 * np.arange(300)
+    prices = 20000 + np.cumsum(rng.normal(size=300))
+
+    store = CandleStore('BTC', '15second', 'hour', '24_7')
+    store.add_bands(20, 2)
+
+    store.append(make_historicals(times[:100], prices[:100]))
+
+    # One new candle at a time, or a few at once that replace the latest candle that was not complete yet
+    for end in range(101, 300, 2):
+        prices[end - 3] += 5
+
+        store.append(make_historicals(times[end-3:end], prices[end-3:end]))
+
+        moving_average, upper_band, lower_band = indicators.bollinger(store.close[-20:], 20, 2)
+
+        assert np.allclose(store.bands.bands(), (moving_average[-1], upper_band[-1], lower_band[-1]))
+
+    # The bands start again from the candles that replace the stored ones
+    store.append(make_historicals(times[:30], prices[:30]), replace=True)
+
+    assert np.allclose(store.bands.bands()[0], prices[10:30].mean())
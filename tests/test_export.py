@@ -0,0 +1,89 @@
+import csv
+
+from robinhood_crypto_trader.crypto_trader.export import Exporter
+from robinhood_crypto_trader.crypto_trader.journal import Journal
+from tests.helpers import make_order_info
+
+def make_completed_order(order_id, created_at, state='filled'):
+    return dict(make_order_info(order_id, state, '0.02'), created_at=created_at, last_transaction_at=created_at)
+
+def read_rows(path):
+    with open(path) as file:
+        return list(csv.reader(file))
+
+def test_export_orders_appends_only_new_orders(tmp_path):
+    orders = [make_completed_order('2', '2023-01-02', 'queued'), make_completed_order('1', '2023-01-01')]
+    requested = []
+
+    def fetch_pages(since):
+        requested.append(since)
+
+        yield [order_info for order_info in orders if since is None or order_info['created_at'] >= since]
+
+    exporter = Exporter(str(tmp_path), fetch_pages=fetch_pages, fetch_symbols=lambda: {'pair': 'BTCUSD'})
+
+    assert exporter.export_orders() == 1
+
+    # The open order is where the next export starts
+    orders = [make_completed_order('3', '2023-01-03'), make_completed_order('2', '2023-01-02')] + orders[1:]
+
+    assert exporter.export_orders() == 2
+    assert exporter.export_orders() == 0
+    assert requested == [None, '2023-01-02', '2023-01-03']
+
+    rows = read_rows(exporter.get_orders_path())
+
+    assert rows[0][0] == 'symbol'
+    assert [row[1] for row in rows[1:]] == ['2023-01-01', '2023-01-02', '2023-01-03']
+    assert rows[1][0] == 'BTCUSD'
+
+def test_failed_page_skips_the_export(tmp_path):
+    pages = [[make_completed_order('2', '2023-01-02')], [None]]
+
+    exporter = Exporter(str(tmp_path), fetch_pages=lambda since: iter(pages), fetch_symbols=lambda: {'pair': 'BTCUSD'})
+
+    # Nothing is written, so the orders of the failed page are not skipped by the next export
+    assert exporter.export_orders() == 0
+    assert exporter.load_watermark() == {'since': None, 'ids': {}}
+
+    pages = [[make_completed_order('2', '2023-01-02')], [make_completed_order('1', '2023-01-01')]]
+
+    assert exporter.export_orders() == 2
+
+def test_export_journal_appends_only_new_rows(tmp_path):
+    journal = Journal(['BTC', 'ETH'])
+    exporter = Exporter(str(tmp_path))
+
+    journal.append(0, {'BTC': 1.0, 'ETH': 2.0}, {'BTC': 'HOLD', 'ETH': 'BUY'})
+
+    assert exporter.export_journal(journal) == 1
+
+    journal.append(15, {'BTC': 3.0, 'ETH': 4.0}, {'BTC': 'SELL', 'ETH': 'HOLD'})
+
+    assert exporter.export_journal(journal) == 1
+    assert exporter.export_journal(journal) == 0
+
+    rows = read_rows(str(tmp_path / 'journal.csv'))
+
+    assert rows[0] == ['time', 'crypto', 'price', 'trade']
+    assert [row[1:] for row in rows[1:]] == [['BTC', '1.0', 'HOLD'], ['ETH', '2.0', 'BUY'], ['BTC', '3.0', 'SELL'], ['ETH', '4.0', 'HOLD']]
+
+def test_export_journal_resumes_from_the_watermark(tmp_path):
+    journal = Journal(['BTC', 'ETH'], chunk_size=2)
+
+    for time in [0, 15, 30]:
+        journal.append(time, {'BTC': 1.0, 'ETH': 2.0}, {'BTC': 'HOLD', 'ETH': 'HOLD'})
+
+    assert Exporter(str(tmp_path)).export_journal(journal) == 3
+
+    # A restarted trader has a new exporter and a new journal, e.g. unpickled from a checkpoint
+    resumed = Journal(['BTC', 'ETH'], chunk_size=2)
+
+    for time in [0, 15, 30, 45]:
+        resumed.append(time, {'BTC': 1.0, 'ETH': 2.0}, {'BTC': 'HOLD', 'ETH': 'HOLD'})
+
+    assert resumed.get_first_row_after(15) == 2 and resumed.get_first_row_after(45) == 4
+
+    assert Exporter(str(tmp_path)).export_journal(resumed) == 1
+
+    assert len(read_rows(str(tmp_path / 'journal.csv'))) == 1 + 2 * 4
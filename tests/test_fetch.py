@@ -0,0 +1,89 @@
+import io
+import time as t
+import pytest
+import threading
+import contextlib
+
+from robinhood_crypto_trader.crypto_trader.fetch import Fetcher
+from robinhood_crypto_trader.crypto_trader.benchmark import make_config, make_symbols
+
+class Calls():
+    def __init__(self, delay=0.0, failing=()):
+        self.delay = delay
+        self.failing = failing
+
+        self.lock = threading.Lock()
+        self.active = 0
+        self.most_active = 0
+        self.finished = []
+
+    def __call__(self, crypto_symbol):
+        with self.lock:
+            self.active += 1
+            self.most_active = max(self.most_active, self.active)
+
+        t.sleep(self.delay)
+
+        with self.lock:
+            self.active -= 1
+            self.finished.append(crypto_symbol)
+
+        if crypto_symbol in self.failing:
+            raise KeyError(crypto_symbol)
+
+        return crypto_symbol.lower()
+
+def test_map_returns_the_results_in_the_order_of_the_symbols():
+    fetcher = Fetcher(4)
+
+    crypto = ['S' + str(i) for i in range(20)]
+
+    results = fetcher.map(Calls(), crypto)
+
+    assert list(results) == crypto
+    assert list(results.values()) == [crypto_name.lower() for crypto_name in crypto]
+    assert fetcher.map(Calls(), []) == {}
+
+    fetcher.close()
+
+def test_map_raises_after_every_call_finished():
+    fetcher = Fetcher(4)
+
+    calls = Calls(delay=0.01, failing=['S2', 'S5'])
+
+    with pytest.raises(KeyError, match='S2'):
+        fetcher.map(calls, ['S' + str(i) for i in range(8)])
+
+    assert len(calls.finished) == 8
+
+    # The pool can still be used after a failed call
+    assert fetcher.map(Calls(), ['BTC', 'ETH']) == {'BTC': 'btc', 'ETH': 'eth'}
+
+    fetcher.close()
+
+def test_map_runs_at_most_max_workers_calls_at_once():
+    fetcher = Fetcher(3)
+
+    calls = Calls(delay=0.05)
+
+    fetcher.map(calls, ['S' + str(i) for i in range(12)])
+
+    assert calls.most_active == 3
+
+    fetcher.close()
+
+    calls = Calls(delay=0.01)
+
+    Fetcher(1).map(calls, ['S' + str(i) for i in range(4)])
+
+    assert calls.most_active == 1
+
+def test_trader_closes_the_fetcher_when_it_stops():
+    from robinhood_crypto_trader.crypto_trader.trader import Trader
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        trader = Trader(make_config(make_symbols(2)))
+        trader.run()
+
+    assert trader.iteration_number > 1
+    assert trader.fetcher.executor is None
@@ -0,0 +1,42 @@
+import numpy as np
+
+from robinhood_crypto_trader.crypto_trader.histcache import HistoricalsCache
+
+def make_historicals(number_of_bars):
+    return [{'begins_at': '2023-01-20T21:44:%02dZ' % (15 * i % 60), 'open_price': str(i), 'close_price': str(i + 0.5), 'high_price': str(i + 1), 'low_price': str(i - 1), 'volume': '0'} for i in range(number_of_bars)]
+
+def test_historicals_cache(tmp_path):
+    calls = []
+
+    def fetch(crypto_symbol, interval, span, bounds):
+        calls.append(crypto_symbol)
+
+        return make_historicals(4)
+
+    cache = HistoricalsCache(str(tmp_path), fetch=fetch)
+
+    times, columns = cache.load('BTC', '15second', 'hour', '24_7')
+    times, columns = cache.load('BTC', '15second', 'hour', '24_7')
+
+    assert calls == ['BTC']
+    assert len(times) == 4
+    assert np.allclose(columns['close_price'], [0.5, 1.5, 2.5, 3.5])
+    assert cache.get_info('BTC', '15second', 'hour', '24_7')['candles'] == 4
+
+    cache.load('BTC', '15second', 'hour', '24_7', refresh=True)
+
+    assert calls == ['BTC', 'BTC']
+
+def test_historicals_cache_offline(tmp_path):
+    cache = HistoricalsCache(str(tmp_path), fetch=lambda *arguments: make_historicals(4))
+
+    try:
+        cache.load('ETH', '15second', 'hour', '24_7', offline=True)
+        assert False
+    except FileNotFoundError:
+        pass
+
+    cache.load('ETH', '15second', 'hour', '24_7')
+    cache.remove('ETH', '15second', 'hour', '24_7')
+
+    assert cache.is_expired('ETH', '15second', 'hour', '24_7')
@@ -0,0 +1,76 @@
+import numpy as np
+
+from robinhood_crypto_trader.crypto_trader import indicators
+
+def reference_ema(prices, period):
+    ema = [sum(prices[:period]) / period]
+
+    multiplier = 2 / (period + 1)
+
+    for price in prices[period:]:
+        ema.append(price * multiplier + (ema[-1] * (1 - multiplier)))
+
+    return ema
+
+def test_ema():
+    prices = list(100 + np.cumsum(np.random.default_rng(0).normal(size=50)))
+
+    ema = indicators.ema(prices, 12)
+
+    assert np.isnan(ema[:11]).all()
+    assert np.allclose(ema[11:], reference_ema(prices, 12))
+
+def test_rsi():
+    prices = [1, 2, 3, 2, 2, 1, 4]
+
+    rsi = indicators.rsi(prices, 4)
+
+    assert np.isnan(rsi[:4]).all()
+
+    # Window 1, 2, 3, 2, 2: two gains and one loss
+    assert rsi[4] == 100 - 100 / (1 + 2)
+    # Window 2, 3, 2, 2, 1: one gain and two losses
+    assert rsi[5] == 100 - 100 / (1 + 0.5)
+    # Window without losses
+    assert indicators.rsi([1, 2, 3], 2)[-1] == 100
+
+def test_macd_windows():
+    prices = 100 + np.cumsum(np.random.default_rng(1).normal(size=60))
+
+    windows = np.lib.stride_tricks.sliding_window_view(prices, 34)
+
+    macd, signal = indicators.macd(windows, 12, 26, 9)
+
+    for i in [0, 13, len(windows) - 1]:
+        expected_macd, expected_signal = indicators.macd(windows[i], 12, 26, 9)
+
+        assert np.allclose(macd[i], expected_macd, equal_nan=True)
+        assert np.allclose(signal[i], expected_signal, equal_nan=True)
+
+def test_bollinger():
+    prices = 20000 + np.cumsum(np.random.default_rng(2).normal(size=200))
+
+    moving_average, upper_band, lower_band = indicators.bollinger(prices, 20, 2)
+
+    assert np.isnan(moving_average[:19]).all()
+
+    for i in [19, 100, 199]:
+        window = prices[i-19:i+1]
+
+        assert np.isclose(moving_average[i], np.mean(window))
+        assert np.isclose(upper_band[i], np.mean(window) + 2 * np.std(window))
+        assert np.isclose(lower_band[i], np.mean(window) - 2 * np.std(window))
+
+def test_rolling_bollinger():
+    prices = 20000 + np.cumsum(np.random.default_rng(3).normal(size=200))
+
+    rolling = indicators.RollingBollinger(20, 2, prices[:19])
+
+    assert not rolling.is_ready()
+
+    moving_average, upper_band, lower_band = indicators.bollinger(prices, 20, 2)
+
+    for i in range(19, len(prices)):
+        bands = rolling.update(prices[i])
+
+        assert np.allclose(bands, (moving_average[i], upper_band[i], lower_band[i]))
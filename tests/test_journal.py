@@ -0,0 +1,35 @@
+import numpy as np
+
+from robinhood_crypto_trader.crypto_trader.journal import Journal
+
+def test_journal_append_across_chunks():
+    journal = Journal(['BTC', 'ETH'], chunk_size=4)
+
+    for i in range(10):
+        journal.append(1674251040 + 86400 * i, {'BTC': 20000 + i, 'ETH': 1500 + i}, {'BTC': 'HOLD', 'ETH': 'BUY' if i % 2 else 'SELL'})
+
+    df_trades, df_prices = journal.to_dataframes()
+
+    assert len(journal) == 10
+    assert len(df_prices) == 10
+
+    # Rows of different days do not overwrite each other
+    assert df_prices.index.is_unique
+    assert list(df_prices['BTC']) == [20000 + i for i in range(10)]
+    assert list(df_trades['ETH'][:3]) == ['SELL', 'BUY', 'SELL']
+
+    assert journal.to_dataframes()[0] is df_trades
+
+def test_journal_extend_and_tail():
+    journal = Journal(['BTC'], chunk_size=3)
+
+    journal.append(0, {'BTC': 1.0}, {'BTC': 'HOLD'})
+    journal.extend(np.arange(1, 8), np.arange(2, 9, dtype=float).reshape(-1, 1), np.ones((7, 1)))
+
+    df_trades, df_prices = journal.tail(4)
+
+    assert list(df_prices['BTC']) == [5.0, 6.0, 7.0, 8.0]
+    assert list(df_trades['BTC']) == ['SIMULATION BUY'] * 4
+
+    assert len(journal.tail(0)[1]) == 0
+    assert len(journal.tail(100)[1]) == 8
@@ -0,0 +1,74 @@
+import numpy as np
+
+from robinhood_crypto_trader.crypto_trader.latency import LatencyHistogram, LatencyRecorder, METRIC_NAME
+
+class Clock():
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_histogram_quantiles():
+    histogram = LatencyHistogram()
+
+    latencies = np.random.default_rng(0).lognormal(np.log(0.05), 1.0, 10000)
+
+    for seconds in latencies:
+        histogram.record(seconds)
+
+    assert histogram.count == 10000
+    assert abs(histogram.mean() - latencies.mean()) < 1e-9
+
+    for q in [0.5, 0.95, 0.99]:
+        assert abs(histogram.quantile(q) / np.quantile(latencies, q) - 1) < 0.19
+
+    assert histogram.quantile(1.0) == latencies.max()
+    assert LatencyHistogram().quantile(0.5) is None
+
+def test_recorder_summary_and_prometheus_file(tmp_path):
+    clock = Clock()
+    path = str(tmp_path / 'metrics' / 'trader.prom')
+
+    recorder = LatencyRecorder(path, 60, clock)
+
+    with recorder.time('quote_fetch', 'BTC'):
+        pass
+
+    recorder.record('quote_fetch', 0.25, 'BTC')
+    recorder.record('console_output', 0.01)
+
+    summary = recorder.summary()
+
+    assert list(summary['phase']) == ['quote_fetch', 'console_output']
+    assert list(summary['count']) == [2, 1]
+    assert summary['crypto'].isna().tolist() == [False, True]
+    assert summary['max'].iloc[0] == 0.25
+
+    assert recorder.write_if_due()
+    assert not recorder.write_if_due()
+
+    with open(path) as file:
+        text = file.read()
+
+    assert METRIC_NAME + '_count{phase="quote_fetch",crypto="BTC"} 2' in text
+    assert METRIC_NAME + '{phase="console_output",quantile="0.99"} 0.01' in text
+
+    clock.now = 60
+
+    assert recorder.write_if_due()
+
+def test_merge_recorders():
+    recorder = LatencyRecorder()
+    other = LatencyRecorder()
+
+    recorder.record('quote_fetch', 0.1, 'BTC')
+    other.record('quote_fetch', 0.3, 'BTC')
+    other.record('quote_fetch', 0.2, 'ETH')
+
+    recorder.merge(other.histograms)
+
+    histogram = recorder.get_histogram('quote_fetch', 'BTC')
+
+    assert histogram.count == 2 and histogram.max == 0.3 and abs(histogram.sum - 0.4) < 1e-12
+    assert recorder.get_histogram('quote_fetch', 'ETH').count == 1
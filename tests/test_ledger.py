@@ -0,0 +1,140 @@
+import io
+import contextlib
+
+from robinhood_crypto_trader.crypto_trader.ledger import Ledger
+from robinhood_crypto_trader.crypto_trader.ticks import TickTable
+from robinhood_crypto_trader.crypto_trader.strategy import Strategy
+from robinhood_crypto_trader.crypto_trader.trader import Trader
+from tests.helpers import Clock
+
+META_DATA = {'min_order_price_increment': '0.010000000000000000', 'min_order_quantity_increment': '0.000001000000000000'}
+
+class FakeOrder():
+    def __init__(self, order_id, side, entered_price='0', quantity='0', price='0'):
+        self.id = order_id
+        self.side = side
+        self.entered_price = entered_price
+        self.quantity = quantity
+        self.price = price
+        self.state = 'unconfirmed'
+        self.cumulative_quantity = '0'
+        self.average_price = None
+        self.rounded_executed_notional = '0'
+
+    def fill(self, quantity, average_price, state):
+        self.cumulative_quantity = str(quantity)
+        self.average_price = str(average_price)
+        self.rounded_executed_notional = str(round(quantity * average_price, 2))
+        self.state = state
+
+def test_simulated_fills():
+    ledger = Ledger(['BTC'], ticks=TickTable({'BTC': META_DATA}))
+    ledger.reconcile(1000.00, 1000.00, {}, {})
+
+    ledger.apply_fill('BTC', 'buy', 0.01, 20000, 200.00)
+    ledger.apply_fill('BTC', 'buy', 0.01, 30000, 300.00)
+
+    assert ledger.get_available_cash() == 500.00
+    assert ledger.bought_price['BTC'] == 25000.00
+
+    ledger.apply_fill('BTC', 'sell', 0.02, 30000)
+
+    assert ledger.get_available_cash() == 1100.00
+    assert ledger.holdings['BTC'] == 0 and ledger.bought_price['BTC'] == 0
+    assert not ledger.needs_reconcile()
+
+def test_partial_fills_are_applied_once():
+    ledger = Ledger(['BTC'])
+    ledger.reconcile(1000.00, 1000.00, {}, {})
+
+    order = FakeOrder('1', 'buy', entered_price='400.00')
+
+    ledger.track(order, 'BTC')
+
+    assert ledger.get_available_cash() == 600.00
+
+    order.fill(0.01, 20000, 'partially_filled')
+
+    assert ledger.apply_order(order)
+    assert not ledger.apply_order(order)
+    assert ledger.holdings['BTC'] == 0.01
+    assert ledger.get_available_cash() == 600.00
+
+    order.fill(0.015, 20000, 'filled')
+
+    ledger.apply_order(order)
+
+    # The unfilled 100.00 is released once the order is final
+    assert ledger.get_available_cash() == 700.00
+    assert ledger.open_orders == {}
+
+def test_drift_forces_reconcile():
+    ledger = Ledger(['BTC'], reconcile_interval=None)
+    ledger.reconcile(100.00, 100.00, {'BTC': 0.001}, {'BTC': 20000})
+
+    assert not ledger.needs_reconcile()
+
+    ledger.apply_fill('BTC', 'sell', 0.002, 20000)
+
+    assert ledger.needs_reconcile()
+
+def test_many_fills_do_not_drift():
+    ledger = Ledger(['ETH'], ticks=TickTable({'ETH': META_DATA}))
+    ledger.reconcile(1000.00, 1000.00, {}, {})
+
+    for _ in range(100000):
+        ledger.apply_fill('ETH', 'buy', 0.1, 1234.57, 123.46)
+        ledger.apply_fill('ETH', 'sell', 0.1, 1234.57, 123.46)
+
+    # Floats would be off by a fraction of a cent and leave dust holdings with a stale bought price
+    assert ledger.cash == 1000.00
+    assert ledger.holdings['ETH'] == 0 and ledger.bought_price['ETH'] == 0
+    assert ledger.drift is None
+
+def test_open_limit_orders_do_not_change_the_profit():
+    decisions = {'BTC': 'HOLD', 'ETH': 'HOLD'}
+
+    config = {
+        'crypto': ['BTC', 'ETH'],
+        'username': 'simulated',
+        'password': 'simulated',
+        'days_to_run': 1,
+        'export_csv': False,
+        'plot_crypto': False,
+        'plot_portfolio': False,
+        'mode': 'live',
+        'trader': {'interval': '15second', 'span': 'hour', 'bounds': '24_7'},
+        'determine_trade_function': Strategy(lambda ohlcv: [decisions[crypto_name] for crypto_name in ohlcv['crypto']]),
+        'builtin_trade_function_arguments': [],
+        'use_cash': False,
+        'loss_threshold': 1.00,
+        'loss_percentage': 1,
+        'holdings_factor': 0.20,
+        'cash_factor': 0.50,
+        'buy_order_type': 'limit',
+        'sell_order_type': 'limit',
+        'only_sell_above_average_bought_price': False,
+        'only_buy_below_average_bought_price': False,
+        'broker': 'simulated',
+        # The limit orders stay open for an hour and the prices do not move
+        'simulation': {'seed': 0, 'clock': Clock(1674251045.0), 'fill_delay': 3600.0}
+    }
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        trader = Trader(config)
+
+        profits = []
+
+        for decision in ['HOLD', 'BUY', 'HOLD']:
+            decisions['BTC'] = decision
+
+            trader.quotes.new_iteration()
+            trader.download_iteration()
+            trader.run_iteration()
+
+            profits.append(trader.profit)
+
+        # The cash held by the open buy order is still part of the portfolio
+        assert len(trader.ledger.open_orders) == 1 and trader.ledger.reserved_cash > 0
+        assert profits[0] == profits[1] == profits[2]
+        assert trader.continue_trading()
@@ -0,0 +1,47 @@
+from robinhood_crypto_trader.crypto_trader.metacache import MetadataCache
+from robinhood_crypto_trader.crypto_trader.broker import SimulatedBroker
+
+class CountedPairs():
+    def __init__(self, pairs):
+        self.pairs = pairs
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+
+        return self.pairs
+
+def test_meta_data_from_one_download():
+    broker = SimulatedBroker(['BTC', 'ETH'])
+    fetch_pairs = CountedPairs(broker.get_crypto_currency_pairs())
+
+    cache = MetadataCache(fetch_pairs=fetch_pairs)
+
+    assert cache.get_meta_data(['BTC', 'ETH', 'XYZ']) == {'BTC': broker.get_crypto_info('BTC'), 'ETH': broker.get_crypto_info('ETH'), 'XYZ': None}
+    assert cache.get_info('ETH-USD')['id'] == 'simulated-ETH'
+    assert cache.get_tradable_symbols() == ['BTC', 'BTC-USD', 'ETH', 'ETH-USD']
+    assert fetch_pairs.calls == 1
+
+def test_file_max_age_and_warm_start(tmp_path):
+    path = str(tmp_path / 'metadata' / 'pairs.json')
+
+    fetch_pairs = CountedPairs(SimulatedBroker(['BTC']).get_crypto_currency_pairs())
+
+    MetadataCache(path, 3600, fetch_pairs).get_pairs()
+
+    # A restart reads the file instead of downloading
+    assert MetadataCache(path, 3600, fetch_pairs).get_info('BTC')['symbol'] == 'BTC-USD'
+    assert fetch_pairs.calls == 1
+
+    # Expired pairs are downloaded again, unless warm_start uses them anyway
+    MetadataCache(path, 3600, fetch_pairs, warm_start=True).get_pairs()
+    assert fetch_pairs.calls == 1
+
+    MetadataCache(path, 0, fetch_pairs).get_pairs()
+    assert fetch_pairs.calls == 2
+
+    # A failed download keeps the expired pairs
+    failed = CountedPairs([None])
+
+    assert len(MetadataCache(path, 0, failed).get_pairs()) == 1
+    assert MetadataCache(None, 0, failed).get_pairs() == []
@@ -0,0 +1,37 @@
+import robin_stocks.robinhood as rh
+
+from robinhood_crypto_trader.crypto_trader import order
+from tests.helpers import make_order_info
+
+def test_order_parses_numbers_and_executions():
+    order_info = make_order_info('1', 'filled', '0.02')
+    order_info['executions'] = [{'effective_price': '20000.00', 'id': 'execution', 'quantity': '0.02', 'timestamp': '2023-01-20T21:44:01Z'}]
+
+    filled_order = order.Order(order_info)
+
+    assert filled_order.cumulative_quantity == 0.02 and filled_order.entered_price == 400.00
+    assert filled_order.parsed_executions is None
+    assert filled_order.executions[0]['effective_price'] == 20000.00
+    assert not hasattr(filled_order, '__dict__')
+
+def test_iterate_orders_streams_pages_since(monkeypatch):
+    pages = {
+        'page1': {'results': [dict(make_order_info('3'), created_at='2023-01-03'), dict(make_order_info('2'), created_at='2023-01-02')], 'next': 'page2'},
+        'page2': {'results': [dict(make_order_info('1'), created_at='2023-01-01')], 'next': None}
+    }
+    requested = []
+
+    def request_get(url, data_type='regular'):
+        requested.append(url)
+
+        return pages[url]
+
+    monkeypatch.setattr(rh.urls, 'crypto_orders_url', lambda: 'page1')
+    monkeypatch.setattr(rh.helper, 'request_get', request_get)
+
+    assert [o.id for o in order.iterate_orders()] == ['3', '2', '1']
+
+    requested.clear()
+
+    assert [o.id for o in order.iterate_orders(since='2023-01-03')] == ['3']
+    assert requested == ['page1']
@@ -0,0 +1,45 @@
+import numpy as np
+
+from robinhood_crypto_trader.crypto_trader.plotting import PlotState, Plotter, nearest_index
+
+def test_nearest_index_matches_linear_scan():
+    rng = np.random.default_rng(0)
+
+    times = np.sort(rng.uniform(0, 1000, 200))
+    marker_times = rng.uniform(-50, 1050, 500)
+
+    expected = [np.argmin(np.abs(times - marker_time)) for marker_time in marker_times]
+
+    assert list(nearest_index(times, marker_times)) == expected
+    assert list(nearest_index([5.0], [0.0, 10.0])) == [0, 0]
+
+def test_plotter_sends_only_new_candles():
+    plotter = Plotter(output='file')
+
+    sent = []
+    plotter.send = sent.append
+
+    times = np.arange(10, dtype=float) * 60
+
+    plotter.update_prices('BTC', times[:6], np.arange(6.0))
+    plotter.update_prices('BTC', times, np.arange(10.0) + 100)
+    plotter.add_marker('BTC', 130, 'simulated_buy')
+    plotter.add_markers('BTC', [530], ['unable_to_sell'])
+
+    # The latest candle that was already sent is sent again
+    assert list(sent[1][2]) == list(times[5:])
+
+    state = PlotState()
+
+    for update in sent:
+        state.apply(update)
+
+    state_times, state_prices = state.prices['BTC']
+
+    assert list(state_times) == list(times)
+    assert list(state_prices) == [0, 1, 2, 3, 4, 105, 106, 107, 108, 109]
+
+    buy_x, buy_y, buy_color, sell_x, sell_y, sell_color = state.get_markers('BTC')
+
+    assert buy_x == [120] and buy_y == [2]
+    assert sell_x == [540] and sell_y == [109]
@@ -0,0 +1,142 @@
+import io
+import types
+import contextlib
+
+from robinhood_crypto_trader.crypto_trader import quotes
+from robinhood_crypto_trader.crypto_trader.quotes import QuoteCache
+from robinhood_crypto_trader.crypto_trader.fetch import Fetcher
+from robinhood_crypto_trader.crypto_trader.strategy import Strategy
+from tests.helpers import Clock
+
+class Quotes():
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, crypto_symbol):
+        self.calls.append(crypto_symbol)
+
+        return {'symbol': crypto_symbol, 'ask_price': str(len(self.calls))}
+
+def test_quote_cache_serves_a_snapshot_per_iteration():
+    fetch = Quotes()
+
+    cache = QuoteCache(fetch)
+
+    assert cache.get('BTC') == cache.get('BTC') == {'symbol': 'BTC', 'ask_price': '1'}
+    assert fetch.calls == ['BTC']
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache.new_iteration()
+
+    assert cache.get('BTC')['ask_price'] == '2'
+    assert cache.get_hit_rate() == 1 / 3
+
+    cache.invalidate('BTC')
+
+    assert cache.get('BTC')['ask_price'] == '3'
+
+def test_quote_cache_keeps_snapshots_for_max_age(monkeypatch):
+    clock = types.SimpleNamespace(now=1000.0)
+
+    monkeypatch.setattr(quotes, 't', types.SimpleNamespace(time=lambda: clock.now))
+
+    fetch = Quotes()
+
+    cache = QuoteCache(fetch, max_age=5)
+
+    cache.get('BTC')
+
+    # Snapshots kept by age outlive the iteration
+    cache.new_iteration()
+    clock.now += 5
+
+    assert cache.get('BTC')['ask_price'] == '1'
+
+    clock.now += 1
+
+    assert cache.get('BTC')['ask_price'] == '2'
+    assert (cache.hits, cache.misses) == (1, 2)
+
+def test_snapshot_only_downloads_the_missing_quotes():
+    fetch = Quotes()
+
+    cache = QuoteCache(fetch, fetcher=Fetcher(4))
+
+    cache.get('BTC')
+
+    snapshot = cache.snapshot(['BTC', 'ETH', 'DOGE'])
+
+    assert sorted(fetch.calls) == ['BTC', 'DOGE', 'ETH'] and fetch.calls[0] == 'BTC'
+    assert list(snapshot) == ['BTC', 'ETH', 'DOGE']
+    assert snapshot['BTC']['ask_price'] == '1'
+    assert cache.misses == 3
+
+    cache.fetcher.close()
+
+def test_quote_cache_counts_every_get_from_many_threads():
+    cache = QuoteCache(lambda crypto_symbol: {'symbol': crypto_symbol, 'ask_price': '1'})
+
+    fetcher = Fetcher(8)
+
+    symbols = ['S' + str(i % 10) for i in range(2000)]
+
+    futures = [fetcher.get_executor().submit(cache.get, crypto_symbol) for crypto_symbol in symbols]
+
+    assert all(future.result()['symbol'] == crypto_symbol for future, crypto_symbol in zip(futures, symbols))
+    assert cache.hits + cache.misses == 2000 and len(cache.snapshots) == 10
+
+    fetcher.close()
+
+def test_trades_use_the_precision_of_their_own_crypto():
+    from robinhood_crypto_trader.crypto_trader.trader import Trader
+
+    decisions = {'BTC': 'BUY', 'ETH': 'HOLD'}
+
+    config = {
+        'crypto': ['BTC', 'ETH'],
+        'username': 'simulated',
+        'password': 'simulated',
+        'days_to_run': 1,
+        'export_csv': False,
+        'plot_crypto': False,
+        'plot_portfolio': False,
+        'mode': 'safelive',
+        'trader': {'interval': '15second', 'span': 'hour', 'bounds': '24_7'},
+        'determine_trade_function': Strategy(lambda ohlcv: [decisions[crypto_name] for crypto_name in ohlcv['crypto']]),
+        'builtin_trade_function_arguments': [],
+        'cash': 2000,
+        'use_cash': True,
+        'loss_threshold': 1000000.00,
+        'loss_percentage': 100,
+        'holdings_factor': 0.20,
+        'cash_factor': 0.20,
+        'buy_order_type': 'market',
+        'sell_order_type': 'market',
+        'only_sell_above_average_bought_price': False,
+        'only_buy_below_average_bought_price': False,
+        'broker': 'simulated',
+        'simulation': {'seed': 0, 'clock': Clock(1674251045.0)}
+    }
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        trader = Trader(config)
+
+        # The price of a BUY of BTC used to be rounded like the last crypto of the price loop (ETH)
+        trader.ticks.add('BTC', 0, 2)
+        trader.ticks.add('ETH', 4, 6)
+
+        for decision in ['BUY', 'SELL']:
+            decisions['BTC'] = decision
+            holdings = trader.holdings['BTC']
+
+            trader.quotes.new_iteration()
+            trader.quotes.snapshot(trader.crypto)
+            trader.update_candles()
+            trader.run_iteration()
+
+            if decision == 'BUY':
+                assert trader.bought_price['BTC'] == round(float(trader.get_latest_quote('BTC')['ask_price']))
+                assert trader.holdings['BTC'] == round(trader.holdings['BTC'], 2) > 0
+
+    # The quantity of a SELL used to be rounded with the meta data of no crypto at all
+    assert round(holdings - trader.holdings['BTC'], 8) == round(holdings * trader.holdings_factor, 2)
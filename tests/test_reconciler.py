@@ -0,0 +1,59 @@
+from robinhood_crypto_trader.crypto_trader.order import Order
+from robinhood_crypto_trader.crypto_trader.reconciler import OrderReconciler, download_open_orders
+from tests.helpers import make_order_info
+
+def test_reconciler_polls_in_bulk_and_emits_fills():
+    open_orders = [make_order_info('1'), make_order_info('2')]
+    final_orders = {'1': make_order_info('1', 'filled', '0.02', '2')}
+    downloaded = []
+
+    def fetch_order(order_id):
+        downloaded.append(order_id)
+
+        return final_orders[order_id]
+
+    reconciler = OrderReconciler(lambda since: open_orders, fetch_order)
+
+    events = []
+    reconciler.subscribe(events.append)
+
+    reconciler.add(Order(make_order_info('1')), 'BTC')
+    reconciler.add(Order(make_order_info('2')), 'ETH')
+
+    # Nothing changed
+    events.clear()
+
+    assert reconciler.poll() == []
+
+    # Order 2 is partially filled and order 1 is no longer open
+    open_orders = [make_order_info('2', 'partially_filled', '0.01', '1')]
+
+    reconciler.poll()
+
+    assert downloaded == ['1']
+    assert [(event['crypto'], event['type'], event['quantity']) for event in events] == [('ETH', 'fill', 0.01), ('BTC', 'fill', 0.02)]
+    assert events[1]['price'] == 20000.00
+
+    assert [order.id for order in reconciler.get_open_orders()] == ['2']
+
+def test_failed_bulk_download_skips_the_poll():
+    downloaded = []
+
+    def fetch_order(order_id):
+        downloaded.append(order_id)
+
+        return make_order_info(order_id, 'filled', '0.02', '2')
+
+    for failed in [None, [None], [make_order_info('1'), None]]:
+        reconciler = OrderReconciler(lambda since: failed, fetch_order)
+        reconciler.add(Order(make_order_info('1')), 'BTC')
+
+        # The order is not downloaded on its own, it may still be open
+        assert reconciler.poll() == []
+        assert reconciler.failures == 1 and [order.id for order in reconciler.get_open_orders()] == ['1']
+
+    assert downloaded == []
+
+    pages = [[make_order_info('2')], [None]]
+
+    assert download_open_orders(None, lambda since: iter(pages)) == [None]
@@ -0,0 +1,29 @@
+import asyncio
+
+from robinhood_crypto_trader.crypto_trader.scheduler import Scheduler, get_next_boundary
+
+def test_get_next_boundary():
+    assert get_next_boundary(1674251041, 15) == 1674251055
+    assert get_next_boundary(1674251040, 15) == 1674251055
+    assert get_next_boundary(1674251040.5, 300) == 1674251100
+
+def test_scheduler_aligns_to_boundaries_and_skips_overruns():
+    now = [1000.3]
+    ticks = []
+
+    async def sleep(seconds):
+        now[0] += seconds
+
+    async def tick(boundary):
+        ticks.append((boundary, now[0]))
+
+        # The second tick overruns the next two boundaries
+        now[0] += 0.2 if len(ticks) != 2 else 25.0
+
+    scheduler = Scheduler(10, delay=1.0, clock=lambda: now[0], sleep=sleep)
+
+    asyncio.run(scheduler.run(tick, lambda: len(ticks) < 4))
+
+    assert [boundary for boundary, start in ticks] == [1000, 1010, 1040, 1050]
+    assert all(abs(start - boundary - 1.0) < 1e-9 for boundary, start in ticks)
+    assert scheduler.overruns == [{'boundary': 1010, 'runtime': 25.0, 'skipped': 2}]
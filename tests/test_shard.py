@@ -0,0 +1,98 @@
+import pytest
+
+from robinhood_crypto_trader.crypto_trader import backtest, shard
+from robinhood_crypto_trader.crypto_trader.broker import SimulatedBroker
+from robinhood_crypto_trader.crypto_trader.strategy import DECISIONS
+
+from tests.helpers import Clock
+
+def make_config(crypto, clock=None):
+    config = {
+        'crypto': crypto,
+        'broker': 'simulated',
+        'simulation': {'seed': 5},
+        'trader': {'interval': '15second', 'span': 'hour', 'bounds': '24_7'},
+        'max_workers': 2,
+        'determine_trade_function': 'boll',
+        'builtin_trade_function_arguments': [5, 0.5]
+    }
+
+    if clock is not None:
+        config['simulation']['clock'] = clock
+
+    return config
+
+def test_split_crypto():
+    assert shard.split_crypto(['A', 'B', 'C', 'D', 'E'], 2) == [['A', 'C', 'E'], ['B', 'D']]
+    assert shard.split_crypto(['A'], 4) == [['A']]
+    assert shard.get_window('macd_rsi', []) == 34
+
+def test_worker_decides_like_the_trader():
+    clock = Clock(1674251045.0)
+    crypto = ['BTC', 'ETH', 'DOGE']
+
+    broker = SimulatedBroker(crypto, seed=5, clock=clock)
+
+    worker = shard.ShardWorker(make_config(crypto, clock), crypto, {crypto_name: broker.get_crypto_info(crypto_name) for crypto_name in crypto}, broker.get_session())
+
+    clock.now += 60
+
+    result = worker.iterate()
+
+    assert set(result['quotes']) == set(crypto)
+    assert result['candles'] == {}
+
+    for crypto_name in crypto:
+        prices = worker.candles[crypto_name].close
+
+        assert result['quotes'][crypto_name] == broker.get_crypto_quote(crypto_name)
+        assert result['decisions'][crypto_name] == DECISIONS[backtest.boll_signals(prices, 5, 0.5)[-1]]
+
+    assert set(phase for phase, crypto_name in result['latency']) == {'quote_fetch', 'historicals_fetch', 'indicator_compute'}
+
+def test_pool_runs_every_shard_in_its_own_process():
+    crypto = ['BTC', 'ETH', 'DOGE', 'LTC', 'SOL']
+
+    broker = SimulatedBroker(crypto, seed=5)
+
+    pool = shard.ShardPool(make_config(crypto), crypto, {crypto_name: broker.get_crypto_info(crypto_name) for crypto_name in crypto}, 2, broker.get_session(), lookback=3)
+
+    try:
+        for _ in range(2):
+            result = pool.iterate()
+
+            assert set(result['quotes']) == set(crypto)
+            assert result['decisions'] == {}
+            assert all(len(times) == 3 for times, columns in result['candles'].values())
+            assert len(result['latency']) == 2
+    finally:
+        pool.stop()
+
+    assert pool.processes == []
+
+def test_pool_starts_a_stopped_worker_again():
+    crypto = ['BTC', 'ETH', 'DOGE', 'LTC', 'SOL']
+
+    broker = SimulatedBroker(crypto, seed=5)
+
+    pool = shard.ShardPool(make_config(crypto), crypto, {crypto_name: broker.get_crypto_info(crypto_name) for crypto_name in crypto}, 2, broker.get_session(), lookback=3)
+
+    try:
+        pool.iterate()
+
+        # Stopped in between two iterations: started again before the next one
+        pool.processes[0].kill()
+        pool.processes[0].wait()
+
+        assert set(pool.iterate()['quotes']) == set(crypto)
+
+        # A stopped worker is reported as retryable, the iteration that reads it is run again
+        pool.processes[1].kill()
+        pool.processes[1].wait()
+
+        with pytest.raises(shard.RetryableError):
+            pool.read(1)
+
+        assert set(pool.iterate()['quotes']) == set(crypto)
+    finally:
+        pool.stop()
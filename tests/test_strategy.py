@@ -0,0 +1,70 @@
+import numpy as np
+
+from robinhood_crypto_trader.crypto_trader import backtest, strategy
+from robinhood_crypto_trader.crypto_trader.candles import stack_candles
+from tests.helpers import crypto_meta_data, make_config, make_candles
+
+def momentum(ohlcv, threshold):
+    change = ohlcv['close_price'][:, -1] / ohlcv['close_price'][:, 0] - 1
+
+    return np.where(change > threshold, 'BUY', np.where(change < -threshold, 'SELL', 'HOLD'))
+
+def test_decide_every_crypto_at_once():
+    candles = make_candles(50, 3)
+
+    ohlcv = stack_candles(candles, ['BTC', 'ETH'], 5)
+
+    assert ohlcv['close_price'].shape == (2, 5)
+    assert (ohlcv['close_price'][1] == candles['ETH'][1]['close_price'][-5:]).all()
+
+    signals = strategy.Strategy(lambda ohlcv: ['BUY', 'SELL']).decide(ohlcv)
+
+    assert list(signals) == [backtest.BUY, backtest.SELL]
+    assert list(strategy.Strategy(lambda ohlcv: 'HOLD').decide(ohlcv)) == [backtest.HOLD, backtest.HOLD]
+
+def test_signals_match_decide_on_each_window():
+    momentum_strategy = strategy.Strategy(momentum, [0.001], lookback=6)
+
+    candles = make_candles(80, 4)
+
+    ohlcv = stack_candles(candles, ['BTC', 'ETH'])
+
+    signals = momentum_strategy.signals(ohlcv)
+
+    assert (signals[:, :5] == backtest.HOLD).all()
+
+    for bar in range(5, 80):
+        window = {'crypto': ohlcv['crypto'], 'close_price': ohlcv['close_price'][:, bar-5:bar+1]}
+
+        assert (signals[:, bar] == momentum_strategy.decide(window)).all()
+
+def test_backtester_with_registered_strategy():
+    strategy.register(strategy.Strategy(momentum, [0.001], lookback=6, name='momentum'))
+
+    config = make_config('momentum')
+
+    del config['backtest']['index']
+
+    backtester = backtest.Backtester(config, make_candles(500, 5), crypto_meta_data)
+
+    assert backtester.start_index == 5
+    assert backtester.determine_trade_func == 'momentum'
+
+    summary = backtester.run()
+
+    assert summary['buys'] > 0
+
+def test_stacked_candles_are_matched_by_time():
+    times = 1674251040 + 15 * np.arange(10)
+
+    candles = {
+        'BTC': (times, {'close_price': np.arange(10, dtype=np.float64)}),
+        # ETH misses the candle of times[4] and is one candle behind
+        'ETH': (np.delete(times, 4)[:-1], {'close_price': 100 + np.delete(np.arange(10, dtype=np.float64), 4)[:-1]})
+    }
+
+    ohlcv = stack_candles(candles, ['BTC', 'ETH'], 6)
+
+    assert (ohlcv['begins_at'] == times[3:9]).all()
+    assert list(ohlcv['close_price'][0]) == [3, 4, 5, 6, 7, 8]
+    assert list(ohlcv['close_price'][1]) == [103, 103, 105, 106, 107, 108]
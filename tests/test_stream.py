@@ -0,0 +1,114 @@
+import io
+import contextlib
+
+import numpy as np
+
+from robinhood_crypto_trader.crypto_trader.archive import CandleArchive
+from robinhood_crypto_trader.crypto_trader.backtest import Backtester
+from robinhood_crypto_trader.crypto_trader.stream import StreamingBacktester
+from robinhood_crypto_trader.crypto_trader.benchmark import make_config, make_symbols, make_candles, META_DATA
+
+def test_streaming_matches_the_whole_history(tmp_path):
+    crypto = make_symbols(3)
+    crypto_meta_data = {crypto_name: META_DATA for crypto_name in crypto}
+
+    candles = make_candles(crypto, 3000, seed=2)
+
+    # Files much shorter than the window of macd_rsi are not a problem for the carried candles
+    archive = CandleArchive(str(tmp_path), chunk_size=25)
+
+    for crypto_name in crypto:
+        archive.write(crypto_name, *candles[crypto_name])
+
+    for determine_trade_function in ['boll', 'macd_rsi']:
+        config = make_config(crypto, determine_trade_function)
+
+        backtester = Backtester(config, candles, crypto_meta_data)
+        summary = backtester.run()
+
+        streaming = StreamingBacktester(config, archive, crypto_meta_data)
+        chunks = list(streaming.run())
+
+        assert len(chunks) > 100
+        assert (np.concatenate([chunk['outcomes'] for chunk in chunks], axis=1) == backtester.outcomes).all()
+        assert streaming.summary() == summary
+
+def test_other_cryptos_are_aligned_to_the_first(tmp_path):
+    crypto = make_symbols(2)
+
+    candles = make_candles(crypto, 200)
+
+    archive = CandleArchive(str(tmp_path), chunk_size=50)
+
+    archive.write('S000', *candles['S000'])
+
+    # S001 starts later and misses a candle
+    times, columns = candles['S001']
+    kept = np.r_[60:100, 101:200]
+
+    archive.write('S001', times[kept], {field: values[kept] for field, values in columns.items()})
+
+    streaming = StreamingBacktester(make_config(crypto, 'boll'), archive, {crypto_name: META_DATA for crypto_name in crypto})
+
+    closes = np.concatenate([chunk['closes'] for chunk in streaming.run()], axis=1)
+
+    assert np.isnan(closes[1, :60]).all()
+    assert closes[1, 100] == columns['close_price'][99]
+    assert (closes[0] == candles['S000'][1]['close_price']).all()
+
+def test_trader_streams_the_archive(tmp_path):
+    from robinhood_crypto_trader.crypto_trader.trader import Trader
+
+    crypto = make_symbols(2)
+
+    candles = make_candles(crypto, 3000, seed=2)
+
+    archive = CandleArchive(str(tmp_path / 'archive'), chunk_size=100)
+
+    for crypto_name in crypto:
+        archive.write(crypto_name, *candles[crypto_name])
+
+    config = make_config(crypto, 'boll')
+    config['backtest'].update({'archive': str(tmp_path / 'archive'), 'chunk_size': 100, 'offline': True})
+
+    backtester = Backtester(config, candles, {crypto_name: META_DATA for crypto_name in crypto})
+    summary = backtester.run()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        trader = Trader(config)
+        trader.run()
+
+    assert trader.iteration_number == summary['iterations']
+    assert trader.profit == backtester.profit and trader.holdings == backtester.holdings
+
+    # Only the iterations with a trade are kept
+    trades = (backtester.outcomes != 0).any(axis=0)
+
+    times, prices, outcomes = trader.journal.get_columns()
+
+    assert 0 < len(trader.journal) == trades.sum() < summary['iterations']
+    assert (times == backtester.times[:backtester.number_of_bars][trades]).all()
+    assert (outcomes.T == backtester.outcomes[:, trades]).all()
+
+def test_portfolio_plot_keeps_evenly_spaced_points(tmp_path):
+    from robinhood_crypto_trader.crypto_trader.trader import Trader
+
+    config = make_config(make_symbols(1), 'boll')
+    config['backtest'].update({'archive': str(tmp_path), 'plot_points': 100})
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        trader = Trader(config)
+
+    trader.time_data, trader.portfolio_data = [], []
+    trader.plot_step, trader.plotted_bars = 1, 0
+
+    times = np.arange(1000, dtype=np.float64)
+    portfolio = times.copy()
+    portfolio[:10] = np.nan
+
+    for start in range(0, 1000, 70):
+        trader.add_portfolio_points(times[start:start+70], portfolio[start:start+70])
+
+    assert len(trader.time_data) <= 100
+    assert trader.time_data == list(times[10::trader.plot_step])
+    assert trader.portfolio_data == trader.time_data
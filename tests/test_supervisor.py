@@ -0,0 +1,116 @@
+import io
+import sys
+import pytest
+import contextlib
+
+from robinhood_crypto_trader.crypto_trader.supervisor import Supervisor, Checkpointer
+from robinhood_crypto_trader.crypto_trader.benchmark import make_config, make_symbols
+from tests.helpers import Clock
+
+class Flaky():
+    def __init__(self, failures, exception=TypeError):
+        self.failures = failures
+        self.exception = exception
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+
+        if self.calls <= self.failures:
+            raise self.exception('503 Server Error: Service Unavailable')
+
+        return 'done'
+
+def test_retries_in_a_loop_with_backoff():
+    delays = []
+
+    supervisor = Supervisor(backoff=1.0, max_backoff=8.0, jitter=0.0, sleep=delays.append)
+
+    # More failures than the recursion limit allows nested calls
+    flaky = Flaky(sys.getrecursionlimit() + 10)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert supervisor.run(flaky) == 'done'
+
+    assert delays[:5] == [1.0, 2.0, 4.0, 8.0, 8.0]
+    assert supervisor.failures == flaky.failures
+
+    supervisor.reset()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        supervisor.run(Flaky(1, KeyError))
+
+    assert delays[-1] == 1.0
+
+    # Other exceptions and too many retries in a row are raised
+    with pytest.raises(ValueError):
+        supervisor.run(Flaky(1, ValueError))
+
+    with contextlib.redirect_stdout(io.StringIO()), pytest.raises(TypeError):
+        Supervisor(max_retries=2, sleep=delays.append).run(Flaky(3))
+
+def test_checkpointer(tmp_path):
+    clock = Clock(1000.0)
+
+    checkpointer = Checkpointer(str(tmp_path / 'state' / 'trader.checkpoint'), 300, clock)
+
+    assert checkpointer.load() is None and checkpointer.is_due()
+
+    checkpointer.save({'iteration_number': 7})
+
+    assert checkpointer.load()['iteration_number'] == 7
+    assert not checkpointer.is_due()
+
+    clock.now += 300
+
+    assert checkpointer.is_due()
+
+    with open(checkpointer.path, 'wb') as file:
+        file.write(b'not a checkpoint')
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert checkpointer.load() is None
+
+    assert not Checkpointer(None).is_due()
+
+def test_trader_resumes_from_checkpoint(tmp_path):
+    from robinhood_crypto_trader.crypto_trader.trader import Trader
+
+    config = make_config(make_symbols(2), 'boll', 'safelive', 'hour')
+    config['checkpoint_file'] = str(tmp_path / 'trader.checkpoint')
+
+    # The simulated prices, and so the trades of the iterations, follow the clock
+    config['simulation']['clock'] = Clock(1674251045.0)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        trader = Trader(config)
+
+        for _ in range(2):
+            trader.quotes.new_iteration()
+            trader.download_iteration()
+            trader.run_iteration()
+
+            trader.iteration_number += 1
+
+            trader.end_iteration()
+
+        trader.ledger.apply_fill('S000', 'buy', 0.5, 100.00)
+        trader.save_checkpoint()
+
+        resumed = Trader(config)
+
+    # The candles come from the checkpoint instead of being downloaded again
+    assert resumed.broker.requests.get('get_crypto_historicals', 0) == 0
+    assert (resumed.candles['S001'].close == trader.candles['S001'].close).all()
+
+    assert resumed.iteration_number == 3
+    assert len(resumed.journal) == 2
+    assert resumed.holdings['S000'] == 0.5 and resumed.bought_price['S000'] == 100.00
+    assert resumed.cash == trader.ledger.get_available_cash()
+    assert resumed.initial_capital == trader.initial_capital
+
+    # A trader of other cryptos starts over
+    config['crypto'] = make_symbols(3)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert Trader(config).iteration_number == 1
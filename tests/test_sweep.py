@@ -0,0 +1,54 @@
+import numpy as np
+
+from robinhood_crypto_trader.crypto_trader import backtest, sweep
+from robinhood_crypto_trader.crypto_trader.broker import get_broker
+from robinhood_crypto_trader.crypto_trader.candles import parse_historicals
+
+from tests.helpers import Clock, crypto_meta_data, make_config, make_candles
+
+def test_grid_and_random_sample():
+    assert sweep.grid([[10, 20], [2]]) == [[10, 2], [20, 2]]
+
+    arguments_list = sweep.random_sample([[10, 30], [1.0, 3.0]], 50, seed=0)
+
+    assert len(arguments_list) == 50
+    assert all(type(period) == int and 10 <= period <= 30 for period, std_width in arguments_list)
+    assert all(1.0 <= std_width <= 3.0 for period, std_width in arguments_list)
+
+def test_complete_arguments():
+    assert sweep.complete_arguments('macd_rsi', [14, None, 70, 30, 12, 26, 9, None]) == backtest.MACD_RSI_ARGUMENTS
+
+def test_sweep_matches_backtester():
+    config = make_config('boll')
+    candles = make_candles(1000, 4)
+
+    results = sweep.sweep(config, candles, crypto_meta_data, sweep.grid([[10, 20], [1.5, 2]]), processes=2)
+
+    assert list(results.columns) == sweep.COLUMNS
+    assert len(results) == 4
+    assert (np.diff(results['profit'].values) <= 0).all()
+
+    for rank, row in results.iterrows():
+        config['builtin_trade_function_arguments'] = list(row['arguments'])
+
+        assert backtest.Backtester(config, candles, crypto_meta_data).run()['profit'] == row['profit']
+
+def test_load_candles_downloads_from_the_broker_of_the_config(tmp_path):
+    config = dict(make_config('boll'), username='simulated', password='simulated', broker='simulated', simulation={'seed': 1, 'clock': Clock(1674251045.0)})
+    config['backtest'] = {'interval': '15second', 'span': 'hour', 'bounds': '24_7', 'cache_directory': str(tmp_path)}
+
+    broker = get_broker(config)
+
+    candles = sweep.load_candles(config, broker)
+
+    assert broker.requests['login'] == 1 and broker.requests['get_crypto_historicals'] == 2
+
+    for crypto_name in config['crypto']:
+        times, columns = parse_historicals(broker.get_crypto_historicals(crypto_name, '15second', 'hour', '24_7'))
+
+        assert (candles[crypto_name][0] == times).all() and (candles[crypto_name][1]['close_price'] == columns['close_price']).all()
+
+    # The cached candles are used without logging in again
+    sweep.load_candles(config, broker)
+
+    assert broker.requests['login'] == 1
@@ -0,0 +1,29 @@
+from robinhood_crypto_trader.crypto_trader.ticks import TickTable, get_precision, to_ticks, from_ticks, divide
+
+def test_tick_table():
+    ticks = TickTable({
+        'BTC': {'min_order_price_increment': '0.010000000000000000', 'min_order_quantity_increment': '0.000001000000000000'},
+        'DOGE': {'min_order_price_increment': '0.000001000000000000', 'min_order_quantity_increment': '1.000000000000000000'}
+    })
+
+    assert ticks.price_precision == {'BTC': 2, 'DOGE': 6}
+    assert ticks.quantity_precision == {'BTC': 6, 'DOGE': 0}
+    assert get_precision('100.000000000000') == -2
+
+    assert ticks.round_price('BTC', 23456.789) == 23456.79
+    assert ticks.round_quantity('DOGE', 12.6) == 13
+    assert ticks.price_to_ticks('BTC', 23456.79) == 2345679
+    assert ticks.ticks_to_quantity('BTC', 1500) == 0.0015
+
+    # 0.0015 BTC at $23456.79 is $35.185185, rounded to cents
+    assert ticks.get_notional_ticks('BTC', 1500, 2345679) == 3519
+
+    # Cryptos without meta data use the default precision
+    assert ticks.get_price_precision('ETH') == 8
+
+def test_tick_arithmetic():
+    assert to_ticks(150, -2) == 2 and from_ticks(2, -2) == 200.0
+    assert from_ticks(to_ticks(0.1 + 0.2, 2), 2) == 0.3
+
+    assert divide(7, 2) == 4 and divide(5, 2) == 2 and divide(-7, 2) == -4 and divide(7, -3) == -2
+    assert divide(3 * 10 ** 30 + 1, 3) == 10 ** 30